@@ -0,0 +1,243 @@
+import argparse
+import base64
+import contextlib
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from pritty_print import print_cyan
+from simplemail import Email, SimpleMailException
+from simplemail.headers import iter_header_fields, parse_headers
+from simplemail.reader import get_header_text
+from simplemail.re_search import (get_sender_from_headers,
+                                  get_receivers_from_headers,
+                                  get_date_from_headers,
+                                  get_message_id_from_headers,
+                                  get_subject_from_headers)
+from usecases import get_emails
+from tests.test_data import EML_BODIES
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TEMPLATES = EML_BODIES[:2]
+MALFORMED_TEMPLATE = EML_BODIES[2]
+FOLD_WIDTH = 40
+NAMES = ["Иван Петров", "Анна Смирнова", "John Smith", "Maria Garcia"]
+
+FIELD_PARSERS: Dict[str, Callable] = {
+    "sender": get_sender_from_headers,
+    "receivers": get_receivers_from_headers,
+    "subject": get_subject_from_headers,
+    "date": get_date_from_headers,
+    "message_id": get_message_id_from_headers
+}
+
+
+def encode_word(text: str) -> str:
+    encoded = base64.b64encode(text.encode('windows-1251')).decode('ascii')
+    return f"=?windows-1251?B?{encoded}?="
+
+
+def fold(value: str, width: int = FOLD_WIDTH) -> str:
+    """
+    Folds a header value at spaces so no line is much longer than width
+    """
+    lines = []
+    line = ''
+    for word in value.split(' '):
+        if line and len(line) + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    return "\n\t".join(lines)
+
+
+def get_address(rng: random.Random, encoded_words: bool) -> str:
+    email = f"user{rng.randrange(10000)}@some_mail.ru"
+    name = rng.choice(NAMES)
+    if encoded_words:
+        name = encode_word(name)
+    return f"{name} <{email}>"
+
+
+def generate_email(rng: random.Random, extra_headers: int = 10,
+                   folding: bool = True, encoded_words: bool = True,
+                   attachment_size: int = 0) -> str:
+    """
+    Gives a message built from one of the TEMPLATES with random addresses,
+    date and Message-ID, extra headers and an optional base64 attachment
+    """
+    headers = dict(iter_header_fields(rng.choice(TEMPLATES)))
+    date = datetime(2021, 1, 1) + timedelta(seconds=rng.randrange(10 ** 8))
+    headers["from"] = get_address(rng, encoded_words)
+    headers["to"] = ", ".join(get_address(rng, encoded_words)
+                              for _ in range(rng.randint(1, 5)))
+    headers["date"] = date.strftime("%a, %d %b %Y %H:%M:%S +0000")
+    headers["message-id"] = f"<{rng.getrandbits(128):032x}@some_mail.ru>"
+    for number in range(extra_headers):
+        headers[f"x-extra-{number}"] = " ".join(
+            f"token{rng.randrange(1000)}" for _ in range(rng.randint(1, 15)))
+
+    lines = []
+    for name, value in headers.items():
+        if folding:
+            value = fold(value)
+        lines.append(f"{name.title()}: {value}")
+    message = "\n".join(lines) + "\n\nMessage body\n"
+    if attachment_size:
+        attachment = base64.encodebytes(os.urandom(attachment_size))
+        message += f"\n{attachment.decode('ascii')}"
+    return message
+
+
+def generate_corpus(folder: Path, count: int, extra_headers: int = 10,
+                    folding: bool = True, encoded_words: bool = True,
+                    attachment_size: int = 0, malformed_rate: float = 0.05,
+                    seed: int = 0) -> int:
+    """
+    Writes count messages to the folder, gives the total size in bytes
+    """
+    rng = random.Random(seed)
+    total_size = 0
+    for number in range(count):
+        if rng.random() < malformed_rate:
+            message = MALFORMED_TEMPLATE
+        else:
+            message = generate_email(rng, extra_headers, folding,
+                                     encoded_words, attachment_size)
+        data = message.encode('utf-8')
+        (folder / f"{number}.eml").write_bytes(data)
+        total_size += len(data)
+    return total_size
+
+
+def get_peak_rss_mb() -> float:
+    """
+    Gives the largest peak resident set size of the process
+    and its finished children
+    """
+    if resource is None:
+        return float('nan')
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / 1024  # kilobytes on linux
+
+
+def benchmark_email(files: List[Path]) -> float:
+    start = time.perf_counter()
+    for path in files:
+        try:
+            Email(path)
+        except SimpleMailException:
+            pass
+    return time.perf_counter() - start
+
+
+def benchmark_fields(files: List[Path]) -> Dict[str, float]:
+    """
+    Gives seconds spent in every parsing stage over all files
+    """
+    timings = dict.fromkeys(["read", "headers", *FIELD_PARSERS], 0.0)
+    for path in files:
+        start = time.perf_counter()
+        header_text = get_header_text(path)
+        timings["read"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        headers = parse_headers(header_text)
+        timings["headers"] += time.perf_counter() - start
+
+        for field, parser in FIELD_PARSERS.items():
+            start = time.perf_counter()
+            try:
+                parser(headers)
+            except SimpleMailException:
+                pass
+            timings[field] += time.perf_counter() - start
+    return timings
+
+
+def benchmark_get_emails(folder: Path, workers: int) -> Tuple[float, int]:
+    with open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        emails = get_emails(folder, workers)
+        return time.perf_counter() - start, len(emails)
+
+
+def print_throughput(name: str, seconds: float, count: int,
+                     size: int) -> None:
+    print(f"{name:30s}{count / seconds:12.0f} files/s"
+          f"{size / seconds / 2 ** 20:10.1f} MB/s")
+
+
+def get_script_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generates a synthetic email corpus and measures "
+                    "simplemail parsing throughput")
+    parser.add_argument("--count", "-n", type=int, default=2000,
+                        help="number of generated files, default is 2000")
+    parser.add_argument("--extra_headers", type=int, default=10,
+                        help="extra headers per message, default is 10")
+    parser.add_argument("--no_folding", action='store_true', default=False,
+                        help="don't fold long header values")
+    parser.add_argument("--no_encoded_words", action='store_true',
+                        default=False,
+                        help="don't encode display names as RFC 2047 words")
+    parser.add_argument("--attachment_size", type=int, default=0,
+                        help="attachment size in bytes, default is 0")
+    parser.add_argument("--malformed_rate", type=float, default=0.05,
+                        help="share of broken files, default is 0.05")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="number of processes for get_emails, "
+                             "default is 1")
+    parser.add_argument("--corpus", type=str, default=None,
+                        help="folder for the corpus, a temporary folder "
+                             "is used and removed if not set")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed, default is 0")
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace, folder: Path) -> None:
+    size = generate_corpus(folder, args.count, args.extra_headers,
+                           not args.no_folding, not args.no_encoded_words,
+                           args.attachment_size, args.malformed_rate,
+                           args.seed)
+    files = sorted(folder.iterdir())
+    print_cyan(f"Corpus: {len(files)} files, {size / 2 ** 20:.1f} MB "
+               f"in {folder}")
+
+    print_throughput("Email", benchmark_email(files), len(files), size)
+    seconds, parsed = benchmark_get_emails(folder, args.workers)
+    print_throughput(f"get_emails, {args.workers} worker(s)", seconds,
+                     len(files), size)
+    print(f"Parsed {parsed}, failed {len(files) - parsed}")
+
+    print_cyan("Per-field parse cost")
+    for stage, seconds in benchmark_fields(files).items():
+        print(f"{stage:30s}{seconds / len(files) * 10 ** 6:12.1f} us/file")
+    print_cyan(f"Peak RSS: {get_peak_rss_mb():.1f} MB")
+
+
+def main():
+    args = get_script_args()
+    if args.corpus is not None:
+        folder = Path(args.corpus)
+        folder.mkdir(parents=True, exist_ok=True)
+        run(args, folder)
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        run(args, Path(folder))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,37 @@
 from pritty_print import print_cyan
-from metadata import METADATA_FILENAME
+from metadata import METADATA_FILENAME, SEARCH_TEMPLATE
 import argparse
+import cProfile
+import sys
 from pathlib import Path
-from usecases import get_emails, save_to_metadata, save_to_metadata_old
+from typing import List
+from manifest import Manifest, get_manifest_path
+from message_index import MessageIdIndex
+from metadata_store import MetadataStore
+from subject_index import SubjectIndex
+from run_stats import RunStats
+from external_sort import sort_by_date
+from columnar_export import COLUMNAR_FORMATS, has_pyarrow, save_to_columnar
+from simplemail.walker import WalkOptions
+from usecases import (iter_emails, iter_unique_emails, update_manifest,
+                      save_to_metadata, save_to_metadata_old, save_to_sqlite,
+                      format_metadata, format_metadata_old, watch_folder)
+
+QUERY_COMMAND = "query"
+SEARCH_COMMAND = "search"
 
 
 def get_script_args():
-    script_description = "Scans folder for all files, tries to read it as "\
+    script_description = "Scans folder, Maildir, mbox file or zip/tar " \
+                         "archive for all messages, tries to read them as " \
                          "email, collect metadata and save it to a " \
-                         f"metadata file"
+                         "metadata file"
     parser = argparse.ArgumentParser(description=script_description)
 
     parser.add_argument("path_to_emails_folder",
                         type=str,
-                        help="path to folder that contains email files")
+                        help="path to folder that contains email files, "
+                             "Maildir, mbox file or zip/tar(.gz) archive")
 
     parser.add_argument("--metadata_file_name", "-m",
                         type=str,
@@ -24,28 +42,293 @@ def get_script_args():
     parser.add_argument('-o', action='store_true',
                         default=False,
                         help="Use old metadata format")
+
+    parser.add_argument("--sqlite", action='store_true',
+                        default=False,
+                        help="save metadata to an sqlite database with "
+                             "the metadata file name, use "
+                             f"'{QUERY_COMMAND}' command to read it")
+
+    parser.add_argument("--columnar",
+                        type=str,
+                        choices=COLUMNAR_FORMATS,
+                        default=None,
+                        help="save metadata to a typed Arrow IPC or Parquet "
+                             "file with the metadata file name, written in "
+                             "row groups as emails are parsed. Needs pyarrow")
+
+    parser.add_argument("--subject_index",
+                        type=str,
+                        default=None,
+                        help="path to a subject search index that is "
+                             "updated with new emails of the run, use "
+                             f"'{SEARCH_COMMAND}' command to search it. "
+                             "With -i emails of deleted files are dropped")
+
+    parser.add_argument("--workers", "-w",
+                        type=int,
+                        default=1,
+                        help="number of processes parsing emails, "
+                             "default is 1")
+
+    parser.add_argument("--incremental", "-i", action='store_true',
+                        default=False,
+                        help="parse only files added or changed since the "
+                             "previous run, keeps a manifest next to the "
+                             "metadata file")
+
+    parser.add_argument("--dedup", "-d",
+                        type=str,
+                        default=None,
+                        help="path to a Message-ID index file, messages "
+                             "with Message-ID already in the index are "
+                             "skipped. The index is kept between runs and "
+                             "new records are appended to the metadata "
+                             "file, in incremental mode the index is "
+                             "rebuilt and the file rewritten every run")
+
+    parser.add_argument("--max_depth",
+                        type=int,
+                        default=0,
+                        help="how deep to walk subfolders, negative for "
+                             "no limit, default is 0 - only the folder")
+
+    parser.add_argument("--include",
+                        type=str,
+                        action='append',
+                        default=[],
+                        help="glob of file names or relative paths to "
+                             "read, can be repeated, default is all files")
+
+    parser.add_argument("--exclude",
+                        type=str,
+                        action='append',
+                        default=[],
+                        help="glob of file names, folders or relative "
+                             "paths to skip, can be repeated")
+
+    parser.add_argument("--sort_by",
+                        type=str,
+                        choices=["date"],
+                        default=None,
+                        help="order metadata records by date. Works for "
+                             "any number of emails: sorted runs are "
+                             "spilled to temporary files and merged")
+
+    parser.add_argument("--watch", action='store_true',
+                        default=False,
+                        help="after the folder is processed keep running "
+                             "and append metadata of new files as they "
+                             "arrive, stop with Ctrl+C. Uses inotify where "
+                             "available, polls the folder otherwise")
+
+    parser.add_argument("--quiet", "-q", action='store_true',
+                        default=False,
+                        help="don't print a line for every file, print "
+                             "aggregated progress every few seconds")
+
+    parser.add_argument("--stats",
+                        type=str,
+                        default=None,
+                        help="path to a json report with counts, failures "
+                             "by exception type and timing histograms of "
+                             "walk, read, parse and write stages")
+
+    parser.add_argument("--profile",
+                        type=str,
+                        default=None,
+                        help="path to dump cProfile statistics of the run, "
+                             "worker processes are not profiled")
     return parser.parse_args()
 
 
+def get_query_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=f"cli.py {QUERY_COMMAND}",
+        description="Prints emails from an sqlite metadata database "
+                    "matching all given conditions, ordered by date")
+
+    parser.add_argument("database",
+                        type=str,
+                        help="path to a database created with --sqlite")
+
+    parser.add_argument("--sender", type=str, help="sender email")
+
+    parser.add_argument("--receiver", type=str, help="receiver email")
+
+    parser.add_argument("--since", type=str,
+                        help="first date in form YYYY-MM-DD")
+
+    parser.add_argument("--until", type=str,
+                        help="last date in form YYYY-MM-DD")
+
+    parser.add_argument("--message_id", type=str, help="Message-ID")
+
+    parser.add_argument('-o', action='store_true',
+                        default=False,
+                        help="Use old metadata format")
+    return parser.parse_args(argv)
+
+
+def get_search_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog=f"cli.py {SEARCH_COMMAND}",
+        description="Prints date, Message-ID and subject of emails whose "
+                    "subjects have all given terms, ordered by date")
+
+    parser.add_argument("index",
+                        type=str,
+                        help="path to an index created with --subject_index")
+
+    parser.add_argument("terms",
+                        type=str,
+                        nargs='+',
+                        help="words to search, a word ending with * "
+                             "matches every word starting with it")
+
+    parser.add_argument("--limit", type=int, default=-1,
+                        help="print at most this number of emails")
+    return parser.parse_args(argv)
+
+
 def main():
+    if sys.argv[1:2] == [QUERY_COMMAND]:
+        print_query(get_query_args(sys.argv[2:]))
+        return
+    if sys.argv[1:2] == [SEARCH_COMMAND]:
+        print_search(get_search_args(sys.argv[2:]))
+        return
     args = get_script_args()
-    write_metadata_file(args)
+    if args.profile is None:
+        write_metadata_file(args)
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.runcall(write_metadata_file, args)
+    finally:
+        profile.dump_stats(args.profile)
+
+
+def print_query(args: argparse.Namespace):
+    database = Path(args.database)
+    if not database.is_file():
+        raise ValueError(f"You must give path to a metadata database, "
+                         f"got {database} instead")
+    with MetadataStore(database) as store:
+        emails = store.query(sender=args.sender, receiver=args.receiver,
+                             since=args.since, until=args.until,
+                             message_id=args.message_id)
+        lines = format_metadata_old(emails) if args.o \
+            else format_metadata(emails)
+        for line in lines:
+            print(line)
+
+
+def print_search(args: argparse.Namespace):
+    path = Path(args.index)
+    if not path.is_file():
+        raise ValueError(f"You must give path to a subject index, "
+                         f"got {path} instead")
+    with SubjectIndex(path) as index:
+        for result in index.search(args.terms, args.limit):
+            print(SEARCH_TEMPLATE.format(*result))
 
 
 def write_metadata_file(args: argparse.Namespace):
     file_name = args.metadata_file_name
     path_to_email_folder = args.path_to_emails_folder
     folder = Path(path_to_email_folder)
-    if not folder.is_dir():
-        raise ValueError(f"You must give path to a folder, "
+    if not folder.exists():
+        raise ValueError(f"You must give path to a folder, mbox file or "
+                         f"archive, got {folder} instead")
+    if args.incremental and not folder.is_dir():
+        raise ValueError(f"Incremental mode needs a folder or Maildir, "
                          f"got {folder} instead")
-    emails = get_emails(folder)
+    if args.watch and (not folder.is_dir() or args.incremental
+                       or args.sqlite or args.sort_by is not None):
+        raise ValueError("Watch mode needs a folder and a text metadata "
+                         "file, it can't be used with -i, --sqlite or "
+                         "--sort_by")
+    if args.subject_index is not None and args.watch:
+        raise ValueError("Subject index can't be updated in watch mode")
+    if args.columnar is not None and (args.sqlite or args.o or args.watch):
+        raise ValueError("Columnar output can't be used with -o, --sqlite "
+                         "or --watch")
+    if args.columnar is not None and args.dedup is not None \
+            and not args.incremental:
+        raise ValueError("Columnar output is rewritten every run, it can't "
+                         "be used with -d without -i")
+    if args.columnar is not None and not has_pyarrow():
+        raise ValueError("Columnar output needs pyarrow, "
+                         "install it with 'pip install pyarrow'")
+    if args.workers < 1:
+        raise ValueError(f"Number of workers must be at least 1, "
+                         f"got {args.workers} instead")
+    options = WalkOptions(tuple(args.include), tuple(args.exclude),
+                          args.max_depth)
+    stats = RunStats(quiet=args.quiet)
+    index = None
+    if args.dedup is not None:
+        index = MessageIdIndex(Path(args.dedup))
+
+    if args.watch:
+        try:
+            watch_folder(folder, file_name, args.o, index, options, stats)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if index is not None:
+                index.close()
+        if args.stats is not None:
+            stats.save(args.stats)
+        print_cyan(f"\nMetadata file {file_name} is completed")
+        return
+
+    if args.incremental:
+        manifest = Manifest.load(get_manifest_path(file_name))
+        update_manifest(folder, manifest, args.workers, options, stats)
+        emails = manifest.emails()
+        if index is not None:
+            index.clear()
+            emails = iter_unique_emails(emails, index)
+        emails = stats.consumed("write", emails)
+    else:
+        manifest = None
+        emails = iter_emails(folder, args.workers, index, options, stats)
+
+    subject_index = None
+    if args.subject_index is not None:
+        subject_index = SubjectIndex(Path(args.subject_index))
+        emails = subject_index.index_emails(emails)
+
+    if args.sort_by == "date":
+        emails = sort_by_date(emails)
 
-    if args.o:
-        save_to_metadata_old(file_name, emails)
+    # Emails of the previous runs are in the index, so they stay in the
+    # output. The index commits Message-IDs only when it is closed after
+    # the output, a crashed run doesn't mark unsaved emails as seen
+    append = index is not None and not args.incremental
+    if args.sqlite:
+        save_to_sqlite(file_name, emails, append)
+    elif args.columnar is not None:
+        save_to_columnar(file_name, emails, args.columnar)
+    elif args.o:
+        save_to_metadata_old(file_name, emails, append)
     else:
-        save_to_metadata(file_name, emails)
+        save_to_metadata(file_name, emails, append)
+    if manifest is not None:
+        manifest.save()
+    if subject_index is not None:
+        if manifest is not None:
+            subject_index.remove_unseen()
+        subject_index.close()
+    if index is not None:
+        index.close()
+    if args.stats is not None:
+        stats.save(args.stats)
 
+    if args.quiet:
+        print_cyan(stats.get_progress())
     print_cyan(f"\nMetadata file {file_name} is completed")
 
 
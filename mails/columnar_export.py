@@ -0,0 +1,94 @@
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # columnar output is optional
+    pyarrow = None
+
+ROW_GROUP_SIZE = 65536
+COLUMNAR_FORMATS = ("arrow", "parquet")
+
+
+def has_pyarrow() -> bool:
+    return pyarrow is not None
+
+
+def get_schema() -> "pyarrow.Schema":
+    return pyarrow.schema([
+        ("date", pyarrow.date32()),
+        ("sender", pyarrow.string()),
+        ("receivers", pyarrow.list_(pyarrow.string())),
+        ("subject", pyarrow.string()),
+        ("message_id", pyarrow.string()),
+    ])
+
+
+def to_date(metadata_date: str) -> date:
+    """
+    Turns '13.04.2021' metadata date into a date
+    """
+    return date(int(metadata_date[6:]), int(metadata_date[3:5]),
+                int(metadata_date[:2]))
+
+
+def to_record_batch(emails: List, schema: "pyarrow.Schema"
+                    ) -> "pyarrow.RecordBatch":
+    columns = [
+        [to_date(email.get_date()) for email in emails],
+        [email.get_sender() for email in emails],
+        [sorted(email.get_receivers()) for email in emails],
+        [email.get_subject() for email in emails],
+        [email.get_id() for email in emails],
+    ]
+    return pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array(column, type=field.type)
+         for column, field in zip(columns, schema)],
+        schema=schema)
+
+
+def iter_record_batches(emails: Iterable, schema: "pyarrow.Schema",
+                        size: int = ROW_GROUP_SIZE
+                        ) -> Iterator["pyarrow.RecordBatch"]:
+    """
+    Gives record batches of at most size emails as emails come,
+    only one batch is held in memory
+    """
+    emails = iter(emails)
+    batch = list(islice(emails, size))
+    while batch:
+        yield to_record_batch(batch, schema)
+        batch = list(islice(emails, size))
+
+
+def save_to_columnar(file_name: str, emails: Iterable,
+                     file_format: str = "parquet",
+                     row_group_size: int = ROW_GROUP_SIZE) -> None:
+    """
+    Writes emails to an Arrow IPC or a Parquet file. Every row_group_size
+    emails are written as a record batch or a row group as soon as
+    they are parsed. Date is a date32 column, receivers a list column
+    Raises:
+        ImportError: if pyarrow is not installed
+    """
+    if pyarrow is None:
+        raise ImportError("Columnar output needs pyarrow, "
+                          "install it with 'pip install pyarrow'")
+    if file_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Columnar format must be one of "
+                         f"{COLUMNAR_FORMATS}, got {file_format} instead")
+    schema = get_schema()
+    if file_format == "arrow":
+        writer = pyarrow.ipc.new_file(file_name, schema)
+    else:
+        writer = pyarrow.parquet.ParquetWriter(file_name, schema)
+    with writer:
+        for batch in iter_record_batches(emails, schema, row_group_size):
+            if file_format == "arrow":
+                writer.write_batch(batch)
+            else:
+                writer.write_table(pyarrow.Table.from_batches([batch]),
+                                   row_group_size=row_group_size)
@@ -0,0 +1,101 @@
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from manifest import StoredEmail, to_stored_email
+
+RUN_SIZE = 100000
+MERGE_WIDTH = 64
+
+
+def get_date_key(email: StoredEmail) -> str:
+    """
+    Turns '13.04.2021' metadata date into '20210413' that sorts by date
+    """
+    date = email.get_date()
+    return f"{date[6:]}{date[3:5]}{date[:2]}"
+
+
+def dump_emails(emails: Iterable[StoredEmail], path: Path) -> Path:
+    with open(path, 'wb') as run:
+        for email in emails:
+            pickle.dump(tuple(email), run, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def write_run(emails: List[StoredEmail], path: Path) -> Path:
+    emails.sort(key=get_date_key)
+    return dump_emails(emails, path)
+
+
+def read_run(path: Path) -> Iterator[StoredEmail]:
+    with open(path, 'rb') as run:
+        while True:
+            try:
+                yield StoredEmail(*pickle.load(run))
+            except EOFError:
+                return
+
+
+def iter_batches(emails: Iterable, size: int) -> Iterator[List[StoredEmail]]:
+    emails = iter(emails)
+    batch = [to_stored_email(email) for email in islice(emails, size)]
+    while batch:
+        yield batch
+        batch = [to_stored_email(email) for email in islice(emails, size)]
+
+
+def merge_runs(runs: List[Path]) -> Iterator[StoredEmail]:
+    return heapq.merge(*[read_run(run) for run in runs], key=get_date_key)
+
+
+def reduce_runs(runs: List[Path], folder: Path,
+                merge_width: int = MERGE_WIDTH) -> List[Path]:
+    """
+    Merges groups of merge_width neighbouring runs into new runs until
+    at most merge_width are left, so no more than merge_width run files
+    are open at once. Neighbours are merged, so equal dates keep their order
+    """
+    number = len(runs)
+    while len(runs) > merge_width:
+        merged = []
+        for start in range(0, len(runs), merge_width):
+            group = runs[start:start + merge_width]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            merged.append(dump_emails(merge_runs(group),
+                                      folder / str(number)))
+            number += 1
+            for run in group:
+                run.unlink()
+        runs = merged
+    return runs
+
+
+def sort_by_date(emails: Iterable, run_size: int = RUN_SIZE,
+                 temp_dir: Optional[str] = None,
+                 merge_width: int = MERGE_WIDTH) -> Iterator[StoredEmail]:
+    """
+    Gives emails ordered by date, emails of the same date keep their order.
+    Only run_size emails are held in memory: every run of them is sorted
+    and spilled to a temporary file, then the runs are merged at most
+    merge_width files at a time
+    """
+    batches = iter_batches(emails, run_size)
+    first_batch = next(batches, [])
+    second_batch = next(batches, None)
+    if second_batch is None:
+        yield from sorted(first_batch, key=get_date_key)
+        return
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as folder:
+        runs = [write_run(first_batch, Path(folder) / "0"),
+                write_run(second_batch, Path(folder) / "1")]
+        del first_batch, second_batch
+        for number, batch in enumerate(batches, len(runs)):
+            runs.append(write_run(batch, Path(folder) / str(number)))
+        runs = reduce_runs(runs, Path(folder), merge_width)
+        yield from merge_runs(runs)
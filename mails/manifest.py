@@ -0,0 +1,104 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+MANIFEST_SUFFIX = ".manifest"
+
+
+class StoredEmail(NamedTuple):
+    """
+    Metadata fields of a parsed email kept in the manifest
+    """
+    date: str
+    message_id: str
+    sender: str
+    receivers: List[str]
+    subject: str = ''
+
+    def get_id(self) -> str:
+        return self.message_id
+
+    def get_sender(self) -> str:
+        return self.sender
+
+    def get_receivers(self) -> List[str]:
+        return self.receivers
+
+    def get_subject(self) -> str:
+        return self.subject
+
+    def get_date(self) -> str:
+        return self.date
+
+
+def to_stored_email(email) -> StoredEmail:
+    return StoredEmail(email.get_date(), email.get_id(), email.get_sender(),
+                       sorted(email.get_receivers()), email.get_subject())
+
+
+def get_manifest_path(metadata_file_name: str) -> Path:
+    return Path(f"{metadata_file_name}{MANIFEST_SUFFIX}")
+
+
+class Manifest():
+    """
+    Processed files keyed by path with their size, mtime and parse result,
+    None for files that failed to parse. Stored as json lines
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        manifest = cls(path)
+        if not path.is_file():
+            return manifest
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                manifest.entries[entry["path"]] = entry
+        return manifest
+
+    def save(self) -> None:
+        """
+        Writes the manifest to a temporary file and replaces the old one,
+        so an interrupted run keeps the previous manifest
+        """
+        temporary_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(temporary_path, 'w', encoding="utf-8") as file:
+            for entry in self.entries.values():
+                file.write(f"{json.dumps(entry, ensure_ascii=False)}\n")
+        os.replace(temporary_path, self.path)
+
+    def is_fresh(self, path: str, stat: os.stat_result) -> bool:
+        entry = self.entries.get(path)
+        return entry is not None \
+            and entry["size"] == stat.st_size \
+            and entry["mtime"] == stat.st_mtime_ns
+
+    def update(self, path: str, stat: os.stat_result,
+               email: Optional[StoredEmail]) -> None:
+        self.entries.pop(path, None)
+        self.entries[path] = {
+            "path": path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "email": None if email is None else list(email)
+        }
+
+    def keep_only(self, paths: Iterable[str]) -> List[str]:
+        """
+        Drops entries of files that are not in paths, gives dropped paths
+        """
+        paths = set(paths)
+        dropped = [path for path in self.entries if path not in paths]
+        for path in dropped:
+            del self.entries[path]
+        return dropped
+
+    def emails(self) -> Iterator[StoredEmail]:
+        for entry in self.entries.values():
+            if entry["email"] is not None:
+                yield StoredEmail(*entry["email"])
@@ -0,0 +1,113 @@
+import math
+import sqlite3
+from hashlib import blake2b
+from pathlib import Path
+
+DEDUP_CAPACITY = 10_000_000
+DEDUP_ERROR_RATE = 0.01
+
+
+class BloomFilter():
+    """
+    Probabilistic set of strings: no false negatives, false positives
+    with about error_rate probability until capacity items are added
+    """
+    def __init__(self, capacity: int = DEDUP_CAPACITY,
+                 error_rate: float = DEDUP_ERROR_RATE,
+                 bits: bytearray = None):
+        self.size = math.ceil(-capacity * math.log(error_rate)
+                              / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        if bits is not None and len(bits) * 8 >= self.size:
+            self.bits = bits
+        else:
+            self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for number in range(self.hashes):
+            yield (first + number * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+
+class MessageIdIndex():
+    """
+    Persistent set of seen Message-IDs. An in-memory bloom filter answers
+    most lookups, the exact set is an sqlite table on disk. Added ids are
+    kept only after commit, so commit once their records are written.
+    The filter is saved in the same file when the index is closed
+    """
+    def __init__(self, path: Path, capacity: int = DEDUP_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS message_ids "
+                                "(message_id TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS bloom "
+                                "(capacity INTEGER, bits BLOB)")
+        self.bloom = self._load_bloom(capacity)
+
+    def _load_bloom(self, capacity: int) -> BloomFilter:
+        row = self.connection.execute(
+            "SELECT bits FROM bloom WHERE capacity = ?", (capacity,)
+        ).fetchone()
+        # The saved filter is taken out until close, so after a crash
+        # it is rebuilt from the exact set instead of missing new ids
+        self.connection.execute("DELETE FROM bloom")
+        self.connection.commit()
+        if row is not None:
+            return BloomFilter(capacity, bits=bytearray(row[0]))
+        bloom = BloomFilter(capacity)
+        for (message_id, ) in self.connection.execute(
+                "SELECT message_id FROM message_ids"):
+            bloom.add(message_id)
+        return bloom
+
+    def __contains__(self, message_id: str) -> bool:
+        if message_id not in self.bloom:
+            return False
+        return self.connection.execute(
+            "SELECT 1 FROM message_ids WHERE message_id = ?", (message_id,)
+        ).fetchone() is not None
+
+    def add(self, message_id: str) -> bool:
+        """
+        Adds the Message-ID, gives False if it was already in the index
+        """
+        if message_id in self:
+            return False
+        self.bloom.add(message_id)
+        self.connection.execute(
+            "INSERT OR IGNORE INTO message_ids VALUES (?)", (message_id,))
+        return True
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def clear(self) -> None:
+        self.connection.execute("DELETE FROM message_ids")
+        self.connection.execute("DELETE FROM bloom")
+        self.connection.commit()
+        self.bloom = BloomFilter(self.capacity)
+
+    def close(self) -> None:
+        self.connection.execute("DELETE FROM bloom")
+        self.connection.execute("INSERT INTO bloom VALUES (?, ?)",
+                                (self.capacity, bytes(self.bloom.bits)))
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self) -> "MessageIdIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -7,3 +7,5 @@ Message-ID: {}
 Дата отправки: {}
 От: {}
 Кому: {}"""
+
+SEARCH_TEMPLATE = "{};{};{}"
@@ -0,0 +1,128 @@
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+from manifest import StoredEmail
+
+INSERT_BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    id INTEGER PRIMARY KEY,
+    message_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    subject TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS receivers (
+    email_id INTEGER NOT NULL REFERENCES emails(id),
+    receiver TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emails_message_id ON emails(message_id);
+CREATE INDEX IF NOT EXISTS emails_date ON emails(date);
+CREATE INDEX IF NOT EXISTS emails_sender_date ON emails(sender, date);
+CREATE INDEX IF NOT EXISTS receivers_receiver ON receivers(receiver, email_id);
+CREATE INDEX IF NOT EXISTS receivers_email_id ON receivers(email_id);
+"""
+
+SELECT_EMAILS = """
+SELECT strftime('%d.%m.%Y', emails.date), emails.message_id, emails.sender,
+       (SELECT group_concat(receiver, ',') FROM receivers
+        WHERE receivers.email_id = emails.id),
+       emails.subject
+FROM emails
+"""
+
+
+def to_iso_date(metadata_date: str) -> str:
+    """
+    Converts '13.04.2021' metadata date to '2021-04-13' that sqlite
+    compares and sorts as a date
+    """
+    return datetime.strptime(metadata_date, "%d.%m.%Y").date().isoformat()
+
+
+class MetadataStore():
+    """
+    Email metadata in an sqlite database with indexes on sender,
+    receiver, date and Message-ID
+    """
+    def __init__(self, path: Path):
+        self.connection = sqlite3.connect(str(path))
+        self.connection.executescript(SCHEMA)
+
+    def clear(self) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM receivers")
+            self.connection.execute("DELETE FROM emails")
+
+    def add_emails(self, emails: Iterable) -> None:
+        """
+        Inserts emails in transactions of INSERT_BATCH_SIZE emails
+        """
+        emails = iter(emails)
+        batch = list(islice(emails, INSERT_BATCH_SIZE))
+        while batch:
+            with self.connection:
+                self._insert(batch)
+            batch = list(islice(emails, INSERT_BATCH_SIZE))
+
+    def _insert(self, batch: List) -> None:
+        cursor = self.connection.cursor()
+        for email in batch:
+            cursor.execute("INSERT INTO emails "
+                           "(message_id, date, sender, subject) "
+                           "VALUES (?, ?, ?, ?)",
+                           (email.get_id(), to_iso_date(email.get_date()),
+                            email.get_sender(), email.get_subject()))
+            email_id = cursor.lastrowid
+            cursor.executemany("INSERT INTO receivers VALUES (?, ?)",
+                               [(email_id, receiver)
+                                for receiver in email.get_receivers()])
+
+    def query(self, sender: Optional[str] = None,
+              receiver: Optional[str] = None,
+              since: Optional[str] = None,
+              until: Optional[str] = None,
+              message_id: Optional[str] = None) -> Iterator[StoredEmail]:
+        """
+        Gives emails matching all given conditions ordered by date.
+        since and until are dates in form YYYY-MM-DD, both inclusive
+        """
+        conditions = []
+        parameters = []
+        if sender is not None:
+            conditions.append("emails.sender = ?")
+            parameters.append(sender)
+        if receiver is not None:
+            conditions.append("emails.id IN (SELECT email_id FROM receivers "
+                              "WHERE receiver = ?)")
+            parameters.append(receiver)
+        if since is not None:
+            conditions.append("emails.date >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("emails.date <= ?")
+            parameters.append(until)
+        if message_id is not None:
+            conditions.append("emails.message_id = ?")
+            parameters.append(message_id)
+
+        sql = SELECT_EMAILS
+        if conditions:
+            sql += f"WHERE {' AND '.join(conditions)}\n"
+        sql += "ORDER BY emails.date, emails.id"
+        for date, message_id, sender, receivers, subject in \
+                self.connection.execute(sql, parameters):
+            receivers = receivers.split(',') if receivers else []
+            yield StoredEmail(date, message_id, sender, receivers, subject)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "MetadataStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
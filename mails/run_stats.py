@@ -0,0 +1,138 @@
+import json
+import math
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, TypeVar
+from pritty_print import print_cyan, print_green, print_red
+
+PROGRESS_INTERVAL = 5.0
+STAGES = ("walk", "read", "parse", "write")
+
+T = TypeVar('T')
+
+
+class Histogram():
+    """
+    Timings in power of two buckets of microseconds
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = Counter()
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        microseconds = max(1, math.ceil(seconds * 10 ** 6))
+        self.buckets[1 << (microseconds - 1).bit_length()] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "min_seconds": self.min if self.count else 0.0,
+            "max_seconds": self.max,
+            "buckets_us": {f"<={bucket}": self.buckets[bucket]
+                           for bucket in sorted(self.buckets)}
+        }
+
+
+class RunStats():
+    """
+    Counts parsed and failed messages, collects stage timings and
+    reports progress. Prints a line for every message or, when quiet,
+    an aggregated progress line every PROGRESS_INTERVAL seconds
+    """
+    def __init__(self, quiet: bool = False,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        self.quiet = quiet
+        self.progress_interval = progress_interval
+        self.start = time.perf_counter()
+        self.last_progress = self.start
+        self.parsed = 0
+        self.failed = 0
+        self.removed = 0
+        self.failures = Counter()
+        self.stages: Dict[str, Histogram] = {stage: Histogram()
+                                             for stage in STAGES}
+
+    def add_timing(self, stage: str, seconds: float) -> None:
+        self.stages[stage].add(seconds)
+
+    def timed(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Gives items of the iterable recording time spent producing each
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.add_timing(stage, time.perf_counter() - start)
+            yield item
+
+    def consumed(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Gives items of the iterable recording time the consumer spends
+        on each before asking for the next one
+        """
+        for item in iterable:
+            start = time.perf_counter()
+            yield item
+            self.add_timing(stage, time.perf_counter() - start)
+
+    def success(self, name: str) -> None:
+        self.parsed += 1
+        if not self.quiet:
+            print_green(f"{name} +++")
+        self._progress()
+
+    def failure(self, name: str, exception: Exception) -> None:
+        self.failed += 1
+        self.failures[type(exception).__name__] += 1
+        if not self.quiet:
+            print_red(f"{name}: {exception} ---")
+        self._progress()
+
+    def removal(self, name: str) -> None:
+        self.removed += 1
+        if not self.quiet:
+            print_red(f"{name}: deleted ---")
+
+    def get_elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def get_progress(self) -> str:
+        elapsed = self.get_elapsed()
+        rate = (self.parsed + self.failed) / elapsed if elapsed else 0.0
+        return f"{self.parsed} parsed, {self.failed} failed, " \
+               f"{rate:.0f} files/s, {elapsed:.0f} s"
+
+    def _progress(self) -> None:
+        if not self.quiet:
+            return
+        now = time.perf_counter()
+        if now - self.last_progress >= self.progress_interval:
+            self.last_progress = now
+            print_cyan(self.get_progress())
+
+    def to_dict(self) -> dict:
+        return {
+            "parsed": self.parsed,
+            "failed": self.failed,
+            "removed": self.removed,
+            "elapsed_seconds": self.get_elapsed(),
+            "failures": dict(self.failures),
+            "stages": {stage: histogram.to_dict()
+                       for stage, histogram in self.stages.items()}
+        }
+
+    def save(self, file_name: str) -> None:
+        with open(file_name, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
@@ -0,0 +1,63 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Union
+from .reader import Buffer, cut_header_block, decode_header_block
+from .record import EmailRecord
+from .sm_exceptions import SimpleMailException
+
+BATCH_CHUNK_SIZE = 256
+
+ParseResult = Union[EmailRecord, SimpleMailException]
+
+
+def parse_header_block(header_block: bytes) -> ParseResult:
+    """
+    Gives a parsed EmailRecord or the SimpleMailException it failed with
+    """
+    try:
+        return EmailRecord(decode_header_block(header_block)).parse()
+    except SimpleMailException as e:
+        return e
+
+
+def parse_header_blocks(header_blocks: List[bytes]) -> List[ParseResult]:
+    return [parse_header_block(header_block)
+            for header_block in header_blocks]
+
+
+def iter_header_chunks(messages: Iterable[Buffer],
+                       size: int) -> Iterator[List[bytes]]:
+    header_blocks = (cut_header_block(message) for message in messages)
+    chunk = list(islice(header_blocks, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(header_blocks, size))
+
+
+def parse_many(messages: Iterable[Buffer], workers: int = 1,
+               executor: Optional[Executor] = None,
+               chunk_size: int = BATCH_CHUNK_SIZE) -> List[ParseResult]:
+    """
+    Parses messages that are already in memory: bytes, bytearray or
+    memoryview of whole messages. Nothing is written to disk.
+    Gives a result for every message in the same order: a parsed
+    EmailRecord or the SimpleMailException it failed with.
+    Only header blocks are copied out of the buffers. With more than
+    one worker or a given executor, chunks of header blocks are parsed
+    in worker processes. Pass an executor to keep workers and their
+    compiled patterns and decoder caches alive between batches
+    """
+    if executor is None and workers <= 1:
+        return [parse_header_block(cut_header_block(message))
+                for message in messages]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return parse_many(messages, executor=pool, chunk_size=chunk_size)
+
+    results = []
+    for chunk_results in executor.map(parse_header_blocks,
+                                      iter_header_chunks(messages,
+                                                         chunk_size)):
+        results.extend(chunk_results)
+    return results
@@ -0,0 +1,56 @@
+from base64 import b64decode
+from binascii import Error as BinasciiError, a2b_qp
+from functools import lru_cache
+from re import compile
+
+ENCODED_WORD_CACHE_SIZE = 8192
+
+ENCODED_WORD = compile(r"=\?([^?\s]+)\?([BbQq])\?([^?\s]*)\?=")
+BETWEEN_ENCODED_WORDS = compile(r"(?<=\?=)\s+(?==\?)")
+
+
+@lru_cache(maxsize=ENCODED_WORD_CACHE_SIZE)
+def decode_encoded_word(word: str) -> str:
+    """
+    Decodes one RFC 2047 encoded word like =?windows-1251?B?...?=.
+    Gives the word unchanged if it can't be decoded. Results are kept
+    in a bounded LRU cache, names of the same people repeat a lot
+    """
+    match = ENCODED_WORD.fullmatch(word)
+    if not match:
+        return word
+    charset, encoding, text = match.groups()
+    charset = charset.split('*')[0]  # RFC 2231 language suffix
+    try:
+        if encoding in "Bb":
+            data = b64decode(text + '=' * (-len(text) % 4))
+        else:
+            data = a2b_qp(text.encode('ascii'), header=True)
+        return data.decode(charset, errors='replace')
+    except (BinasciiError, LookupError, UnicodeEncodeError):
+        return word
+
+
+def decode_header_value(value: str) -> str:
+    """
+    Decodes all encoded words of a header value. Whitespace between
+    adjacent encoded words is dropped as RFC 2047 requires
+    """
+    if "=?" not in value:
+        return value
+    value = BETWEEN_ENCODED_WORDS.sub('', value)
+    return ENCODED_WORD.sub(lambda match: decode_encoded_word(match[0]),
+                            value)
+
+
+def get_display_name(address: str) -> str:
+    """
+    Gives the decoded display name of an address like
+    "Name" <user@mail.ru> or an empty string if there is no name
+    """
+    if '<' not in address:
+        return ''
+    name = address.split('<', 1)[0].strip()
+    if len(name) > 1 and name[0] == name[-1] == '"':
+        name = name[1:-1].replace('\\"', '"')
+    return decode_header_value(name)
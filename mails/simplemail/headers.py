@@ -0,0 +1,62 @@
+from typing import Dict, Iterator, Tuple
+
+
+def iter_header_lines(eml_body: str) -> Iterator[str]:
+    """
+    Gives lines of the header block one by one, skipping leading blank lines.
+    Stops at the first blank line after the headers, the rest of the body
+    is never scanned
+    """
+    position = 0
+    length = len(eml_body)
+    started = False
+    while position < length:
+        end = eml_body.find('\n', position)
+        if end == -1:
+            end = length
+        line = eml_body[position:end].rstrip('\r')
+        position = end + 1
+        if not line.strip():
+            if started:
+                return
+            continue
+        started = True
+        yield line
+
+
+def iter_header_fields(eml_body: str) -> Iterator[Tuple[str, str]]:
+    """
+    Gives (lowercase name, unfolded value) pairs of the header block.
+    Continuation lines (starting with a space or a tab) are joined
+    to the previous field, lines that are not fields are skipped
+    """
+    name = None
+    value_parts = []
+    for line in iter_header_lines(eml_body):
+        if line[0] in ' \t':
+            if name is not None:
+                value_parts.append(line)
+            continue
+        if name is not None:
+            yield name, ''.join(value_parts).strip()
+        name, separator, value = line.partition(':')
+        if not separator or not name or ' ' in name or '\t' in name:
+            name = None
+            value_parts = []
+            continue
+        name = name.lower()
+        value_parts = [value]
+    if name is not None:
+        yield name, ''.join(value_parts).strip()
+
+
+def parse_headers(eml_body: str) -> Dict[str, str]:
+    """
+    Gives a dict of lowercase header names and unfolded values in one pass
+    over the header block. The first occurrence of a repeated field wins
+    """
+    headers = {}
+    for name, value in iter_header_fields(eml_body):
+        if name not in headers:
+            headers[name] = value
+    return headers
@@ -1,18 +1,14 @@
-from typing import Optional, Set
+from typing import Dict, Optional, Set
 from re import search, compile
 from datetime import datetime
 from .validation import is_email
+from .encoded_words import get_display_name
 from .sm_exceptions import (SenderException, ReceiversException,
                             DateException, IDException)
 
 
 PATTERNS = {
-    "Sender field": compile(r"From:[\w\W]*?<[\w\W]+?>"),
-    "Receiver field": compile(r"To:[\w\W]+?(?=Subject:|CC:)"),
-    "Date field": compile(r"Date:.+"),
-    "date": compile(r"\w+, \d{1,2} \w+ \d{4} \d{1,2}:\d{1,2}:\d{1,2}"),
-    "Subject field": compile(r"Subject:.+"),
-    "Message-ID field": compile(r"Message-ID: <.+>")
+    "date": compile(r"\w+, \d{1,2} \w+ \d{4} \d{1,2}:\d{1,2}:\d{1,2}")
 }
 
 
@@ -29,33 +25,62 @@ def get_bracket_content(string_with_brackets: str,
     return None
 
 
-def get_sender_from_eml(eml_body: str) -> str:
+def get_receivers(receiver_string: str) -> Set[str]:
+    """
+    Gives a list of receivers from the given string with To field value
+    Raises:
+        ReceiversException
+    """
+    receivers = set()
+    for split_receiver in receiver_string.split(','):
+        receiver = get_bracket_content(split_receiver)
+        if receiver is not None:
+            receivers.add(receiver)
+    if not receivers:
+        raise ReceiversException(f"No receivers found in: {receiver_string}")
+    return receivers
+
+
+def get_datetime(date_string: str) -> datetime:
+    if not match_date_pattern(date_string):
+        raise DateException(f"Date field: {date_string} doesn't match "
+                            f"the pattern {PATTERNS['date']}")
+    after_weekday = date_string.split(',')[1]
+    date = ' '.join(after_weekday.split(' ')[:4])
+    return datetime.strptime(date, " %d %b %Y")
+
+
+def match_date_pattern(date_string: str) -> bool:
+    if search(PATTERNS["date"], date_string):
+        return True
+    return False
+
+
+def get_sender_from_headers(headers: Dict[str, str]) -> str:
     """
-    Gives email sender
+    Gives email sender from the parsed header fields
     Raises:
         SenderException
     """
-    match = search(PATTERNS["Sender field"], eml_body)
-    if not match:
+    if "from" not in headers:
         raise SenderException("Can't find sender!")
 
-    sender_eml = get_bracket_content(match[0])
-    if is_email(sender_eml):
+    sender_eml = get_bracket_content(headers["from"])
+    if sender_eml is not None and is_email(sender_eml):
         return sender_eml
     raise SenderException(f"Sender field is not an email: {sender_eml}")
 
 
-def get_receivers_from_eml(eml_body: str) -> Set[str]:
+def get_receivers_from_headers(headers: Dict[str, str]) -> Set[str]:
     """
-    Gives a list of email receivers
+    Gives a set of email receivers from the parsed header fields
     Raises:
         ReceiversException
     """
-    match = search(PATTERNS["Receiver field"], eml_body)
-    if not match:
+    if "to" not in headers:
         raise ReceiversException("Can't find receivers!")
 
-    receivers = get_receivers(match[0])
+    receivers = get_receivers(headers["to"])
 
     for receiver in receivers:
         if not is_email(receiver):
@@ -63,75 +88,66 @@ def get_receivers_from_eml(eml_body: str) -> Set[str]:
     return receivers
 
 
-def get_receivers(receiver_string: str) -> Set[str]:
+def get_subject_from_headers(headers: Dict[str, str]) -> str:
     """
-    Gives a list of receivers from the given string with To field value
-    Raises:
-        ReceiversException
+    Gives subject or empty string if not found from the parsed header fields
     """
-    receivers = set()
-    for split_receiver in receiver_string.split(','):
-        receiver = get_bracket_content(split_receiver)
-        if receiver is not None:
-            receivers.add(receiver)
-    if not receivers:
-        raise ReceiversException(f"No receivers found in: {receiver_string}")
-    return receivers
+    return headers.get("subject", '')
 
 
-def get_subject_from_eml(eml_body: str) -> str:
+def get_date_from_headers(headers: Dict[str, str]) -> datetime:
     """
-    Gives subject or empty string if not found of the eml
+    Gives datetime date from the parsed header fields
+    Raises:
+        DateException
     """
-    match = search(PATTERNS["Subject field"], eml_body)
-    if match:
-        return get_subject(match[0])
-    return ''
-
+    if "date" not in headers:
+        raise DateException("Can't find date!")
 
-def get_subject(subject_field: str) -> str:
-    return subject_field.replace("Subject: ", '')
+    return get_datetime(headers["date"])
 
 
-def get_date_from_eml(eml_body: str) -> datetime:
+def get_message_id_from_headers(headers: Dict[str, str]) -> str:
     """
-    Gives datetime date of the eml
+    Gives Message-id from the parsed header fields
     Raises:
-        DateException
+        IDException
     """
-    match = search(PATTERNS["Date field"], eml_body)
-    if not match:
-        raise DateException("Can't find date!")
-
-    return get_datetime(match[0])
-
+    if "message-id" not in headers:
+        raise IDException("Can't find Message-ID!")
 
-def get_datetime(date_string: str) -> datetime:
-    if not match_date_pattern(date_string):
-        raise DateException(f"Date field: {date_string} doesn't match "
-                            f"the pattern {PATTERNS['date']}")
-    after_weekday = date_string.split(',')[1]
-    date = ' '.join(after_weekday.split(' ')[:4])
-    return datetime.strptime(date, " %d %b %Y")
+    message_id = get_bracket_content(headers["message-id"])
+    if message_id is not None:
+        return message_id
+    raise IDException(f"Message-ID field error. "
+                      f"Field value: {headers['message-id']}")
 
 
-def match_date_pattern(date_string: str) -> bool:
-    if search(PATTERNS["date"], date_string):
-        return True
-    return False
+def get_sender_name_from_headers(headers: Dict[str, str]) -> str:
+    """
+    Gives decoded display name of the sender or empty string if not set
+    Raises:
+        SenderException
+    """
+    if "from" not in headers:
+        raise SenderException("Can't find sender!")
+    return get_display_name(headers["from"])
 
 
-def get_message_id_from_eml(eml_body: str) -> str:
+def get_receiver_names_from_headers(
+        headers: Dict[str, str]) -> Dict[str, str]:
     """
-    Gives Message-id date of the eml
+    Gives decoded display names of receivers by their emails,
+    empty string for receivers without a name
     Raises:
-        IDException
+        ReceiversException
     """
-    match = search(PATTERNS["Message-ID field"], eml_body)
-    if not match:
-        raise IDException("Can't find Message-ID!")
+    if "to" not in headers:
+        raise ReceiversException("Can't find receivers!")
 
-    message_id = get_bracket_content(match[0])
-    if message_id is not None:
-        return message_id
-    raise IDException(f"Message-ID field error. Field value: {match[0]}")
+    names = {}
+    for split_receiver in headers["to"].split(','):
+        receiver = get_bracket_content(split_receiver)
+        if receiver is not None:
+            names[receiver] = get_display_name(split_receiver)
+    return names
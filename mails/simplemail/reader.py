@@ -0,0 +1,104 @@
+from pathlib import Path
+from re import compile, IGNORECASE
+from typing import BinaryIO, Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+HEADER_CHUNK_SIZE = 64 * 1024
+MAX_HEADER_SIZE = 1024 * 1024
+
+FIRST_CONTENT = compile(rb"\S")
+BLANK_LINE = compile(rb"\n[ \t]*\r?\n")
+CHARSET = compile(rb"charset\s*=\s*\"?([\w\-.:]+)", IGNORECASE)
+
+
+def find_header_end(data: Buffer, start: int = 0,
+                    end: Optional[int] = None) -> int:
+    """
+    Gives position of the blank line that ends the header block starting
+    at start, or -1 if the header block is not finished before end.
+    Leading blank lines are not counted as the end of the headers.
+    Data is searched in place, so it may be an mmap
+    """
+    if end is None:
+        end = len(data)
+    first_content = FIRST_CONTENT.search(data, start, end)
+    if not first_content:
+        return -1
+    blank_line = BLANK_LINE.search(data, first_content.start(), end)
+    if not blank_line:
+        return -1
+    return blank_line.start() + 1
+
+
+def cut_header_block(data: Buffer, max_size: int = MAX_HEADER_SIZE) -> bytes:
+    """
+    Gives the header block of a message that is already in memory.
+    Any buffer is accepted, only the header block is copied
+    """
+    data = memoryview(data).cast("B")[:max_size]
+    header_end = find_header_end(data)
+    if header_end != -1:
+        return bytes(data[:header_end])
+    return bytes(data)
+
+
+def read_header_stream(eml: BinaryIO,
+                       chunk_size: int = HEADER_CHUNK_SIZE,
+                       max_size: int = MAX_HEADER_SIZE) -> bytes:
+    """
+    Reads a binary stream in chunks until the end of the header block,
+    the rest of the message is never read. Gives at most max_size bytes
+    """
+    data = b''
+    while len(data) < max_size:
+        chunk = eml.read(min(chunk_size, max_size - len(data)))
+        if not chunk:
+            break
+        data += chunk
+        header_end = find_header_end(data)
+        if header_end != -1:
+            return data[:header_end]
+    return data
+
+
+def read_header_block(path_to_eml: Path,
+                      chunk_size: int = HEADER_CHUNK_SIZE,
+                      max_size: int = MAX_HEADER_SIZE) -> bytes:
+    with open(path_to_eml, 'rb') as eml:
+        return read_header_stream(eml, chunk_size, max_size)
+
+
+def get_charset(header_block: bytes) -> Optional[str]:
+    match = CHARSET.search(header_block)
+    if match:
+        return match[1].decode('ascii')
+    return None
+
+
+def decode_header_block(header_block: bytes) -> str:
+    """
+    Decodes headers as utf-8, falls back to the charset declared
+    in the headers and then to latin-1 that never fails
+    """
+    try:
+        return header_block.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    charset = get_charset(header_block)
+    if charset is not None:
+        try:
+            return header_block.decode(charset)
+        except (LookupError, UnicodeDecodeError):
+            pass
+    return header_block.decode('latin-1')
+
+
+def get_header_text(eml: Union[Path, Buffer]) -> str:
+    """
+    Gives decoded headers of an eml file or of a message in memory
+    """
+    if isinstance(eml, BUFFER_TYPES):
+        return decode_header_block(cut_header_block(eml))
+    return decode_header_block(read_header_block(eml))
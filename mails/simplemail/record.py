@@ -0,0 +1,211 @@
+from datetime import datetime
+from pathlib import Path
+from sys import intern
+from typing import Dict, Optional, Set, Tuple
+from .headers import iter_header_fields
+from .reader import get_header_text
+from .re_search import (get_sender_from_headers, get_receivers_from_headers,
+                        get_date_from_headers, get_message_id_from_headers,
+                        get_subject_from_headers,
+                        get_sender_name_from_headers,
+                        get_receiver_names_from_headers)
+
+RECORD_FIELDS = ("from", "to", "subject", "date", "message-id")
+NO_HEADERS: Dict[str, str] = {}
+
+
+def get_record_headers(header_text: str) -> Dict[str, str]:
+    """
+    Gives only the header fields an EmailRecord needs
+    """
+    headers = {}
+    for name, value in iter_header_fields(header_text):
+        if name in RECORD_FIELDS and name not in headers:
+            headers[name] = value
+    return headers
+
+
+class EmailRecord():
+    """
+    Compact email metadata. Fields are parsed on first access and cached,
+    the raw header value of a field is dropped as soon as it is parsed.
+    Date is kept as a day ordinal, addresses are interned
+    """
+    __slots__ = ("_headers", "_sender", "_receivers", "_subject",
+                 "_date", "_message_id")
+
+    def __init__(self, header_text: str):
+        self._headers = get_record_headers(header_text) or NO_HEADERS
+        self._sender: Optional[str] = None
+        self._receivers: Optional[Tuple[str, ...]] = None
+        self._subject: Optional[str] = None
+        self._date: Optional[int] = None
+        self._message_id: Optional[str] = None
+
+    @classmethod
+    def from_path(cls, path_to_eml: Path) -> "EmailRecord":
+        return cls(get_header_text(path_to_eml))
+
+    def _release(self, field: str) -> None:
+        if field in self._headers:
+            del self._headers[field]
+        if not self._headers:
+            self._headers = NO_HEADERS
+
+    @property
+    def sender(self) -> str:
+        """
+        Raises:
+            SenderException
+        """
+        if self._sender is None:
+            self._sender = intern(get_sender_from_headers(self._headers))
+            self._release("from")
+        return self._sender
+
+    @property
+    def receivers(self) -> Set[str]:
+        """
+        Raises:
+            ReceiversException
+        """
+        if self._receivers is None:
+            receivers = get_receivers_from_headers(self._headers)
+            self._receivers = tuple(sorted(intern(receiver)
+                                           for receiver in receivers))
+            self._release("to")
+        return set(self._receivers)
+
+    @property
+    def subject(self) -> str:
+        if self._subject is None:
+            self._subject = get_subject_from_headers(self._headers)
+            self._release("subject")
+        return self._subject
+
+    @property
+    def date(self) -> datetime:
+        """
+        Raises:
+            DateException
+        """
+        if self._date is None:
+            self._date = get_date_from_headers(self._headers).toordinal()
+            self._release("date")
+        return datetime.fromordinal(self._date)
+
+    @property
+    def message_id(self) -> str:
+        """
+        Raises:
+            IDException
+        """
+        if self._message_id is None:
+            self._message_id = get_message_id_from_headers(self._headers)
+            self._release("message-id")
+        return self._message_id
+
+    def parse(self) -> "EmailRecord":
+        """
+        Parses all fields at once, the raw header text is dropped after it
+        Raises:
+            SimpleMailException
+        """
+        self.get_sender()
+        self.get_receivers()
+        self.get_subject()
+        self.get_date()
+        self.get_id()
+        return self
+
+    def get_id(self) -> str:
+        return self.message_id
+
+    def get_sender(self) -> str:
+        return self.sender
+
+    def get_receivers(self) -> Set[str]:
+        return self.receivers
+
+    def get_subject(self) -> str:
+        return self.subject
+
+    def get_date(self) -> str:
+        return self.date.strftime("%d.%m.%Y")
+
+    def __str__(self):
+        return f"Email message. From:{self.sender}, " \
+               f"To: {*self.receivers, }, " \
+               f"date: {self.date}, message id: {self.message_id}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class NamedEmailRecord(EmailRecord):
+    """
+    EmailRecord that also gives decoded display names of the sender and
+    receivers. Names cost a decode per message, so records without them
+    are used unless an output needs names. Raw From and To values are
+    kept until both the address and the name are parsed
+    """
+    __slots__ = ("_sender_name", "_receiver_names")
+
+    def __init__(self, header_text: str):
+        super().__init__(header_text)
+        self._sender_name: Optional[str] = None
+        self._receiver_names: Optional[Tuple[Tuple[str, str], ...]] = None
+
+    def _release(self, field: str) -> None:
+        if field == "from" and \
+                (self._sender is None or self._sender_name is None):
+            return
+        if field == "to" and \
+                (self._receivers is None or self._receiver_names is None):
+            return
+        super()._release(field)
+
+    @property
+    def sender_name(self) -> str:
+        """
+        Decoded display name of the sender, empty if not set
+        Raises:
+            SenderException
+        """
+        if self._sender_name is None:
+            self._sender_name = intern(
+                get_sender_name_from_headers(self._headers))
+            self._release("from")
+        return self._sender_name
+
+    @property
+    def receiver_names(self) -> Dict[str, str]:
+        """
+        Decoded display names of receivers by their emails
+        Raises:
+            ReceiversException
+        """
+        if self._receiver_names is None:
+            names = get_receiver_names_from_headers(self._headers)
+            self._receiver_names = tuple(
+                (intern(receiver), intern(name))
+                for receiver, name in sorted(names.items()))
+            self._release("to")
+        return dict(self._receiver_names)
+
+    def parse(self) -> "NamedEmailRecord":
+        """
+        Parses all fields with the display names
+        Raises:
+            SimpleMailException
+        """
+        super().parse()
+        self.get_sender_name()
+        self.get_receiver_names()
+        return self
+
+    def get_sender_name(self) -> str:
+        return self.sender_name
+
+    def get_receiver_names(self) -> Dict[str, str]:
+        return self.receiver_names
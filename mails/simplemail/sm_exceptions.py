@@ -22,3 +22,7 @@ class ThemeException(SimpleMailException):
 
 class IDException(SimpleMailException):
     pass
+
+
+class DuplicateException(SimpleMailException):
+    pass
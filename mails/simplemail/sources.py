@@ -0,0 +1,125 @@
+import mmap
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+from .reader import MAX_HEADER_SIZE, find_header_end, read_header_stream
+from .walker import WalkOptions, is_included, walk_entries
+
+MBOX_SEPARATOR = b"From "
+MAILDIR_SUBFOLDERS = ("cur", "new")
+
+# A message is its name for reports and either a path to an eml file,
+# that is read by the parser, or header bytes streamed out of a container
+Message = Tuple[str, Union[Path, bytes]]
+
+
+def is_maildir(folder: Path) -> bool:
+    return all((folder / name).is_dir() for name in MAILDIR_SUBFOLDERS)
+
+
+def is_mbox(path: Path) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(len(MBOX_SEPARATOR)) == MBOX_SEPARATOR
+
+
+def iter_folder_entries(folder: Path, options: WalkOptions = WalkOptions()
+                        ) -> Iterator[os.DirEntry]:
+    """
+    Gives directory entries of files of a folder tree of eml files
+    or messages of a Maildir with its subfolders
+    """
+    if not is_maildir(folder):
+        yield from walk_entries(folder, options)
+        return
+
+    flat_options = options._replace(max_depth=0)
+    for name in MAILDIR_SUBFOLDERS:
+        yield from walk_entries(folder / name, flat_options)
+    with os.scandir(folder) as entries:
+        subfolders = [Path(entry.path) for entry in entries
+                      if entry.name.startswith('.')
+                      and entry.is_dir(follow_symlinks=False)]
+    for subfolder in subfolders:
+        if is_maildir(subfolder):
+            yield from iter_folder_entries(subfolder, options)
+
+
+def iter_folder_files(folder: Path,
+                      options: WalkOptions = WalkOptions()) -> Iterator[Path]:
+    for entry in iter_folder_entries(folder, options):
+        yield Path(entry.path)
+
+
+def iter_mbox(path: Path) -> Iterator[Message]:
+    """
+    Gives header blocks of mbox messages. The file is memory mapped and
+    searched in place, only header blocks are copied out of it
+    """
+    if path.stat().st_size == 0:
+        return
+    with open(path, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        number = 1
+        while True:
+            line_end = data.find(b"\n", start)
+            if line_end == -1:
+                return
+            header_start = line_end + 1
+            next_start = data.find(b"\n" + MBOX_SEPARATOR, header_start)
+            end = len(data) if next_start == -1 else next_start + 1
+            limit = min(end, header_start + MAX_HEADER_SIZE)
+            header_end = find_header_end(data, header_start, limit)
+            if header_end == -1:
+                header_end = limit
+            yield f"{path}:{number}", data[header_start:header_end]
+            if next_start == -1:
+                return
+            start = next_start + 1
+            number += 1
+
+
+def iter_zip(path: Path,
+             options: WalkOptions = WalkOptions()) -> Iterator[Message]:
+    with zipfile.ZipFile(path) as archive:
+        for member in archive.infolist():
+            if member.is_dir() or not is_included(member.filename, options):
+                continue
+            with archive.open(member) as eml:
+                yield f"{path}:{member.filename}", read_header_stream(eml)
+
+
+def iter_tar(path: Path,
+             options: WalkOptions = WalkOptions()) -> Iterator[Message]:
+    """
+    Reads the archive as a stream, so compressed tars are decompressed
+    once and never extracted
+    """
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if not member.isfile() or not is_included(member.name, options):
+                continue
+            eml = archive.extractfile(member)
+            yield f"{path}:{member.name}", read_header_stream(eml)
+
+
+def iter_messages(source: Path,
+                  options: WalkOptions = WalkOptions()) -> Iterator[Message]:
+    """
+    Gives messages of a folder, a Maildir, an mbox file, a zip or tar(.gz)
+    archive or a single eml file. Include and exclude globs are applied
+    to files of folders and to members of archives
+    """
+    if source.is_dir():
+        for element in iter_folder_files(source, options):
+            yield str(element), element
+    elif zipfile.is_zipfile(source):
+        yield from iter_zip(source, options)
+    elif tarfile.is_tarfile(source):
+        yield from iter_tar(source, options)
+    elif is_mbox(source):
+        yield from iter_mbox(source)
+    else:
+        yield str(source), source
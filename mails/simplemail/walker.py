@@ -0,0 +1,58 @@
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterator, NamedTuple, Tuple
+
+
+class WalkOptions(NamedTuple):
+    """
+    Glob patterns are matched against file names and paths relative
+    to the walked folder. Negative max_depth means no depth limit,
+    0 means only the folder itself
+    """
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    max_depth: int = 0
+
+
+def matches(relative_path: str, patterns: Tuple[str, ...]) -> bool:
+    name = relative_path.rsplit('/', 1)[-1]
+    return any(fnmatch(relative_path, pattern) or fnmatch(name, pattern)
+               for pattern in patterns)
+
+
+def is_included(relative_path: str, options: WalkOptions) -> bool:
+    if options.include and not matches(relative_path, options.include):
+        return False
+    return not matches(relative_path, options.exclude)
+
+
+def walk_entries(folder: Path, options: WalkOptions = WalkOptions()
+                 ) -> Iterator[os.DirEntry]:
+    """
+    Gives directory entries of files of the folder and its subfolders down
+    to max_depth. Uses os.scandir, so file types come from the directory
+    listing without a stat call per entry and entry.stat() is cached.
+    Excluded folders and symlinks to folders are not entered
+    """
+    stack = [(str(folder), '', 0)]
+    while stack:
+        path, prefix, depth = stack.pop()
+        subfolders = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                relative_path = f"{prefix}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if (options.max_depth < 0 or depth < options.max_depth) \
+                            and not matches(relative_path, options.exclude):
+                        subfolders.append((entry.path, f"{relative_path}/",
+                                           depth + 1))
+                elif entry.is_file() and is_included(relative_path, options):
+                    yield entry
+        stack.extend(reversed(subfolders))
+
+
+def walk_files(folder: Path,
+               options: WalkOptions = WalkOptions()) -> Iterator[Path]:
+    for entry in walk_entries(folder, options):
+        yield Path(entry.path)
@@ -0,0 +1,140 @@
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from re import compile
+from typing import Iterable, Iterator, List, NamedTuple, Set
+from metadata_store import to_iso_date
+from simplemail.encoded_words import decode_header_value
+
+INDEX_BATCH_SIZE = 10000
+PREFIX_WILDCARD = '*'
+LAST_CHARACTER = '\U0010ffff'
+
+WORD = compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    message_id TEXT NOT NULL UNIQUE,
+    date TEXT NOT NULL,
+    subject TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    PRIMARY KEY (term, document_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_document_id ON postings(document_id);
+CREATE TEMP TABLE IF NOT EXISTS seen (message_id TEXT PRIMARY KEY);
+"""
+
+
+class SearchResult(NamedTuple):
+    date: str
+    message_id: str
+    subject: str
+
+
+def tokenize(subject: str) -> Set[str]:
+    """
+    Gives lowercase words of a decoded subject
+    """
+    return set(WORD.findall(subject.lower()))
+
+
+class SubjectIndex():
+    """
+    On-disk inverted index of email subjects in sqlite: a posting of every
+    subject word to the Message-ID and date of the email. Emails already
+    in the index are skipped, so only new emails are tokenized
+    """
+    def __init__(self, path: Path):
+        self.connection = sqlite3.connect(str(path))
+        self.connection.executescript(SCHEMA)
+
+    def index_emails(self, emails: Iterable) -> Iterator:
+        """
+        Gives the emails back while adding new ones to the index
+        in transactions of INDEX_BATCH_SIZE emails
+        """
+        emails = iter(emails)
+        batch = list(islice(emails, INDEX_BATCH_SIZE))
+        while batch:
+            with self.connection:
+                self._insert(batch)
+            yield from batch
+            batch = list(islice(emails, INDEX_BATCH_SIZE))
+
+    def add_emails(self, emails: Iterable) -> None:
+        for _ in self.index_emails(emails):
+            pass
+
+    def _insert(self, batch: List) -> None:
+        cursor = self.connection.cursor()
+        cursor.executemany("INSERT OR IGNORE INTO seen VALUES (?)",
+                           [(email.get_id(),) for email in batch])
+        for email in batch:
+            subject = decode_header_value(email.get_subject())
+            cursor.execute("INSERT OR IGNORE INTO documents "
+                           "(message_id, date, subject) VALUES (?, ?, ?)",
+                           (email.get_id(), to_iso_date(email.get_date()),
+                            subject))
+            if not cursor.rowcount:
+                continue
+            document_id = cursor.lastrowid
+            cursor.executemany("INSERT INTO postings VALUES (?, ?)",
+                               [(term, document_id)
+                                for term in tokenize(subject)])
+
+    def remove_unseen(self) -> int:
+        """
+        Drops emails that were not given to index_emails since the index
+        was opened, use it after indexing all emails of the mailbox.
+        Gives the number of dropped emails
+        """
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM postings WHERE document_id IN (SELECT id FROM "
+                "documents WHERE message_id NOT IN (SELECT message_id "
+                "FROM seen))")
+            cursor = self.connection.execute(
+                "DELETE FROM documents WHERE message_id NOT IN "
+                "(SELECT message_id FROM seen)")
+        return cursor.rowcount
+
+    def search(self, query: List[str],
+               limit: int = -1) -> Iterator[SearchResult]:
+        """
+        Gives emails whose subjects have all query terms ordered by date.
+        A term ending with * matches every word starting with it
+        """
+        subqueries = []
+        parameters = []
+        for term in query:
+            term = term.lower()
+            if term.endswith(PREFIX_WILDCARD):
+                prefix = term.rstrip(PREFIX_WILDCARD)
+                subqueries.append("SELECT document_id FROM postings "
+                                  "WHERE term >= ? AND term < ?")
+                parameters.extend((prefix, prefix + LAST_CHARACTER))
+            else:
+                subqueries.append("SELECT document_id FROM postings "
+                                  "WHERE term = ?")
+                parameters.append(term)
+        if not subqueries:
+            return
+        sql = "SELECT strftime('%d.%m.%Y', date), message_id, subject " \
+              "FROM documents WHERE id IN " \
+              f"({' INTERSECT '.join(subqueries)}) " \
+              "ORDER BY date, id LIMIT ?"
+        for row in self.connection.execute(sql, parameters + [limit]):
+            yield SearchResult(*row)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "SubjectIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
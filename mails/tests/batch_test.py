@@ -0,0 +1,32 @@
+from concurrent.futures import ProcessPoolExecutor
+from simplemail import EmailRecord, parse_many
+from simplemail.sm_exceptions import SenderException
+from tests.test_data import EML_BODIES
+
+MESSAGES = [EML_BODIES[0].encode(),
+            bytearray(EML_BODIES[1].encode()),
+            memoryview(EML_BODIES[2].encode())]
+
+
+def check_results(results):
+    assert len(results) == 3
+    assert isinstance(results[0], EmailRecord)
+    assert results[0].get_sender() == "sender_user@some_mail.ru"
+    assert results[1].get_id() == \
+        "2e3625cb8f0246979ae67456676f51cb@some_mail.ru"
+    assert isinstance(results[2], SenderException)
+
+
+def test_parse_many_takes_buffers():
+    check_results(parse_many(MESSAGES))
+    assert parse_many([]) == []
+
+
+def test_parse_many_with_workers():
+    check_results(parse_many(iter(MESSAGES), workers=2, chunk_size=1))
+
+
+def test_parse_many_reuses_executor():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        check_results(parse_many(MESSAGES, executor=executor))
+        check_results(parse_many(MESSAGES, executor=executor, chunk_size=2))
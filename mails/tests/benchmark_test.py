@@ -0,0 +1,19 @@
+import random
+from benchmark import generate_corpus, generate_email
+from simplemail import Email
+from usecases import get_emails
+
+
+def test_generated_email_is_parsed(tmp_path):
+    eml = tmp_path / "mail.eml"
+    eml.write_text(generate_email(random.Random(1), extra_headers=30,
+                                  attachment_size=1000))
+    email = Email(eml)
+    assert email.get_sender().endswith("@some_mail.ru")
+    assert len(email.get_id()) == 45
+
+
+def test_generate_corpus(tmp_path):
+    size = generate_corpus(tmp_path, 50, malformed_rate=0.2, seed=2)
+    assert size == sum(path.stat().st_size for path in tmp_path.iterdir())
+    assert 25 < len(get_emails(tmp_path)) < 50
@@ -0,0 +1,45 @@
+import pytest
+from datetime import date
+from manifest import StoredEmail
+from columnar_export import save_to_columnar
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+EMAILS = [StoredEmail("13.04.2021", "1@a.ru", "a@a.ru", ["c@c.ru", "b@b.ru"],
+                      "Subject; with separators"),
+          StoredEmail("01.05.2021", "2@a.ru", "b@b.ru", ["a@a.ru"]),
+          StoredEmail("02.05.2021", "3@a.ru", "c@c.ru", [], "Hi")]
+
+
+def check_table(table):
+    assert table.column("date").to_pylist() == \
+        [date(2021, 4, 13), date(2021, 5, 1), date(2021, 5, 2)]
+    assert table.column("receivers").to_pylist()[0] == ["b@b.ru", "c@c.ru"]
+    assert table.column("subject").to_pylist()[0] == \
+        "Subject; with separators"
+    assert table.column("message_id").to_pylist() == \
+        ["1@a.ru", "2@a.ru", "3@a.ru"]
+
+
+def test_save_to_parquet_in_row_groups(tmp_path):
+    path = tmp_path / "metadata.parquet"
+    save_to_columnar(str(path), iter(EMAILS), "parquet", row_group_size=2)
+    parquet_file = pyarrow.parquet.ParquetFile(str(path))
+    assert parquet_file.num_row_groups == 2
+    check_table(parquet_file.read())
+
+
+def test_save_to_arrow(tmp_path):
+    path = tmp_path / "metadata.arrow"
+    save_to_columnar(str(path), EMAILS, "arrow", row_group_size=2)
+    reader = pyarrow.ipc.open_file(str(path))
+    assert reader.num_record_batches == 2
+    check_table(reader.read_all())
+
+
+def test_save_nothing(tmp_path):
+    path = tmp_path / "metadata.parquet"
+    save_to_columnar(str(path), [], "parquet")
+    assert pyarrow.parquet.read_table(str(path)).num_rows == 0
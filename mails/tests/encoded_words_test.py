@@ -0,0 +1,54 @@
+import pytest
+from simplemail import EmailRecord, NamedEmailRecord
+from simplemail.encoded_words import (decode_encoded_word,
+                                      decode_header_value, get_display_name)
+from tests.test_data import EML_BODIES
+
+
+@pytest.mark.parametrize("word, answer",
+                         [("=?windows-1251?B?yuDr6O3o7SDA7eDy7uvo6SDP4OLr7uLo9w==?=",
+                           "Калинин Анатолий Павлович"),
+                          ("=?utf-8?Q?=D0=98=D0=B2=D0=B0=D0=BD_Petrov?=",
+                           "Иван Petrov"),
+                          ("=?unknown-charset?B?YWJj?=",
+                           "=?unknown-charset?B?YWJj?="),
+                          ("not encoded", "not encoded")])
+def test_decode_encoded_word(word, answer):
+    assert decode_encoded_word(word) == answer
+
+
+def test_decode_header_value_joins_adjacent_words():
+    assert decode_header_value("=?utf-8?Q?a?= =?utf-8?Q?b?= c") == "ab c"
+
+
+@pytest.mark.parametrize("address, answer",
+                         [('"\'user@some_mail.ru\'" <user@some_mail.ru>',
+                           "'user@some_mail.ru'"),
+                          ("<user@some_mail.ru>", ''),
+                          ("user@some_mail.ru", '')])
+def test_get_display_name(address, answer):
+    assert get_display_name(address) == answer
+
+
+def test_record_display_names():
+    record = NamedEmailRecord(EML_BODIES[1]).parse()
+    assert record.get_sender_name() == "Калинин Анатолий Павлович"
+    assert record.get_receiver_names() == {
+        "receiver_user@some_mail.ru": "'receiver_user@some_mail.ru'",
+        "receiver_user@some_mail.com": "'receiver_user@some_mail.com'"}
+    assert record._headers == {}
+
+
+def test_decoding_is_cached():
+    decode_encoded_word.cache_clear()
+    for _ in range(3):
+        NamedEmailRecord(EML_BODIES[0]).get_sender_name()
+    assert decode_encoded_word.cache_info().hits == 2
+
+
+def test_record_without_names_drops_raw_addresses():
+    record = EmailRecord(EML_BODIES[1])
+    record.get_sender()
+    record.get_receivers()
+    assert "from" not in record._headers and "to" not in record._headers
+    assert not hasattr(record, "get_sender_name")
@@ -0,0 +1,37 @@
+import random
+from external_sort import sort_by_date
+from manifest import StoredEmail
+
+
+def get_emails(count):
+    rng = random.Random(0)
+    return [StoredEmail(f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}."
+                        f"{rng.randint(2019, 2021)}", str(number),
+                        "a@b.ru", ["c@d.ru"])
+            for number in range(count)]
+
+
+def get_key(email):
+    day, month, year = email.get_date().split('.')
+    return year, month, day
+
+
+def test_sort_by_date_in_memory():
+    emails = get_emails(100)
+    assert list(sort_by_date(emails)) == sorted(emails, key=get_key)
+
+
+def test_sort_by_date_merges_spilled_runs(tmp_path):
+    emails = get_emails(1000)
+    result = list(sort_by_date(iter(emails), run_size=64,
+                               temp_dir=str(tmp_path)))
+    assert result == sorted(emails, key=get_key)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sort_by_date_merges_in_bounded_passes(tmp_path):
+    emails = get_emails(1000)
+    result = list(sort_by_date(iter(emails), run_size=10,
+                               temp_dir=str(tmp_path), merge_width=3))
+    assert result == sorted(emails, key=get_key)
+    assert list(tmp_path.iterdir()) == []
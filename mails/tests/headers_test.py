@@ -0,0 +1,52 @@
+import pytest
+from datetime import datetime
+from simplemail.headers import parse_headers
+from simplemail.re_search import (get_sender_from_headers,
+                                  get_receivers_from_headers,
+                                  get_date_from_headers,
+                                  get_message_id_from_headers)
+from simplemail.sm_exceptions import SenderException
+from tests.test_data import EML_BODIES
+
+
+def test_parse_headers_unfolds_continuation_lines():
+    headers = parse_headers(EML_BODIES[1])
+    assert headers["from"] == "=?windows-1251?B?yuDr6O3o7SDA7eDy7uvo6SDP4OLr7uLo9w==?=" \
+                              "\t<sender_user@some_mail.ru>"
+    assert headers["subject"] == "Subject string"
+    assert headers["received"].endswith("Mon, 19 Apr 2021 10:08:42 +0300")
+
+
+def test_parse_headers_stops_at_blank_line():
+    body = "From: <a@b.ru>\r\nSubject: first\r\n\r\nSubject: second\r\nDate: x"
+    assert parse_headers(body) == {"from": "<a@b.ru>", "subject": "first"}
+
+
+def test_parse_headers_skips_malformed_lines():
+    assert parse_headers(EML_BODIES[2]) == {}
+    assert parse_headers("From a@b.ru Tue Apr 13 07:45:43 2021\nTo: <c@d.ru>") \
+        == {"to": "<c@d.ru>"}
+
+
+@pytest.mark.parametrize("eml_body, receivers, date, message_id",
+                         [(EML_BODIES[0],
+                           {"receiver_user@some_mail.ru"},
+                           datetime(2021, 4, 13),
+                           "f4c542824f454760b046ba39cbeceb2e@some_mail.ru"),
+                          (EML_BODIES[1],
+                           {"receiver_user@some_mail.ru",
+                            "receiver_user@some_mail.com"},
+                           datetime(2021, 4, 19),
+                           "2e3625cb8f0246979ae67456676f51cb@some_mail.ru")],
+                         ids=["txt file", "eml file"])
+def test_fields_from_headers(eml_body, receivers, date, message_id):
+    headers = parse_headers(eml_body)
+    assert get_sender_from_headers(headers) == "sender_user@some_mail.ru"
+    assert get_receivers_from_headers(headers) == receivers
+    assert get_date_from_headers(headers) == date
+    assert get_message_id_from_headers(headers) == message_id
+
+
+def test_missing_sender():
+    with pytest.raises(SenderException):
+        get_sender_from_headers(parse_headers(EML_BODIES[2]))
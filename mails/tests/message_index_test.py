@@ -0,0 +1,80 @@
+from message_index import BloomFilter, MessageIdIndex
+from usecases import iter_emails, save_to_metadata, save_to_metadata_old
+from tests.test_data import EML_BODIES
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000)
+    for number in range(1000):
+        bloom.add(f"{number}@some_mail.ru")
+    assert all(f"{number}@some_mail.ru" in bloom for number in range(1000))
+    false_positives = sum(f"{number}@other_mail.ru" in bloom
+                          for number in range(10000))
+    assert false_positives < 300
+
+
+def test_index_is_kept_between_runs(tmp_path):
+    with MessageIdIndex(tmp_path / "ids", capacity=1000) as index:
+        assert index.add("a@b.ru")
+        assert not index.add("a@b.ru")
+    with MessageIdIndex(tmp_path / "ids", capacity=1000) as index:
+        assert "a@b.ru" in index
+        assert "c@d.ru" not in index
+        assert not index.add("a@b.ru")
+
+
+def test_index_is_rebuilt_after_crash(tmp_path):
+    index = MessageIdIndex(tmp_path / "ids", capacity=1000)
+    index.add("a@b.ru")
+    index.connection.commit()
+    index.connection.close()
+    with MessageIdIndex(tmp_path / "ids", capacity=1000) as index:
+        assert "a@b.ru" in index
+
+
+def test_iter_emails_skips_duplicates(tmp_path, capsys):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    for number, body in enumerate(EML_BODIES * 2):
+        (folder / f"{number}.eml").write_text(body)
+    for workers in (1, 2):
+        index_path = tmp_path / f"ids{workers}"
+        with MessageIdIndex(index_path, capacity=1000) as index:
+            emails = list(iter_emails(folder, workers, index))
+        assert len(emails) == 2
+        assert capsys.readouterr().out.count("Duplicate Message-ID") == 2
+
+
+def test_dedup_runs_keep_metadata(tmp_path, capsys):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    for number, body in enumerate(EML_BODIES):
+        (folder / f"{number}.eml").write_text(body)
+    metadata = tmp_path / "metadata.txt"
+    old_metadata = tmp_path / "metadata_old.txt"
+    for _ in range(2):
+        with MessageIdIndex(tmp_path / "ids", capacity=1000) as index:
+            save_to_metadata(str(metadata), iter_emails(folder, index=index),
+                             append=True)
+        with MessageIdIndex(tmp_path / "old_ids", capacity=1000) as index:
+            save_to_metadata_old(str(old_metadata),
+                                 iter_emails(folder, index=index),
+                                 append=True)
+    assert len(metadata.read_text().splitlines()) == 2
+    (folder / "2.eml").write_text(EML_BODIES[1].replace("2e3625", "ffffff"))
+    with MessageIdIndex(tmp_path / "old_ids", capacity=1000) as index:
+        save_to_metadata_old(str(old_metadata),
+                             iter_emails(folder, index=index), append=True)
+    assert old_metadata.read_text().count("Message-ID") == 3
+    assert "3)\nMessage-ID: ffffff" in old_metadata.read_text()
+
+
+def test_uncommitted_ids_are_dropped(tmp_path):
+    index = MessageIdIndex(tmp_path / "ids", capacity=1000)
+    index.add("a@b.ru")
+    index.commit()
+    index.add("c@d.ru")
+    index.connection.close()
+    with MessageIdIndex(tmp_path / "ids", capacity=1000) as index:
+        assert "a@b.ru" in index
+        assert "c@d.ru" not in index
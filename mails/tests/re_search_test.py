@@ -1,5 +1,8 @@
 import pytest
-from simplemail.re_search import (get_bracket_content, sender_from_eml)
+from simplemail.headers import parse_headers
+from simplemail.re_search import (get_bracket_content,
+                                  get_sender_from_headers)
+from simplemail.sm_exceptions import SenderException
 from tests.test_data import get_sender_test_data
 
 
@@ -20,6 +23,10 @@ eml_bodies, answers, ids = get_sender_test_data()
 @pytest.mark.parametrize("eml_body, answer",
                          [(b, a) for b, a in zip(eml_bodies, answers)],
                          ids=ids)
-def test_get_bracket_content(eml_body, answer):
-    res = sender_from_eml(eml_body)
-    assert res == answer
+def test_get_sender_from_headers(eml_body, answer):
+    headers = parse_headers(eml_body)
+    if answer is None:
+        with pytest.raises(SenderException):
+            get_sender_from_headers(headers)
+    else:
+        assert get_sender_from_headers(headers) == answer
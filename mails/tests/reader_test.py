@@ -0,0 +1,43 @@
+import pytest
+from simplemail.reader import (find_header_end, read_header_block,
+                               decode_header_block)
+
+
+@pytest.mark.parametrize("data, answer",
+                         [(b"From: a\nTo: b\n\nbody", 14),
+                          (b"From: a\r\nTo: b\r\n\r\nbody", 16),
+                          (b"\n\nFrom: a\n\nbody", 10),
+                          (b"From: a\nTo: b", -1),
+                          (b"\n\n", -1)])
+def test_find_header_end(data, answer):
+    assert find_header_end(data) == answer
+
+
+def test_find_header_end_in_range():
+    data = b"body\n\nFrom: a\nTo: b\n\nbody"
+    assert find_header_end(data, 6) == 20
+    assert find_header_end(data, 6, 19) == -1
+
+
+def test_read_header_block_reads_only_headers(tmp_path):
+    eml = tmp_path / "mail.eml"
+    eml.write_bytes(b"From: <a@b.ru>\nSubject: s\n\n" + b"A" * 100000)
+    assert read_header_block(eml, chunk_size=8) == \
+        b"From: <a@b.ru>\nSubject: s\n"
+
+
+def test_read_header_block_is_bounded(tmp_path):
+    eml = tmp_path / "mail.eml"
+    eml.write_bytes(b"X" * 1000)
+    assert len(read_header_block(eml, chunk_size=64, max_size=100)) == 100
+
+
+@pytest.mark.parametrize("data, answer",
+                         [("Subject: Тема".encode('utf-8'), "Subject: Тема"),
+                          ("Content-Type: text/plain; charset=\"koi8-r\"\n"
+                           "Subject: Тема".encode('koi8-r'),
+                           "Content-Type: text/plain; charset=\"koi8-r\"\n"
+                           "Subject: Тема"),
+                          (b"Subject: \xff", "Subject: \xff")])
+def test_decode_header_block(data, answer):
+    assert decode_header_block(data) == answer
@@ -0,0 +1,39 @@
+import pickle
+import pytest
+from datetime import datetime
+from simplemail import Email, EmailRecord
+from simplemail.sm_exceptions import DateException, SenderException
+from tests.test_data import EML_BODIES
+
+
+def test_record_parses_fields_on_access():
+    record = EmailRecord(EML_BODIES[1])
+    assert record.get_date() == "19.04.2021"
+    assert record.date == datetime(2021, 4, 19)
+    assert record.get_id() == "2e3625cb8f0246979ae67456676f51cb@some_mail.ru"
+    assert record.get_receivers() == {"receiver_user@some_mail.ru",
+                                      "receiver_user@some_mail.com"}
+
+
+def test_record_drops_raw_headers_after_parsing():
+    record = EmailRecord(EML_BODIES[0]).parse()
+    assert record._headers == {}
+    assert record.get_sender() == "sender_user@some_mail.ru"
+    assert record.get_subject() == "Subject"
+    assert not hasattr(record, "__dict__")
+
+
+def test_record_raises_on_access():
+    record = EmailRecord(EML_BODIES[2])
+    assert record.get_subject() == ''
+    with pytest.raises(SenderException):
+        record.get_sender()
+    with pytest.raises(DateException):
+        record.get_date()
+
+
+def test_email_is_picklable(tmp_path):
+    eml = tmp_path / "mail.eml"
+    eml.write_text(EML_BODIES[1])
+    email = pickle.loads(pickle.dumps(Email(eml)))
+    assert email.get_date() == "19.04.2021"
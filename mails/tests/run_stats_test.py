@@ -0,0 +1,61 @@
+from run_stats import Histogram, RunStats
+from simplemail.sm_exceptions import DateException, SenderException
+from manifest import Manifest
+from usecases import iter_emails, update_manifest
+from tests.test_data import EML_BODIES
+
+
+def test_histogram_buckets():
+    histogram = Histogram()
+    for seconds in (0.0000004, 0.000003, 0.000004, 0.001):
+        histogram.add(seconds)
+    assert histogram.to_dict()["buckets_us"] == \
+        {"<=1": 1, "<=4": 2, "<=1024": 1}
+
+
+def test_quiet_stats_count_failures_by_type(capsys):
+    stats = RunStats(quiet=True, progress_interval=0)
+    stats.success("a")
+    stats.failure("b", SenderException("no sender"))
+    stats.failure("c", SenderException("no sender"))
+    stats.failure("d", DateException("no date"))
+    report = stats.to_dict()
+    assert report["failures"] == {"SenderException": 2, "DateException": 1}
+    output = capsys.readouterr().out
+    assert "---" not in output
+    assert "1 parsed, 3 failed" in output
+
+
+def test_iter_emails_records_stage_timings(tmp_path):
+    for number, body in enumerate(EML_BODIES):
+        (tmp_path / f"{number}.eml").write_text(body)
+    stats = RunStats(quiet=True)
+    assert len(list(iter_emails(tmp_path, stats=stats))) == 2
+    stages = stats.to_dict()["stages"]
+    assert stages["walk"]["count"] == 3
+    assert stages["read"]["count"] == 3
+    assert stages["parse"]["count"] == 3
+    assert stages["write"]["count"] == 2
+
+
+def test_mbox_iteration_is_timed_as_read(tmp_path):
+    mbox = tmp_path / "mail.mbox"
+    mbox.write_text("".join(f"From a@b.ru Tue Apr 13 07:45:43 2021\n"
+                            f"{body.strip()}\n\nbody\n"
+                            for body in EML_BODIES[:2]))
+    stats = RunStats(quiet=True)
+    assert len(list(iter_emails(mbox, stats=stats))) == 2
+    stages = stats.to_dict()["stages"]
+    assert stages["walk"]["count"] == 0
+    assert stages["read"]["count"] == 4
+    assert stages["write"]["count"] == 2
+
+
+def test_update_manifest_emails_time_write(tmp_path):
+    for number, body in enumerate(EML_BODIES):
+        (tmp_path / f"{number}.eml").write_text(body)
+    stats = RunStats(quiet=True)
+    manifest = Manifest.load(tmp_path / "manifest")
+    update_manifest(tmp_path, manifest, stats=stats)
+    assert len(list(stats.consumed("write", manifest.emails()))) == 2
+    assert stats.to_dict()["stages"]["write"]["count"] == 2
@@ -0,0 +1,56 @@
+import tarfile
+import zipfile
+from simplemail import Email
+from simplemail.sources import iter_messages
+from tests.test_data import EML_BODIES
+
+BODY = "\n\nbody line\n>From escaped line\n"
+
+
+def get_ids(source):
+    return [Email(eml).get_id() for _, eml in iter_messages(source)]
+
+
+def write_mbox(path):
+    with open(path, 'w') as mbox:
+        for body in EML_BODIES[:2]:
+            mbox.write(f"From sender@some_mail.ru Tue Apr 13 07:45:43 2021\n"
+                       f"{body.strip()}{BODY}")
+
+
+def test_mbox(tmp_path):
+    mbox = tmp_path / "mail.mbox"
+    write_mbox(mbox)
+    names = [name for name, _ in iter_messages(mbox)]
+    assert names == [f"{mbox}:1", f"{mbox}:2"]
+    assert get_ids(mbox) == ["f4c542824f454760b046ba39cbeceb2e@some_mail.ru",
+                             "2e3625cb8f0246979ae67456676f51cb@some_mail.ru"]
+
+
+def test_maildir(tmp_path):
+    for folder in ("cur", "new", "tmp", ".Sent/cur", ".Sent/new"):
+        (tmp_path / folder).mkdir(parents=True)
+    (tmp_path / "cur" / "1").write_text(EML_BODIES[0])
+    (tmp_path / ".Sent" / "new" / "2").write_text(EML_BODIES[1])
+    (tmp_path / "tmp" / "3").write_text(EML_BODIES[1])
+    assert len(get_ids(tmp_path)) == 2
+
+
+def test_zip(tmp_path):
+    archive = tmp_path / "mail.zip"
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        zip_file.writestr("a/1.eml", EML_BODIES[0] + BODY)
+        zip_file.writestr("a/2.eml", EML_BODIES[1])
+    assert get_ids(archive) == \
+        ["f4c542824f454760b046ba39cbeceb2e@some_mail.ru",
+         "2e3625cb8f0246979ae67456676f51cb@some_mail.ru"]
+
+
+def test_tar_gz(tmp_path):
+    for number, body in enumerate(EML_BODIES[:2]):
+        (tmp_path / f"{number}.eml").write_text(body)
+    archive = tmp_path / "mail.tar.gz"
+    with tarfile.open(archive, 'w:gz') as tar_file:
+        tar_file.add(tmp_path / "0.eml", "mail/0.eml")
+        tar_file.add(tmp_path / "1.eml", "mail/1.eml")
+    assert len(get_ids(archive)) == 2
@@ -0,0 +1,42 @@
+from manifest import StoredEmail
+from subject_index import SubjectIndex, tokenize
+
+EMAILS = [StoredEmail("13.04.2021", "1@a.ru", "a@a.ru", [],
+                      "Quarterly report"),
+          StoredEmail("01.04.2021", "2@a.ru", "a@a.ru", [],
+                      "Re: Report for April"),
+          StoredEmail("02.05.2021", "3@a.ru", "a@a.ru", [],
+                      "=?utf-8?B?0J7RgtGH0LXRgg==?= report")]
+
+
+def get_ids(results):
+    return [result.message_id for result in results]
+
+
+def test_tokenize():
+    assert tokenize("Re: Report, for APRIL!") == {"re", "report", "for",
+                                                  "april"}
+
+
+def test_search_terms_and_prefixes(tmp_path):
+    with SubjectIndex(tmp_path / "subjects") as index:
+        assert list(index.index_emails(EMAILS)) == EMAILS
+        assert get_ids(index.search(["report"])) == ["2@a.ru", "1@a.ru",
+                                                     "3@a.ru"]
+        assert get_ids(index.search(["REP*", "apr*"])) == ["2@a.ru"]
+        assert get_ids(index.search(["отчет"])) == ["3@a.ru"]
+        assert get_ids(index.search(["report"], limit=1)) == ["2@a.ru"]
+        assert get_ids(index.search(["missing"])) == []
+        result = next(index.search(["quarterly"]))
+        assert result.date == "13.04.2021"
+        assert result.subject == "Quarterly report"
+
+
+def test_index_is_updated_incrementally(tmp_path):
+    with SubjectIndex(tmp_path / "subjects") as index:
+        index.add_emails(EMAILS[:2])
+    with SubjectIndex(tmp_path / "subjects") as index:
+        index.add_emails(EMAILS[1:])
+        assert index.remove_unseen() == 1
+        assert get_ids(index.search(["report"])) == ["2@a.ru", "3@a.ru"]
+        assert get_ids(index.search(["quarterly"])) == []
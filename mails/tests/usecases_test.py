@@ -0,0 +1,76 @@
+from manifest import Manifest
+from metadata_store import MetadataStore
+from usecases import (get_emails, iter_emails, save_to_metadata,
+                      save_to_sqlite, update_manifest)
+from tests.test_data import EML_BODIES
+
+
+def write_emails(folder, bodies):
+    for number, body in enumerate(bodies):
+        (folder / f"{number}.eml").write_text(body)
+
+
+def test_get_emails_parallel_matches_serial(tmp_path):
+    write_emails(tmp_path, EML_BODIES * 5)
+    serial = get_emails(tmp_path)
+    parallel = get_emails(tmp_path, workers=2)
+    assert [email.get_id() for email in serial] == \
+           [email.get_id() for email in parallel]
+    assert len(serial) == 10
+
+
+def test_get_emails_reports_failures(tmp_path, capsys):
+    write_emails(tmp_path, EML_BODIES)
+    get_emails(tmp_path, workers=2)
+    output = capsys.readouterr().out
+    assert output.count("+++") == 2
+    assert output.count("Can't find sender! ---") == 1
+
+
+def test_save_to_metadata_streams_emails(tmp_path):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    write_emails(folder, EML_BODIES * 3)
+    metadata = tmp_path / "metadata.txt"
+    save_to_metadata(str(metadata), iter_emails(folder, workers=2))
+    lines = metadata.read_text().splitlines()
+    assert len(lines) == 6
+    assert "13.04.2021;f4c542824f454760b046ba39cbeceb2e@some_mail.ru" in lines
+
+
+def test_update_manifest_parses_only_changed_files(tmp_path, capsys):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    write_emails(folder, EML_BODIES)
+    manifest = Manifest(tmp_path / "metadata.txt.manifest")
+    update_manifest(folder, manifest)
+    manifest.save()
+    capsys.readouterr()
+
+    (folder / "0.eml").unlink()
+    (folder / "3.eml").write_text(EML_BODIES[1])
+    manifest = Manifest.load(tmp_path / "metadata.txt.manifest")
+    update_manifest(folder, manifest)
+    output = capsys.readouterr().out
+    assert output.count("+++") == 1
+    assert "0.eml: deleted ---" in output
+    assert [email.get_date() for email in manifest.emails()] == \
+           ["19.04.2021", "19.04.2021"]
+
+
+def test_save_to_sqlite_and_query(tmp_path):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    write_emails(folder, EML_BODIES)
+    database = tmp_path / "metadata.db"
+    save_to_sqlite(str(database), iter_emails(folder))
+    save_to_sqlite(str(database), iter_emails(folder))
+    with MetadataStore(database) as store:
+        assert len(list(store.query())) == 2
+        emails = list(store.query(receiver="receiver_user@some_mail.com"))
+        assert [email.get_date() for email in emails] == ["19.04.2021"]
+        assert emails[0].get_subject() == "Subject string"
+        assert len(list(store.query(sender="sender_user@some_mail.ru",
+                                    since="2021-04-14",
+                                    until="2021-04-19"))) == 1
+        assert list(store.query(message_id="unknown")) == []
@@ -0,0 +1,39 @@
+import pytest
+from simplemail.walker import WalkOptions, walk_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path in ("a.eml", "b.txt", "2021/01/c.eml", "2021/02/d.eml",
+                 "2021/tmp/e.eml", "2022/f.eml"):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(path)
+    return tmp_path
+
+
+def get_names(tree, options):
+    return sorted(path.name for path in walk_files(tree, options))
+
+
+@pytest.mark.parametrize("options, answer",
+                         [(WalkOptions(), ["a.eml", "b.txt"]),
+                          (WalkOptions(max_depth=1),
+                           ["a.eml", "b.txt", "f.eml"]),
+                          (WalkOptions(max_depth=-1),
+                           ["a.eml", "b.txt", "c.eml", "d.eml", "e.eml",
+                            "f.eml"]),
+                          (WalkOptions(include=("*.eml", ), max_depth=-1,
+                                       exclude=("tmp", "2022")),
+                           ["a.eml", "c.eml", "d.eml"]),
+                          (WalkOptions(include=("2021/*/*.eml", ),
+                                       max_depth=-1),
+                           ["c.eml", "d.eml", "e.eml"])])
+def test_walk_files(tree, options, answer):
+    assert get_names(tree, options) == answer
+
+
+def test_walk_files_skips_folder_symlinks(tree):
+    (tree / "2021" / "loop").symlink_to(tree, target_is_directory=True)
+    (tree / "link.eml").symlink_to(tree / "a.eml")
+    assert get_names(tree, WalkOptions(max_depth=-1)) == \
+        ["a.eml", "b.txt", "c.eml", "d.eml", "e.eml", "f.eml", "link.eml"]
@@ -0,0 +1,71 @@
+import threading
+import time
+import pytest
+from message_index import MessageIdIndex
+from run_stats import RunStats
+from usecases import watch_folder
+from watcher import InotifyWatcher, PollingWatcher
+from tests.test_data import EML_BODIES
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_polling_watcher_waits_for_stable_size(tmp_path):
+    (tmp_path / "old.eml").write_text(EML_BODIES[0])
+    watcher = PollingWatcher(tmp_path, poll_interval=0.01)
+    (tmp_path / "new.eml").write_text(EML_BODIES[1])
+    assert watcher.wait() == []
+    assert watcher.wait() == [tmp_path / "new.eml"]
+    assert watcher.wait() == []
+
+
+def test_inotify_watcher(tmp_path):
+    try:
+        watcher = InotifyWatcher(tmp_path)
+    except OSError:
+        pytest.skip("inotify is not available")
+    (tmp_path / "new.eml").write_text(EML_BODIES[1])
+    (tmp_path / "folder").mkdir()
+    assert watcher.wait(5) == [tmp_path / "new.eml"]
+    watcher.close()
+
+
+def test_watch_folder_appends_new_files(tmp_path):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    (folder / "0.eml").write_text(EML_BODIES[0])
+    metadata = tmp_path / "metadata.txt"
+    stop = threading.Event()
+    watch = threading.Thread(target=watch_folder,
+                             args=(folder, str(metadata)),
+                             kwargs={"stats": RunStats(quiet=True),
+                                     "stop": stop.is_set})
+    watch.start()
+    try:
+        wait_for(lambda: metadata.exists()
+                 and len(metadata.read_text().splitlines()) == 1)
+        (folder / "1.eml").write_text(EML_BODIES[1])
+        (folder / "2.eml").write_text(EML_BODIES[2])
+        wait_for(lambda: len(metadata.read_text().splitlines()) == 2)
+    finally:
+        stop.set()
+        watch.join()
+    assert metadata.read_text().splitlines()[1] == \
+        "19.04.2021;2e3625cb8f0246979ae67456676f51cb@some_mail.ru"
+
+
+def test_watch_folder_with_index_appends(tmp_path):
+    folder = tmp_path / "mail"
+    folder.mkdir()
+    (folder / "0.eml").write_text(EML_BODIES[0])
+    metadata = tmp_path / "metadata.txt"
+    for _ in range(2):
+        with MessageIdIndex(tmp_path / "ids", capacity=1000) as index:
+            watch_folder(folder, str(metadata), index=index,
+                         stats=RunStats(quiet=True), stop=lambda: True)
+    assert len(metadata.read_text().splitlines()) == 1
@@ -1,40 +1,376 @@
+import os
+import time
 from pathlib import Path
-from simplemail import Email, SimpleMailException
-from pritty_print import print_red, print_green
-from typing import List
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from simplemail import Email, EmailRecord, SimpleMailException
+from simplemail.reader import get_header_text
+from simplemail.sm_exceptions import DuplicateException
+from simplemail.sources import (Message, iter_messages, iter_folder_entries,
+                                iter_folder_files)
+from simplemail.walker import WalkOptions
+from typing import (Callable, Container, Iterable, Iterator, List,
+                    NamedTuple, Optional, Tuple, Union)
 from metadata import METADATA_TEMPLATE, METADATA_TEMPLATE_OLD
+from manifest import Manifest, StoredEmail, to_stored_email
+from message_index import MessageIdIndex
+from metadata_store import MetadataStore
+from run_stats import RunStats
+from watcher import get_watcher
 
+CHUNK_SIZE = 64
+CHUNKS_PER_WORKER = 2
+FLUSH_EVERY = 100
+WATCH_BATCH_SIZE = 100
+WATCH_BATCH_WAIT = 0.2
+FSYNC_INTERVAL = 1.0
+WATCH_IDLE_WAIT = 1.0
 
-def get_emails(folder: Path):
-    emails = []
-    for element in folder.iterdir():
-        if not element.is_file():
+ParseResult = Union[EmailRecord, SimpleMailException]
+
+
+class TimedResult(NamedTuple):
+    result: ParseResult
+    read_seconds: float
+    parse_seconds: float
+
+
+def get_duplicate_exception(message_id: str) -> DuplicateException:
+    return DuplicateException(f"Duplicate Message-ID: {message_id}")
+
+
+def parse_email(eml: Union[Path, bytes],
+                seen: Optional[Container[str]] = None) -> ParseResult:
+    """
+    Parses one file or message header block, gives an Email or
+    the SimpleMailException it failed with. Runs in worker processes,
+    so failures are returned instead of raised.
+    If seen Message-IDs are given, Message-ID is parsed first and
+    the other fields of a duplicate are never parsed
+    """
+    return timed_parse_email(eml, seen).result
+
+
+def timed_parse_email(eml: Union[Path, bytes],
+                      seen: Optional[Container[str]] = None) -> TimedResult:
+    """
+    parse_email that also gives seconds spent reading and parsing
+    """
+    start = time.perf_counter()
+    header_text = get_header_text(eml)
+    read_end = time.perf_counter()
+    try:
+        record = EmailRecord(header_text)
+        if seen is not None and record.get_id() in seen:
+            result = get_duplicate_exception(record.get_id())
+        else:
+            result = record.parse()
+    except SimpleMailException as e:
+        result = e
+    return TimedResult(result, read_end - start,
+                       time.perf_counter() - read_end)
+
+
+def parse_chunk(chunk: List[Union[Path, bytes]]) -> List[TimedResult]:
+    return [timed_parse_email(eml) for eml in chunk]
+
+
+def iter_chunks(messages: Iterable[Message],
+                size: int) -> Iterator[List[Message]]:
+    messages = iter(messages)
+    chunk = list(islice(messages, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(messages, size))
+
+
+def parse_emails(messages: Iterable[Message], workers: int = 1,
+                 seen: Optional[Container[str]] = None,
+                 stats: Optional[RunStats] = None
+                 ) -> Iterator[Tuple[str, ParseResult]]:
+    """
+    Gives (name, parse result) pairs in the order of the given messages.
+    With more than one worker messages are parsed by a process pool in
+    chunks, at most CHUNKS_PER_WORKER chunks per worker are in flight.
+    Seen Message-IDs are checked early only by the serial path, workers
+    can't share them. Read and parse timings are added to stats
+    """
+    for name, timed_result in iter_timed_results(messages, workers, seen):
+        if stats is not None:
+            stats.add_timing("read", timed_result.read_seconds)
+            stats.add_timing("parse", timed_result.parse_seconds)
+        yield name, timed_result.result
+
+
+def iter_timed_results(messages: Iterable[Message], workers: int,
+                       seen: Optional[Container[str]]
+                       ) -> Iterator[Tuple[str, TimedResult]]:
+    if workers <= 1:
+        for name, eml in messages:
+            yield name, timed_parse_email(eml, seen)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in iter_chunks(messages, CHUNK_SIZE):
+            future = executor.submit(parse_chunk, [eml for _, eml in chunk])
+            pending.append(([name for name, _ in chunk], future))
+            if len(pending) < workers * CHUNKS_PER_WORKER:
+                continue
+            names, future = pending.popleft()
+            yield from zip(names, future.result())
+        while pending:
+            names, future = pending.popleft()
+            yield from zip(names, future.result())
+
+
+def check_duplicate(result: ParseResult,
+                    index: Optional[MessageIdIndex]) -> ParseResult:
+    """
+    Adds Message-ID of a parsed email to the index, gives
+    a DuplicateException instead of the email if it was already there
+    """
+    if index is None or isinstance(result, SimpleMailException):
+        return result
+    if index.add(result.get_id()):
+        return result
+    return get_duplicate_exception(result.get_id())
+
+
+def iter_emails(source: Path, workers: int = 1,
+                index: Optional[MessageIdIndex] = None,
+                options: WalkOptions = WalkOptions(),
+                stats: Optional[RunStats] = None) -> Iterator[Email]:
+    """
+    Lazily gives parsed emails of the source, reporting every message.
+    Source is a folder, a Maildir, an mbox file or a zip/tar archive.
+    With an index emails with already seen Message-IDs are skipped.
+    Time the consumer spends on an email is recorded as the write stage
+    """
+    if stats is None:
+        stats = RunStats()
+    # Mbox files and archives give header blocks read while they are
+    # iterated, so their iteration is reading rather than walking
+    stage = "walk" if source.is_dir() else "read"
+    messages = stats.timed(stage, iter_messages(source, options))
+    results = parse_emails(messages, workers, index, stats)
+    yield from stats.consumed("write", report_results(results, index,
+                                                      stats))
+
+
+def report_results(results: Iterable[Tuple[str, ParseResult]],
+                   index: Optional[MessageIdIndex],
+                   stats: RunStats) -> Iterator[EmailRecord]:
+    """
+    Reports parse results, gives parsed emails that are not duplicates
+    """
+    for element, result in results:
+        result = check_duplicate(result, index)
+        if isinstance(result, SimpleMailException):
+            stats.failure(element, result)
             continue
-        try:
-            emails.append(Email(element))
-            print_green(f"{element} +++")
-        except SimpleMailException as e:
-            print_red(f"{element}: {e} ---")
-    return emails
-
-
-def save_to_metadata(file_name: str, emails: List[Email]) -> None:
-    with open(file_name, 'w') as file:
-        for email in emails:
-            text = METADATA_TEMPLATE.format(email.get_date(), email.get_id())
-            file.write(f"{text}\n")
-
-
-def save_to_metadata_old(file_name: str, emails: List[Email]) -> None:
-    with open(file_name, 'w') as file:
-        counter = 1
-        for email in emails:
-            text = METADATA_TEMPLATE_OLD.format(
-                counter,
-                email.get_id(),
-                email.get_date(),
-                email.get_sender(),
-                ', '.join(email.get_receivers())
-                )
-            file.write(f"{text}\n")
-            counter += 1
+        stats.success(element)
+        yield result
+
+
+def update_manifest(folder: Path, manifest: Manifest, workers: int = 1,
+                    options: WalkOptions = WalkOptions(),
+                    stats: Optional[RunStats] = None) -> None:
+    """
+    Parses only files that are new or changed since the manifest was saved
+    and drops entries of deleted files
+    """
+    if stats is None:
+        stats = RunStats()
+    file_stats = {}
+    changed = []
+    for entry in stats.timed("walk", iter_folder_entries(folder, options)):
+        element = Path(entry.path)
+        file_stat = entry.stat()  # cached by the entry, no second stat call
+        file_stats[str(element)] = file_stat
+        if not manifest.is_fresh(str(element), file_stat):
+            changed.append((str(element), element))
+
+    for element, result in parse_emails(changed, workers, stats=stats):
+        if isinstance(result, SimpleMailException):
+            stats.failure(element, result)
+            manifest.update(element, file_stats[element], None)
+        else:
+            stats.success(element)
+            manifest.update(element, file_stats[element],
+                            to_stored_email(result))
+
+    for element in manifest.keep_only(file_stats):
+        stats.removal(element)
+
+
+def iter_unique_emails(emails: Iterable[StoredEmail],
+                       index: MessageIdIndex) -> Iterator[StoredEmail]:
+    for email in emails:
+        if index.add(email.get_id()):
+            yield email
+
+
+def get_emails(source: Path, workers: int = 1) -> List[Email]:
+    return list(iter_emails(source, workers))
+
+
+def format_metadata(emails: Iterable[Email]) -> Iterator[str]:
+    for email in emails:
+        yield METADATA_TEMPLATE.format(email.get_date(), email.get_id())
+
+
+def format_metadata_old(emails: Iterable[Email],
+                        start: int = 1) -> Iterator[str]:
+    for counter, email in enumerate(emails, start):
+        yield METADATA_TEMPLATE_OLD.format(
+            counter,
+            email.get_id(),
+            email.get_date(),
+            email.get_sender(),
+            ', '.join(email.get_receivers())
+            )
+
+
+def count_records(file_name: str, old_format: bool = False) -> int:
+    """
+    Gives the number of metadata records in the file, 0 if there is no file
+    """
+    if not os.path.exists(file_name):
+        return 0
+    with open(file_name) as file:
+        lines = sum(1 for _ in file)
+    if old_format:
+        return lines // (METADATA_TEMPLATE_OLD.count('\n') + 1)
+    return lines
+
+
+def write_lines(file_name: str, lines: Iterable[str],
+                append: bool = False) -> None:
+    """
+    Writes lines as they come, flushing every FLUSH_EVERY lines
+    so the file grows while the folder is still being parsed
+    """
+    with open(file_name, 'a' if append else 'w') as file:
+        for number, line in enumerate(lines, 1):
+            file.write(f"{line}\n")
+            if number % FLUSH_EVERY == 0:
+                file.flush()
+
+
+def save_to_metadata(file_name: str, emails: Iterable[Email],
+                     append: bool = False) -> None:
+    write_lines(file_name, format_metadata(emails), append)
+
+
+def save_to_metadata_old(file_name: str, emails: Iterable[Email],
+                         append: bool = False) -> None:
+    start = count_records(file_name, old_format=True) + 1 if append else 1
+    write_lines(file_name, format_metadata_old(emails, start), append)
+
+
+def save_to_sqlite(file_name: str, emails: Iterable[Email],
+                   append: bool = False) -> None:
+    with MetadataStore(Path(file_name)) as store:
+        if not append:
+            store.clear()
+        store.add_emails(emails)
+
+
+class MetadataAppender():
+    """
+    Writes metadata lines in batches. The file is flushed after every
+    batch and synced to disk at most once per FSYNC_INTERVAL seconds.
+    With append new records are added after the records of the file
+    """
+    def __init__(self, file_name: str, old_format: bool = False,
+                 fsync_interval: float = FSYNC_INTERVAL,
+                 append: bool = False):
+        self.counter = count_records(file_name, old_format) if append else 0
+        self.file = open(file_name, 'a' if append else 'w')
+        self.old_format = old_format
+        self.fsync_interval = fsync_interval
+        self.last_sync = time.monotonic()
+        self.unsynced = False
+
+    def write(self, emails: Iterable[Email]) -> None:
+        if self.old_format:
+            lines = format_metadata_old(emails, self.counter + 1)
+        else:
+            lines = format_metadata(emails)
+        for line in lines:
+            self.file.write(f"{line}\n")
+            self.counter += 1
+        self.file.flush()
+        self.unsynced = True
+
+    def get_sync_timeout(self) -> Optional[float]:
+        """
+        Gives seconds until the next sync is due or None if all is synced
+        """
+        if not self.unsynced:
+            return None
+        return max(0.0, self.last_sync + self.fsync_interval
+                   - time.monotonic())
+
+    def sync(self, force: bool = False) -> None:
+        if not self.unsynced:
+            return
+        if force or self.get_sync_timeout() == 0.0:
+            os.fsync(self.file.fileno())
+            self.last_sync = time.monotonic()
+            self.unsynced = False
+
+    def close(self) -> None:
+        self.sync(force=True)
+        self.file.close()
+
+
+def watch_folder(folder: Path, file_name: str, old_format: bool = False,
+                 index: Optional[MessageIdIndex] = None,
+                 options: WalkOptions = WalkOptions(),
+                 stats: Optional[RunStats] = None,
+                 stop: Callable[[], bool] = lambda: False) -> None:
+    """
+    Writes metadata of the folder files and then appends metadata of new
+    files as they arrive, until stop() is True or the run is interrupted.
+    New files are parsed in batches of up to WATCH_BATCH_SIZE files.
+    Only the folder itself is watched, not its subfolders. With an index
+    the metadata file is appended to, Message-IDs are committed after
+    their batch is written
+    """
+    if stats is None:
+        stats = RunStats()
+    options = options._replace(max_depth=0)
+    watcher = get_watcher(folder, options)
+    appender = MetadataAppender(file_name, old_format,
+                                append=index is not None)
+    try:
+        files = list(iter_folder_files(folder, options))
+        processed = {str(element) for element in files}
+        messages = [(str(element), element) for element in files]
+        results = parse_emails(messages, seen=index, stats=stats)
+        emails = report_results(results, index, stats)
+        appender.write(stats.consumed("write", emails))
+        if index is not None:
+            index.commit()
+        while not stop():
+            timeout = appender.get_sync_timeout()
+            new_files = watcher.wait(WATCH_IDLE_WAIT if timeout is None
+                                     else timeout)
+            if new_files and len(new_files) < WATCH_BATCH_SIZE:
+                new_files += watcher.wait(WATCH_BATCH_WAIT)
+            messages = [(str(element), element) for element in new_files
+                        if str(element) not in processed]
+            processed.update(name for name, _ in messages)
+            if messages:
+                results = parse_emails(messages, seen=index, stats=stats)
+                emails = report_results(results, index, stats)
+                appender.write(stats.consumed("write", emails))
+                if index is not None:
+                    index.commit()
+            appender.sync()
+    finally:
+        watcher.close()
+        appender.close()
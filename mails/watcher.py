@@ -0,0 +1,120 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from simplemail.walker import WalkOptions, is_included
+
+POLL_INTERVAL = 1.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+EVENTS_BUFFER_SIZE = 64 * 1024
+
+
+class InotifyWatcher():
+    """
+    Gives files that were written and closed or moved into the folder.
+    Uses linux inotify through libc, so waiting costs no CPU
+    Raises:
+        OSError: if inotify is not available
+    """
+    def __init__(self, folder: Path, options: WalkOptions = WalkOptions()):
+        self.options = options
+        self.folder = folder
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = libc.inotify_add_watch(self.fd, os.fsencode(str(folder)),
+                                       IN_CLOSE_WRITE | IN_MOVED_TO)
+        if watch < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout: Optional[float] = None) -> List[Path]:
+        """
+        Blocks until new files appear or timeout seconds pass,
+        None timeout waits forever
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, EVENTS_BUFFER_SIZE)
+        files = []
+        position = 0
+        while position < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, position)
+            position += EVENT_HEADER.size
+            name = os.fsdecode(data[position:position + length]
+                               .rstrip(b'\0'))
+            position += length
+            if not mask & IN_ISDIR and is_included(name, self.options):
+                files.append(self.folder / name)
+        return files
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher():
+    """
+    Rescans the folder every POLL_INTERVAL seconds. A new file is given
+    once its size stays the same between two scans, so files that are
+    still being written are not read
+    """
+    def __init__(self, folder: Path, options: WalkOptions = WalkOptions(),
+                 poll_interval: float = POLL_INTERVAL):
+        self.folder = folder
+        self.options = options
+        self.poll_interval = poll_interval
+        self.known: Set[str] = set(self._scan())
+        self.pending: Dict[str, int] = {}
+
+    def _scan(self) -> Dict[str, int]:
+        sizes = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file() and is_included(entry.name, self.options):
+                    sizes[entry.name] = entry.stat().st_size
+        return sizes
+
+    def wait(self, timeout: Optional[float] = None) -> List[Path]:
+        if timeout is None or timeout > self.poll_interval:
+            timeout = self.poll_interval
+        time.sleep(timeout)
+        files = []
+        pending = {}
+        for name, size in self._scan().items():
+            if name in self.known:
+                continue
+            if self.pending.get(name) == size:
+                self.known.add(name)
+                files.append(self.folder / name)
+            else:
+                pending[name] = size
+        self.pending = pending
+        return files
+
+    def close(self) -> None:
+        pass
+
+
+def get_watcher(folder: Path, options: WalkOptions = WalkOptions()):
+    """
+    Gives an inotify watcher or a polling one where inotify
+    is not available
+    """
+    try:
+        return InotifyWatcher(folder, options)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(folder, options)
@@ -0,0 +1,239 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import requests
+
+from rest_backend import (count_issues, get_default_session, get_period_dates, get_repository_name, get_server_date,
+                          raise_for_limit, to_iso_date)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+COMMITS_QUERY = """
+query($owner: String!, $name: String!, $branch: String!, $since: GitTimestamp, $until: GitTimestamp,
+      $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    ref(qualifiedName: $branch) {
+      target {
+        ... on Commit {
+          history(first: 100, after: $cursor, since: $since, until: $until) {
+            pageInfo { hasNextPage endCursor }
+            nodes { author { user { login } } }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $pullsCursor: String, $issuesCursor: String,
+      $withPulls: Boolean!, $withIssues: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 100, after: $pullsCursor) @include(if: $withPulls) {
+      pageInfo { hasNextPage endCursor }
+      nodes { baseRefName state createdAt closedAt }
+    }
+    issues(first: 100, after: $issuesCursor) @include(if: $withIssues) {
+      pageInfo { hasNextPage endCursor }
+      nodes { state createdAt closedAt }
+    }
+  }
+}
+"""
+
+
+def post_graphql(query: str, variables: Dict[str, Union[str, bool, None]], not_found_message: str,
+                 vp: bool = True, timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None,
+                 session: requests.Session = None) -> Tuple[dict, requests.Response]:
+    """
+    Sends a query to github GraphQL api and checks the response
+        Args:
+            query (str): GraphQL query
+            variables (Dict[str, Union[str, bool, None]]): values of the query variables
+            not_found_message (str): message of the HTTPError raised if the repository is not found
+            vp (bool): visual progress. If True - print's a dot with each request
+            timeout (int): request timeout in seconds
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth, GraphQL api needs one
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            data, response (Tuple[dict, requests.Response]): data of the query result and the response
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() and errors of the query
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> post_graphql(ISSUES_QUERY, {"owner": "octocat", "name": "hello-world", ...}, "Error 404")
+            ({"repository": {"pullRequests": {...}, "issues": {...}}}, <Response [200]>)
+    """
+    if vp:
+        print('.', end='', flush=True)  # Just a visualisation that the script is working
+    if session is None:
+        session = get_default_session()
+    payload = {"query": query, "variables": dict(variables)}
+    response = session.post(GRAPHQL_URL, json=payload, timeout=timeout, auth=auth)
+    raise_for_limit(response)
+    response.raise_for_status()
+    result = response.json()
+    errors = result.get("errors")
+    if errors:
+        if any(error.get("type") == "NOT_FOUND" for error in errors):
+            raise requests.HTTPError(not_found_message)
+        raise requests.HTTPError('; '.join(error.get("message", str(error)) for error in errors))
+    return result["data"], response
+
+
+def get_contributors_dict_graphql(repo_url: str, since: Union[str, None] = None, until: Union[str, None] = None,
+                                  branch: str = "master", top: int = 30, vp: bool = True, timeout: int = 10,
+                                  auth: requests.auth.HTTPBasicAuth = None,
+                                  session: requests.Session = None) -> List[Tuple[str, int]]:
+    """
+    Counts commits like get_contributors_dict, but with github GraphQL api that gives only logins of commit
+    authors, 100 commits per request. Pages follow each other by cursor, so they are requested one by one.
+    Arguments are the same as of print_top_active
+        Returns:
+            top_contributors_sorted (List[Tuple[str, int]]): List of tuples (login, contributions),
+            ordered by contributions
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() and errors of the query
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> get_contributors_dict_graphql("https...", "2015-12-27")
+            [("login1", 155), ("login2", 143) ...]
+    """
+    owner, name = get_repository_name(repo_url).split('/')
+    not_found_message = f"Error 404. Can't find repository: https://github.com/{owner}/{name} with branch: {branch}"
+    variables = {"owner": owner, "name": name, "branch": branch, "cursor": None,
+                 "since": None if since is None else f"{to_iso_date(since)}T00:00:00Z",
+                 "until": None if until is None else f"{to_iso_date(until)}T00:00:00Z"}
+    top_contributors = {}
+    while True:
+        data, _ = post_graphql(COMMITS_QUERY, variables, not_found_message, vp, timeout, auth, session)
+        if data["repository"]["ref"] is None:
+            raise requests.HTTPError(not_found_message)
+        history = data["repository"]["ref"]["target"]["history"]
+        for commit in history["nodes"]:
+            if commit["author"] is None or commit["author"]["user"] is None:
+                continue
+            login = commit["author"]["user"]["login"]
+            if login in top_contributors:
+                top_contributors[login] += 1
+            else:
+                top_contributors[login] = 1
+        if not history["pageInfo"]["hasNextPage"]:
+            break
+        variables["cursor"] = history["pageInfo"]["endCursor"]
+    if vp:
+        print()
+    top_contributors_sorted = sorted(top_contributors.items(), key=lambda item: item[1], reverse=True)
+    return top_contributors_sorted[:top]
+
+
+def to_rest_issue(node: dict) -> dict:
+    """
+    Turns a GraphQL pull request or issue node into the fields of a REST one that count_issues reads
+        Args:
+            node (dict): GraphQL node with state, createdAt and closedAt fields
+        Returns:
+            issue (dict): dictionary with state, created_at and closed_at keys
+        Examples:
+            >>> to_rest_issue({"state": "MERGED", "createdAt": "2021-01-14T09:02:42Z", "closedAt": None})
+            {"state": "closed", "created_at": "2021-01-14T09:02:42Z", "closed_at": None}
+    """
+    return {"state": "open" if node["state"] == "OPEN" else "closed",
+            "created_at": node["createdAt"], "closed_at": node["closedAt"]}
+
+
+def get_issues_dicts_graphql(repo_url: str, since: Union[str, None] = None, until: Union[str, None] = None,
+                             branch: str = "master", pr_days_to_old: int = 30, issue_days_to_old: int = 14,
+                             vp: bool = True, timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None,
+                             session: requests.Session = None) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Counts pull requests and issues like get_issues_dict, but with github GraphQL api. Every request gives 100 pull
+    requests and 100 issues with only their state, dates and base branch. As github List issues does, issues data
+    counts pull requests to any branch too.
+        Args:
+            repo_url (str): URL to a github repository
+            since (str): a string date in form "YYYY-MM-DD" or None, default is None
+            until (str): a string date in form "YYYY-MM-DD" or None, default is None
+            branch (str): name of a branch for pull requests, default is "master"
+            pr_days_to_old (int): days for a pull request to be considered old, default is 30
+            issue_days_to_old (int): days for an issue to be considered old, default is 14
+            vp (bool): visual progress. If True - print's a dot with each request, default is True
+            timeout (int): request timeout in seconds
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth, GraphQL api needs one
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            pull_request_dict, issues_dict (Tuple[Dict[str, int], Dict[str, int]]): dictionaries with keys:
+            opened, closed, old
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() and errors of the query
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> get_issues_dicts_graphql("https...", "2020-12-27")
+            ({"opened": 83, "closed": 50, "old": 4}, {"opened": 101, "closed": 38, "old": 7})
+    """
+    owner, name = get_repository_name(repo_url).split('/')
+    not_found_message = f"Error 404. Can't find repository: https://github.com/{owner}/{name}"
+    since_date, until_date = get_period_dates(since, until)
+    variables = {"owner": owner, "name": name, "pullsCursor": None, "issuesCursor": None,
+                 "withPulls": True, "withIssues": True}
+    today_date = None
+    pull_request_dict = {"opened": 0, "closed": 0, "old": 0}
+    issues_dict = {"opened": 0, "closed": 0, "old": 0}
+    while variables["withPulls"] or variables["withIssues"]:
+        data, response = post_graphql(ISSUES_QUERY, variables, not_found_message, vp, timeout, auth, session)
+        if today_date is None:
+            today_date = get_server_date(response.headers.get("date"))  # Current server date
+        repository = data["repository"]
+        if variables["withPulls"]:
+            pulls = [to_rest_issue(node) for node in repository["pullRequests"]["nodes"]]
+            count_issues(issues_dict, pulls, since_date, until_date, today_date, issue_days_to_old)
+            pulls = [to_rest_issue(node) for node in repository["pullRequests"]["nodes"]
+                     if node["baseRefName"] == branch]
+            count_issues(pull_request_dict, pulls, since_date, until_date, today_date, pr_days_to_old)
+            page_info = repository["pullRequests"]["pageInfo"]
+            variables["withPulls"] = page_info["hasNextPage"]
+            variables["pullsCursor"] = page_info["endCursor"]
+        if variables["withIssues"]:
+            issues = [to_rest_issue(node) for node in repository["issues"]["nodes"]]
+            count_issues(issues_dict, issues, since_date, until_date, today_date, issue_days_to_old)
+            page_info = repository["issues"]["pageInfo"]
+            variables["withIssues"] = page_info["hasNextPage"]
+            variables["issuesCursor"] = page_info["endCursor"]
+    if vp:
+        print()
+    return pull_request_dict, issues_dict
+
+
+def collect_statistic_graphql(script_args: argparse.Namespace, auth: requests.auth.HTTPBasicAuth = None,
+                              session: requests.Session = None) -> Tuple[List[Tuple[str, int]], Dict[str, int],
+                                                                         Dict[str, int]]:
+    """
+    Collects the same statistic as collect_statistic with github GraphQL api. Commits are collected concurrently
+    with pull requests and issues, that are collected by the same queries.
+        Args:
+            script_args (argparse.Namespace): Namespace of the script arguments.
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth, GraphQL api needs one
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            statistic (Tuple[List[Tuple[str, int]], Dict[str, int], Dict[str, int]]): top contributors,
+            pull requests and issues data
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() and errors of the query
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> collect_statistic_graphql(args, auth)
+            ([("login1", 155), ...], {"opened": 83, "closed": 50, "old": 4}, {"opened": 101, "closed": 38, "old": 7})
+    """
+    request_args = {"vp": script_args.visual_progress, "timeout": script_args.request_timeout, "auth": auth,
+                    "session": session}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        top_contributors = executor.submit(get_contributors_dict_graphql, script_args.url, script_args.since,
+                                           script_args.until, script_args.branch, script_args.top_contributors,
+                                           **request_args)
+        issues_dicts = executor.submit(get_issues_dicts_graphql, script_args.url, script_args.since,
+                                       script_args.until, script_args.branch, script_args.pr_days_to_old,
+                                       script_args.issue_days_to_old, **request_args)
+        pull_request_dict, issues_dict = issues_dicts.result()
+        return top_contributors.result(), pull_request_dict, issues_dict
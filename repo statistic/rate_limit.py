@@ -0,0 +1,213 @@
+import math
+import threading
+import time
+from typing import List, Union
+from urllib.parse import urlparse
+
+import requests
+
+RATE_LIMIT_STATUSES = (403, 429)
+PACE_BELOW = 0.1
+RESET_MARGIN = 1.0
+SECONDARY_LIMIT_WAIT = 60.0
+
+
+class TokenAuth(requests.auth.AuthBase):
+    """
+    Authorization with a github personal token only
+    """
+    def __init__(self, token: str):
+        self.token = token
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        request.headers["Authorization"] = f"token {self.token}"
+        return request
+
+
+class TokenBudget:
+    """
+    Rate limit state of one authorization for one rate limit resource (core, graphql, search) taken from
+    the last response headers
+    """
+    def __init__(self, auth: Union[requests.auth.AuthBase, None], resource: str = "core"):
+        self.auth = auth
+        self.resource = resource
+        self.probed = False
+        self.remaining = None
+        self.limit = None
+        self.reset = None
+        self.in_flight = 0
+        self.last_request = 0.0
+
+    def get_available(self, now: float) -> float:
+        """
+        Gives how many more requests can be sent now, zero or less when the budget is spent or over-committed,
+        math.inf if there is no limit
+        """
+        if self.reset is not None and now >= self.reset:  # a new rate limit window started
+            self.remaining = None
+            self.reset = None
+            self.probed = False
+        if not self.probed:
+            return 1 - self.in_flight  # one request to learn the budget
+        if self.remaining is None:
+            return math.inf
+        return self.remaining - self.in_flight
+
+    def get_next_request_time(self) -> float:
+        """
+        Gives when the next request may be sent, when the budget is low requests are spread evenly until the reset
+        """
+        if self.remaining is None or self.reset is None or self.limit is None or \
+                self.remaining >= self.limit * PACE_BELOW:
+            return 0.0
+        return self.last_request + (self.reset - self.last_request) / max(self.remaining, 1)
+
+
+class RateLimitScheduler:
+    """
+    Spreads requests across several authorizations using the rate limit headers of responses. A request is sent
+    with the authorization that has the largest budget left, at most remaining requests of an authorization are
+    in flight, and when the budget drops below PACE_BELOW of the limit requests are paced to last until the reset.
+    When all budgets are spent, waits for the earliest reset instead of failing. Github counts REST, GraphQL
+    and search requests separately, so every authorization has a budget per rate limit resource.
+    Can be shared by threads.
+    """
+    def __init__(self, auths: List[Union[requests.auth.AuthBase, None]], vp: bool = True):
+        self.auths = auths or [None]
+        self.budgets = {}
+        self.vp = vp
+        self.condition = threading.Condition()
+        self.reported_wake_up = None
+
+    def get_budget(self, auth: Union[requests.auth.AuthBase, None], resource: str) -> TokenBudget:
+        """
+        Gives the budget of the authorization for the rate limit resource, creates it on the first use
+        """
+        key = (id(auth), resource)
+        if key not in self.budgets:
+            self.budgets[key] = TokenBudget(auth, resource)
+        return self.budgets[key]
+
+    def get_budgets(self, resource: str) -> List[TokenBudget]:
+        """
+        Gives budgets of all the authorizations for the rate limit resource
+        """
+        return [self.get_budget(auth, resource) for auth in self.auths]
+
+    def acquire(self, resource: str = "core") -> TokenBudget:
+        """
+        Blocks until a request to the rate limit resource may be sent, gives the budget of the authorization to use
+        """
+        with self.condition:
+            while True:
+                now = time.time()
+                best, best_available = None, 0
+                wake_up = None
+                for budget in self.get_budgets(resource):
+                    available = budget.get_available(now)
+                    if available <= 0:
+                        if budget.reset is not None and budget.in_flight == 0:
+                            wake_up = min(wake_up or budget.reset, budget.reset)
+                        continue
+                    next_request_time = budget.get_next_request_time()
+                    if next_request_time > now:
+                        wake_up = min(wake_up or next_request_time, next_request_time)
+                        continue
+                    if best is None or best_available < available:
+                        best, best_available = budget, available
+                if best is not None:
+                    best.in_flight += 1
+                    best.last_request = now
+                    return best
+                timeout = None if wake_up is None else max(0.0, wake_up - now) + RESET_MARGIN
+                if self.vp and timeout is not None and timeout > RESET_MARGIN + 1 and \
+                        wake_up != self.reported_wake_up:
+                    self.reported_wake_up = wake_up
+                    print(f"\nRate limit is spent, waiting {timeout:.0f} seconds for the reset", flush=True)
+                self.condition.wait(timeout)
+
+    def release(self, budget: TokenBudget, response: requests.Response) -> bool:
+        """
+        Updates the budget with the response headers, or the budget of the same authorization for the resource
+        named by X-RateLimit-Resource header if the request was counted against another one. Gives True
+        if the request was refused because of the rate limit and must be sent again
+        """
+        headers = response.headers
+        refused = response.status_code in RATE_LIMIT_STATUSES and \
+            (headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers)
+        with self.condition:
+            budget.in_flight -= 1
+            budget = self.get_budget(budget.auth, headers.get("X-RateLimit-Resource", budget.resource))
+            budget.probed = True
+            if "X-RateLimit-Remaining" in headers:
+                budget.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Limit" in headers:
+                budget.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Reset" in headers:
+                budget.reset = float(headers["X-RateLimit-Reset"])
+            if refused and "Retry-After" in headers:  # secondary rate limit
+                budget.remaining = 0
+                budget.reset = time.time() + float(headers["Retry-After"])
+            elif refused and budget.reset is None:
+                budget.reset = time.time() + SECONDARY_LIMIT_WAIT
+            self.condition.notify_all()
+        return refused
+
+    def cancel(self, budget: TokenBudget) -> None:
+        """
+        Gives back a request that was not sent
+        """
+        with self.condition:
+            budget.in_flight -= 1
+            self.condition.notify_all()
+
+
+def get_rate_limit_resource(request: requests.PreparedRequest) -> str:
+    """
+    Gives the github.api rate limit resource the request is counted against
+        Args:
+            request (requests.PreparedRequest): request to github.api
+        Returns:
+            resource (str): "graphql", "search" or "core", as in X-RateLimit-Resource header of the response
+        Examples:
+            >>> get_rate_limit_resource(requests.Request("POST", "https://api.github.com/graphql").prepare())
+            'graphql'
+    """
+    path = urlparse(request.url).path
+    if path == "/graphql":
+        return "graphql"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
+
+
+class RateLimitAdapter(requests.adapters.HTTPAdapter):
+    """
+    Transport adapter that sends every request through a RateLimitScheduler, if the scheduler is None
+    requests are sent as is. Subclasses change how a request is sent in send_authorized, that gets the request
+    with the authorization picked by the scheduler
+    """
+    def __init__(self, scheduler: RateLimitScheduler = None, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.scheduler is None:
+            return self.send_authorized(request, **kwargs)
+        resource = get_rate_limit_resource(request)
+        while True:
+            budget = self.scheduler.acquire(resource)
+            if budget.auth is not None:
+                budget.auth(request)
+            try:
+                response = self.send_authorized(request, **kwargs)
+            except Exception:
+                self.scheduler.cancel(budget)
+                raise
+            if not self.scheduler.release(budget, response):
+                return response
+            response.content  # reads the refused body, so the connection goes back to the pool
+
+    def send_authorized(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        return super().send(request, **kwargs)
@@ -2,9 +2,19 @@
 import requests
 import re
 import datetime
+from pathlib import Path
 from typing import List, Tuple, Dict, Union
 import argparse
 
+from graphql_backend import collect_statistic_graphql
+from rate_limit import RateLimitScheduler, TokenAuth
+from repository_store import RepositoryStore, query_statistic, sync_store
+from response_cache import CACHE_PATH, CACHE_SIZE_MB, ResponseCache
+from rest_backend import (RETRIES, collect_statistic, get_default_session, get_issues_dict, get_issues_payload,
+                          get_pr_payload, get_session, get_top_active)
+
+BACKENDS = ("rest", "graphql")
+
 
 def is_valid_github_repository_url(potential_url: str) -> bool:
     """
@@ -74,172 +84,10 @@ def get_time_period_string(since: Union[str, None] = None, until: Union[str, Non
     return time_period
 
 
-def in_time_period(date_to_check: datetime.datetime,
-                   since_date: Union[datetime.datetime, None],
-                   until_date: Union[datetime.datetime, None]) -> bool:
-    """
-    Checks if the date_to_check is in between since_date and until_date
-        Args:
-            date_to_check (datetime.datetime): date which should be checked
-            since_date (datetime.datetime): minimal allowed value for date_to_check. If None - no minimal border
-            until_date (datetime.datetime): maximal allowed value for date_to_check. If None - no maximal border
-        Returns:
-            (bool) : True if date_to_check is in between since_date and until_date, False otherwise
-        Examples:
-            >>> date_to_check = datetime.datetime.strptime("2020-12-27", "%Y-%m-%d")
-            >>> in_time_period(date_to_check,  None, None)
-            True
-            >>> since_date = datetime.datetime.strptime("1994-12-27", "%Y-%m-%d")
-            >>> in_time_period(date_to_check,  since_date, None)
-            True
-            >>> until_date = datetime.datetime.strptime("2000-12-27", "%Y-%m-%d")
-            >>> in_time_period(date_to_check,  since_date, until_date)
-            False
-    """
-    if (since_date is not None) and (until_date is not None):
-        return since_date <= date_to_check <= until_date
-    elif since_date is not None:
-        return since_date <= date_to_check
-    elif until_date is not None:
-        return date_to_check <= until_date
-    else:  # No time borders - date_to_check is always in a period
-        return True
-
-
-class OutOfLimitError(Exception):
-    pass
-
-
-def raise_for_limit(response: requests.request) -> None:
-    """
-    Checks if the script ran out of requests. Github api gives 60 requests/hour for no authorized and
-    5000/hour for authorized requests.
-        Args:
-            response(requests.request): response for a get request to github.api
-        Returns:
-            None
-        Raises:
-            OutOfLimitError: raises when no requests to github.api remaining
-        Examples:
-            >>> raise_for_limit(response)
-            OutOfLimitError: You're out of requests, wait for an hour to get another 60 requests.
-
-    """
-    requests_remaining = int(response.headers.get("X-RateLimit-Remaining"))
-    if requests_remaining == 0:
-        raise OutOfLimitError(f"You're out of requests, wait for an hour"
-                              f" to get another {response.headers.get('X-RateLimit-Limit')} requests.")
-
-
-def get_commits_payload(since: Union[str, None], until: Union[str, None], branch: str) -> Dict[str, Union[str, int]]:
-    """
-    Creates payload for get commits request from github.api: List commits.
-    Parameter per_page is set to 100 (max value). Parameter page is set to 1
-        Args:
-            since (str): a string date in form "YYYY-MM-DD" or None
-            until (str): a string date in form "YYYY-MM-DD" or None
-            branch (str): name of a branch in repository
-        Returns:
-            payload (Dict[str, Union[str, int]]) dictionary with parameters for List commits in github.api
-        Examples:
-            >>> get_commits_payload("2020-12-27", None, "master")
-            {"sha": "master", "since": "2020-12-27", "per_page": 100, "page": 1}
-    """
-    payload = {"sha": branch, "per_page": 100, "page": 1}
-    if since is not None:
-        payload["since"] = since
-    if until is not None:
-        payload["until"] = until
-    return payload
-
-
-def get_server_date(words_date_str: str) -> datetime.datetime:
-    """
-    Tries to get a server date from response header. Standard github date is YYYY-MM-DD,
-    but the server one is "Sun, 17 Jan 2021 20:18:17 GMT". Didn't find any docs so uses try - except for the
-    entire algorithm. This should not be bad because this function runs only 2 times per sript run.
-        Args:
-            words_date_str (str): response header date
-        Returns:
-            server_date (datetime.datetime): server date if possible, else - local machine date
-        Examples:
-            >>> get_server_date("Sun, 17 Jan 2021 20:18:17 GMT")
-            datetime.datetime(2021, 1, 17)
-    """
-    try:
-        week_day, date = words_date_str.split(', ')  # 'Sun, 17 Jan 2021 20:18:17 GMT'
-        day, month, year, time, timezone = date.split(' ')
-        month_dict = {"Jan": "01", "Feb": "02", "March": "03",
-                      "April": "04", "May": "05", "June": "06",
-                      "July": "07", "Aug": "08", "Sept": "09",
-                      "Oct": "10", "Nov": "11", "Dec": "12"}
-        if month in month_dict:
-            month = month_dict[month]
-        else:  # Can't find github's month names, may be they are different
-            month = str(datetime.datetime.now().month)
-        server_date = datetime.datetime.strptime(f"{year}-{month}-{day}", "%Y-%m-%d")
-        return server_date
-    except ValueError:
-        return datetime.datetime.now()
-
-
-def get_contributors_dict(get_url: str, payload: Dict[str, Union[str, int]], top: int = 30, vp: bool = True,
-                          timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None) -> List[Tuple[str, int]]:
-    """
-    Counts all commits and returns a list of the (top) most active contributors within given time period for
-    the given branch. If number of contributors is less than top, returns data for all contributors.
-    Uses List commits from github.api.
-        Args:
-            get_url (str): "https://api.github.com/repos/{owner}/{repository}/commits" format string
-            payload (Dict[str, Union[str, int]]): dictionary with github.api: List commits parameters
-            top (int): number of top required contributors
-            vp (bool): visual progress. If True - print's a dot with each get request
-            timeout (int): request timeout in seconds
-            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
-        Returns:
-            top_contributors_sorted (List[Tuple[str, int]]): List of tuples (login, contributions),
-            ordered by contributions
-        Raises:
-            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
-            OutOfLimitError: raises when no requests to github.api remained
-        Examples:
-            >>> get_contributors_dict("https...", {"sha": "master", "since": "2015-12-27", "per_page": 100, "page": 1})
-            [("login1", 155), ("login2", 143) ...]
-    """
-    top_contributors = {}
-    while True:
-        if vp:
-            print('.', end='')  # Just a visualisation that the script is working
-        response = requests.get(get_url, params=payload, timeout=timeout, auth=auth)
-        if response.status_code == 404:
-            repo = get_url.replace("https://api.github.com/repos", "https://github.com")[:-len(get_url.split('/')[-1])]
-            raise requests.HTTPError(f"Error 404. Can't find repository: {repo} with branch: {payload['sha']}")
-        raise_for_limit(response)
-        response.raise_for_status()
-
-        response_json = response.json()
-        for commit in response_json:
-            if commit["author"] is None:
-                continue
-            login = commit["author"]["login"]
-            if login in top_contributors:
-                top_contributors[login] += 1
-            else:
-                top_contributors[login] = 1
-
-        if len(response_json) < payload["per_page"]:  # the number of commits is less than per_page - we reached the end
-            break
-        else:
-            payload["page"] += 1
-    if vp:
-        print()
-    top_contributors_sorted = sorted(top_contributors.items(), key=lambda item: item[1], reverse=True)
-    return top_contributors_sorted[:top]
-
-
 def print_top_active(repo_url: str, since: Union[str, None] = None, until: Union[str, None] = None,
                      branch: str = "master", top: int = 30, vp: bool = True, timeout: int = 10,
-                     auth: requests.auth.HTTPBasicAuth = None) -> None:
+                     auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                     session: requests.Session = None) -> None:
     """
     Print a table of the top contributors for the given branch and time period.
     If a number of contributors is less than top, prints data for all contributors.
@@ -252,6 +100,8 @@ def print_top_active(repo_url: str, since: Union[str, None] = None, until: Union
             vp (bool): visual progress. If True - print's a dot with each get request, default is True
             timeout (int): request timeout in seconds
             auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            workers (int): maximal number of concurrent page requests
+            session (requests.Session): client from get_session, if None - the default session is used
         Returns:
             None
         Raises:
@@ -266,12 +116,29 @@ def print_top_active(repo_url: str, since: Union[str, None] = None, until: Union
             login2                                               133
             ...
     """
-    owner = repo_url.split('/')[-2]
-    repository = repo_url.split('/')[-1]
-    payload = get_commits_payload(since, until, branch)
-    get_url = f"https://api.github.com/repos/{owner}/{repository}/commits"
-    top_contributors = get_contributors_dict(get_url, payload, top, vp, timeout, auth)
+    top_contributors = get_top_active(repo_url, since, until, branch, top, vp, timeout, auth, workers, session)
+    print_top_active_report(top_contributors, since, until, branch)
 
+
+def print_top_active_report(top_contributors: List[Tuple[str, int]], since: Union[str, None] = None,
+                            until: Union[str, None] = None, branch: str = "master") -> None:
+    """
+    Print a table of the collected top contributors
+        Args:
+            top_contributors (List[Tuple[str, int]]): List of tuples (login, contributions),
+            ordered by contributions
+            since (str): a string date in form "YYYY-MM-DD" or None, default is None
+            until (str): a string date in form "YYYY-MM-DD" or None, default is None
+            branch (str): name of a branch in repository, default is "master"
+        Returns:
+            None
+        Examples:
+            >>> print_top_active_report([("login1", 2394)], branch="master")
+            List of the most active contributors of all time for master
+            Login                                      contributions
+            --------------------------------------------------------
+            login1                                              2394
+    """
     time_period = get_time_period_string(since, until)
     if len(top_contributors) == 0:
         print(f"No contributors {time_period} for {branch}")
@@ -284,25 +151,10 @@ def print_top_active(repo_url: str, since: Union[str, None] = None, until: Union
         print(f"{contributor[0]:40s}{contributor[1]:13d}")
 
 
-def get_pr_payload(branch: str) -> Dict[str, Union[str, int]]:
-    """
-    Creates payload for github.api: List pull requests for the given branch.
-    Parameter per_page is set to 100 (max value). Parameter page is set to 1.
-    Parameter state is set to all - opened and closed PR.
-        Args:
-            branch (str): a name of the repository branch
-        Returns:
-            payload (Dict[str, str]) dictionary with parameter name as keys and parameter values as values
-        Examples:
-            >>> get_pr_payload("master")
-            {"base": "master", "per_page": 100, "page": 1, "state": "all"}
-    """
-    return {"base": branch, "per_page": 100, "page": 1, "state": "all"}
-
-
 def print_pr_data(repo_url: str, since: Union[str, None] = None, until: Union[str, None] = None,
                   branch: str = "master", days_to_old: int = 30, vp: bool = True,
-                  timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None) -> None:
+                  timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                  session: requests.Session = None) -> None:
     """
     Print data for Pull Requests - PR of the given time period and the given branch.
         Args:
@@ -315,6 +167,8 @@ def print_pr_data(repo_url: str, since: Union[str, None] = None, until: Union[st
             vp (bool): visual progress. If True - print's a dot with each get request, default is True
             timeout (int): request timeout in seconds
             auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            workers (int): maximal number of concurrent page requests
+            session (requests.Session): client from get_session, if None - the default session is used
         Returns:
             None
         Raises:
@@ -330,129 +184,39 @@ def print_pr_data(repo_url: str, since: Union[str, None] = None, until: Union[st
     """
     payload = get_pr_payload(branch)
     pull_request_dict = get_issues_dict(repo_url, payload, since, until, pr_issue=True, days_to_old=days_to_old,
-                                        vp=vp, timeout=timeout, auth=auth)
-    time_period = get_time_period_string(since, until)
-    print(f"Pull request data {time_period} for {branch}:")
-    print(f"Opened: {pull_request_dict['opened']:13d}")
-    print(f"Closed: {pull_request_dict['closed']:13d}")
-    print(f"Old: {pull_request_dict['old']:16d}")
-
-
-def get_issues_payload() -> Dict[str, Union[str, int]]:
-    """
-    Creates payload for github.api: List issues.
-    Parameter per_page is set to 100 (max value). Parameter page is set to 1.
-    Parameter state is set to all - opend and closed issues.
-        Args:
-            (None)
-        Returns:
-            payload (Dict[str, str]) dictionary with parameter name as keys and parameter values as values
-        Examples:
-            >>> get_issues_payload()
-            {"per_page": 100, "page": 1, "state": "all"}
-    """
-    return {"per_page": 100, "page": 1, "state": "all"}
-
-
-def reduce_date(long_str_date: str) -> str:
-    """
-    Reduce '2021-01-14T09:02:42Z' to '2021-01-14'
-        Args:
-            long_str_date (str): issue 'created_at' field value
-        Returns:
-            github_date (str): issue 'created_at' field value reduced to 'YYYY-MM-DD' form
-        Examples:
-            >>> reduce_date('2021-01-14T09:02:42Z')
-            '2021-01-14'
-    """
-    return long_str_date.split('T')[0]
+                                        vp=vp, timeout=timeout, auth=auth, workers=workers, session=session)
+    print_pr_report(pull_request_dict, since, until, branch)
 
 
-def get_issues_dict(repo_url: str, payload: Dict[str, Union[str, int]], since: Union[str, None] = None,
-                    until: Union[str, None] = None, pr_issue: bool = False, days_to_old: int = 30, vp: bool = True,
-                    timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None) -> Dict[str, int]:
+def print_pr_report(pull_request_dict: Dict[str, int], since: Union[str, None] = None,
+                    until: Union[str, None] = None, branch: str = "master") -> None:
     """
-    Counts all issues of the given time period.
-    Returns a dictionary with number of opened, closed and old issues.
+    Print the collected data for Pull Requests
         Args:
-            repo_url (str): URL to a github repository
-            payload (Dict[str, Union[str, int]]): dictionary with github.api: List pull requests or List issues
+            pull_request_dict (Dict[str, int]): Dictionary with keys: opened, closed, old
             since (str): a string date in form "YYYY-MM-DD" or None, default is None
             until (str): a string date in form "YYYY-MM-DD" or None, default is None
-            pr_issue (bool): interested only in pull requests, default False.
-            If true github.api List pull requests payload is expected
-            days_to_old (int): if an issue is created in the given time period and still
-            be opened for days_to_old or more it's consider to be an old one. The default value is 30
-            vp (bool): visual progress. If True - print's a dot with each get request, default is True
-            timeout (int): request timeout in seconds
-            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            branch (str): name of a branch in repository, default is "master"
         Returns:
-            pull_request_dict (Dict[str, int]): Dictionary with keys: opened, closed, old
-        Raises:
-            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
-            OutOfLimitError: raises when no requests to github.api remained
+            None
         Examples:
-            >>> get_issues_dict("https...", {"base": "master", "per_page": 100, "page": 1})
-            {"opened": 83, "closed": 50, "old": 4}
+            >>> print_pr_report({"opened": 155, "closed": 43, "old": 17}, since="2020-12-27")
+            Pull request data since 2020-12-27 for master:
+            Opened 155
+            Closed 43
+            Old: 17
     """
-    owner = repo_url.split('/')[-2]
-    repository = repo_url.split('/')[-1]
-    if pr_issue:
-        get_url = f"https://api.github.com/repos/{owner}/{repository}/pulls"
-    else:
-        get_url = f"https://api.github.com/repos/{owner}/{repository}/issues"
-
-    if since is not None:
-        since_date = datetime.datetime.strptime(since, "%Y-%m-%d")
-    else:
-        since_date = None
-
-    if until is not None:
-        until_date = datetime.datetime.strptime(until, "%Y-%m-%d")
-    else:
-        until_date = None
-
-    today_date = None
-    issue_dict = {"opened": 0, "closed": 0, "old": 0}
-    while True:
-        if vp:
-            print('.', end='')  # Just a visualisation that the script is working
-        response = requests.get(get_url, params=payload, timeout=timeout, auth=auth)
-        if response.status_code == 404:
-            repo = get_url.replace("https://api.github.com/repos", "https://github.com")[:-len(get_url.split('/')[-1])]
-            raise requests.HTTPError(f"Error 404. Can't find repository: {repo}")
-        raise_for_limit(response)
-        response.raise_for_status()
-
-        if today_date is None:
-            today_date = get_server_date(response.headers.get("date"))  # Current server date
-        response_json = response.json()
-        for issue in response_json:
-            created_date = datetime.datetime.strptime(reduce_date(issue["created_at"]), "%Y-%m-%d")
-            if in_time_period(created_date, since_date, until_date):
-                issue_dict["opened"] += 1
-                if issue["state"] == "open":
-                    delta = today_date - created_date
-                    if delta.days >= days_to_old:
-                        issue_dict["old"] += 1
-
-            if issue["closed_at"] is not None:
-                closed_date = datetime.datetime.strptime(reduce_date(issue["closed_at"]), "%Y-%m-%d")
-                if in_time_period(closed_date, since_date, until_date):
-                    issue_dict["closed"] += 1
-
-        if len(response_json) < payload["per_page"]:  # the number of elements is less than per_page - end reached
-            break
-        else:
-            payload["page"] += 1
-    if vp:
-        print()
-    return issue_dict
+    time_period = get_time_period_string(since, until)
+    print(f"Pull request data {time_period} for {branch}:")
+    print(f"Opened: {pull_request_dict['opened']:13d}")
+    print(f"Closed: {pull_request_dict['closed']:13d}")
+    print(f"Old: {pull_request_dict['old']:16d}")
 
 
 def print_issues_data(repo_url: str, since: Union[str, None] = None, until: Union[str, None] = None,
                       days_to_old: int = 14, vp: bool = True,
-                      timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None) -> None:
+                      timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                      session: requests.Session = None) -> None:
     """
     Print data for issues of the given time period. Uses github.api: List issues.
         Args:
@@ -464,6 +228,8 @@ def print_issues_data(repo_url: str, since: Union[str, None] = None, until: Unio
             vp (bool): visual progress. If True - print's a dot with each get request
             timeout (int): request timeout in seconds
             auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            workers (int): maximal number of concurrent page requests
+            session (requests.Session): client from get_session, if None - the default session is used
         Returns:
             None
         Raises:
@@ -479,7 +245,27 @@ def print_issues_data(repo_url: str, since: Union[str, None] = None, until: Unio
     """
     payload = get_issues_payload()
     issues_dict = get_issues_dict(repo_url, payload, since, until, days_to_old=days_to_old,
-                                  vp=vp, timeout=timeout, auth=auth)
+                                  vp=vp, timeout=timeout, auth=auth, workers=workers, session=session)
+    print_issues_report(issues_dict, since, until)
+
+
+def print_issues_report(issues_dict: Dict[str, int], since: Union[str, None] = None,
+                        until: Union[str, None] = None) -> None:
+    """
+    Print the collected data for issues
+        Args:
+            issues_dict (Dict[str, int]): Dictionary with keys: opened, closed, old
+            since (str): a string date in form "YYYY-MM-DD" or None
+            until (str): a string date in form "YYYY-MM-DD" or None
+        Returns:
+            None
+        Examples:
+            >>> print_issues_report({"opened": 101, "closed": 38, "old": 7}, "2020-12-27")
+            Issues data since 2020-12-27:
+            Opened 101
+            Closed 38
+            Old: 7
+    """
     time_period = get_time_period_string(since, until)
     print(f"Issues data {time_period}:")
     print(f"Opened: {issues_dict['opened']:13d}")
@@ -487,6 +273,26 @@ def print_issues_data(repo_url: str, since: Union[str, None] = None, until: Unio
     print(f"Old: {issues_dict['old']:16d}")
 
 
+def get_scheduler(script_args: argparse.Namespace,
+                  auth: requests.auth.HTTPBasicAuth = None) -> RateLimitScheduler:
+    """
+    Creates a rate limit scheduler for the authorization from username and token and all the given tokens
+        Args:
+            script_args (argparse.Namespace): Namespace of the script arguments.
+            auth (requests.auth.HTTPBasicAuth): authorization from get_authentication
+        Returns:
+            scheduler (RateLimitScheduler): scheduler rotating the authorizations,
+            without any of them requests are not authorized
+        Examples:
+            >>> get_scheduler(args, auth)
+            <RateLimitScheduler object>
+    """
+    auths = [TokenAuth(token) for token in script_args.tokens]
+    if script_args.username is not None and script_args.token is not None:
+        auths.insert(0, auth)
+    return RateLimitScheduler(auths, script_args.visual_progress)
+
+
 def check_args(script_args: argparse.Namespace) -> None:
     """
     Checks that all script argumets are allowed.
@@ -523,6 +329,25 @@ def check_args(script_args: argparse.Namespace) -> None:
     if script_args.request_timeout < 0:
         raise ValueError(f"Number of seconds for request timeout must be greater than 0. "
                          f"Run script with --help or -h flag for more information")
+    if script_args.workers < 1:
+        raise ValueError(f"Number of concurrent requests must be greater than 0. "
+                         f"Run script with --help or -h flag for more information")
+    if script_args.backend == "graphql" and (script_args.username is None or script_args.token is None) \
+            and not script_args.tokens:
+        raise ValueError(f"Github GraphQL api needs authorization, pass --username and --token or --tokens. "
+                         f"Run script with --help or -h flag for more information")
+    if script_args.backend == "graphql" and script_args.store is not None:
+        raise ValueError(f"The local store is synced with REST api only, don't use --store with graphql backend. "
+                         f"Run script with --help or -h flag for more information")
+    if script_args.offline and script_args.store is None:
+        raise ValueError(f"Offline statistic needs a local store, pass it with --store. "
+                         f"Run script with --help or -h flag for more information")
+    if script_args.cache_size < 0:
+        raise ValueError(f"Size of the response cache must not be negative. "
+                         f"Run script with --help or -h flag for more information")
+    if script_args.retries < 0:
+        raise ValueError(f"Number of request retries must not be negative. "
+                         f"Run script with --help or -h flag for more information")
 
 
 def get_script_args() -> argparse.Namespace:
@@ -556,6 +381,9 @@ def get_script_args() -> argparse.Namespace:
                                                             "increase the number of request from 60 to 5000 per hour")
     parser.add_argument("--token", "-t", type=str, help="You can pass your personal github token to authorize and "
                                                         "increase the number of request from 60 to 5000 per hour")
+    parser.add_argument("--tokens", "-ts", type=str, nargs="+", default=[],
+                        help="Several personal github tokens. Requests are spread across the tokens by their "
+                             "remaining rate limit, when all of them are spent the script waits for a reset")
     parser.add_argument("--top_contributors", "-tc", type=int, default=30,
                         help="Number of required top contributors. The default value is 30")
     parser.add_argument("--pr_days_to_old", "-pro", type=int, default=30,
@@ -567,6 +395,35 @@ def get_script_args() -> argparse.Namespace:
     parser.add_argument("--request_timeout", "-rto", type=int, default=10,
                         help="Each request takes from 1 to inf seconds. If a server needs more time to respond, "
                              "you can modify number of seconds for request timeout. Default value is 10 seconds")
+    parser.add_argument("--workers", "-w", type=int, default=8,
+                        help="Maximal number of pages requested concurrently. Pages of long lists are fetched "
+                             "in parallel when github gives a link to the last page. The default value is 8")
+    parser.add_argument("--retries", "-rt", type=int, default=RETRIES,
+                        help=f"How many times to retry a request after a connection error or a server error. "
+                             f"The default value is {RETRIES}")
+    parser.add_argument("--no_compression", "-nc", action="store_true",
+                        help="Don't ask github for gzip compressed responses")
+    parser.add_argument("--backend", "-be", type=str, choices=BACKENDS, default="rest",
+                        help="Github api to collect statistic with. graphql requests only the fields the statistic "
+                             "needs and gets pull requests and issues by the same requests, needs authorization. "
+                             "The default value is rest")
+    parser.add_argument("--store", "-st", type=str,
+                        help="Path to a local mirror of commits, pull requests and issues. The mirror is synced with "
+                             "github incrementally and the statistic is computed from it, so other time periods and "
+                             "numbers of top contributors don't need requests to github")
+    parser.add_argument("--offline", "-off", action="store_true",
+                        help="Don't sync the local mirror, compute the statistic from what is already stored")
+    parser.add_argument("--cache", "-c", type=str, default=str(CACHE_PATH),
+                        help=f"Path to the response cache. Cached pages are revalidated with github and are not "
+                             f"downloaded again if they didn't change, such requests don't count against the rate "
+                             f"limit. The default value is {CACHE_PATH}")
+    parser.add_argument("--cache_size", "-cs", type=int, default=CACHE_SIZE_MB,
+                        help=f"Maximal size of the response cache in megabytes, least recently used responses are "
+                             f"evicted. The default value is {CACHE_SIZE_MB}")
+    parser.add_argument("--no_cache", "-ncc", action="store_true",
+                        help="Don't use the response cache, all pages are downloaded")
+    parser.add_argument("--clear_cache", "-cc", action="store_true",
+                        help="Clear the response cache before collecting statistic")
     parser.add_argument("--visual_progress", "-vp", type=bool, default=True,
                         help="Visual progress. Each request takes from 1 to inf seconds. To visualize that the script "
                              "is working prints a dot with each get request. The default value is True")
@@ -576,12 +433,14 @@ def get_script_args() -> argparse.Namespace:
     return script_args
 
 
-def get_authentication(script_args: argparse.Namespace) -> requests.auth.HTTPBasicAuth:
+def get_authentication(script_args: argparse.Namespace,
+                       session: requests.Session = None) -> requests.auth.HTTPBasicAuth:
     """
     Tries to authorize with given username and token
         Args:
             script_args (argparse.Namespace): Namespace of the script arguments.
             Must have username and token fileds not None.
+            session (requests.Session): client from get_session, if None - the default session is used
         Returns:
             authentication (requests.auth.HTTPBasicAuth): authentication object
         Examples:
@@ -589,10 +448,13 @@ def get_authentication(script_args: argparse.Namespace) -> requests.auth.HTTPBas
             requests.auth.HTTPBasicAuth
     """
     auth = requests.auth.HTTPBasicAuth(script_args.username, script_args.token)
-    if args.username is None or args.token is None:
+    if script_args.username is None or script_args.token is None:
         return auth
 
-    auth_response = requests.get(f"https://api.github.com/users/{script_args.username}", auth=auth)
+    if session is None:
+        session = get_default_session()
+    auth_response = session.get(f"https://api.github.com/users/{script_args.username}", auth=auth,
+                                timeout=script_args.request_timeout)
     if auth_response.status_code == 404:
         raise requests.HTTPError(f"No user with {script_args.username} or given token")
     auth_response.raise_for_status()
@@ -604,20 +466,39 @@ def get_authentication(script_args: argparse.Namespace) -> requests.auth.HTTPBas
 
 if __name__ == "__main__":
     args = get_script_args()
-    authentication = get_authentication(args)
-
+    response_cache = None
+    if args.clear_cache or not args.no_cache:
+        response_cache = ResponseCache(Path(args.cache), args.cache_size * 1024 * 1024)
+        if args.clear_cache:
+            response_cache.clear()
+        if args.no_cache:
+            response_cache.close()
+            response_cache = None
+    repository_store = None
+    if args.store is not None:
+        repository_store = RepositoryStore(Path(args.store))
     print(f"Collecting data for {args.url} {get_time_period_string(args.since, args.until)}, {args.branch}")
-
-    print("\nCollecting contributors data. It might take a few minutes.")
-    print_top_active(repo_url=args.url, since=args.since, until=args.until, branch=args.branch,
-                     top=args.top_contributors, vp=args.visual_progress, timeout=args.request_timeout,
-                     auth=authentication)
-
-    print("\nCollecting pull requests data. It might take a few minutes.")
-    print_pr_data(repo_url=args.url, since=args.since, until=args.until, branch=args.branch,
-                  days_to_old=args.pr_days_to_old, vp=args.visual_progress,
-                  timeout=args.request_timeout, auth=authentication)
-
-    print("\nCollecting issues data. It might take a few minutes.")
-    print_issues_data(repo_url=args.url, since=args.since, until=args.until, days_to_old=args.issue_days_to_old,
-                      vp=args.visual_progress, timeout=args.request_timeout, auth=authentication)
+    if not args.offline:
+        with get_session(3 * args.workers, args.retries, not args.no_compression,
+                         cache=response_cache) as shared_session:
+            authentication = get_authentication(args, shared_session)
+            shared_session.get_adapter("https://").scheduler = get_scheduler(args, authentication)
+            if repository_store is None:
+                print("\nCollecting contributors, pull requests and issues data. It might take a few minutes.")
+                collect = collect_statistic_graphql if args.backend == "graphql" else collect_statistic
+                top_active, pull_requests, issues = collect(args, authentication, shared_session)
+            else:
+                print("\nSyncing contributors, pull requests and issues data. It might take a few minutes.")
+                sync_store(repository_store, args, authentication, shared_session)
+    if repository_store is not None:
+        top_active, pull_requests, issues = query_statistic(repository_store, args)
+        repository_store.close()
+
+    print()
+    print_top_active_report(top_active, since=args.since, until=args.until, branch=args.branch)
+    print()
+    print_pr_report(pull_requests, since=args.since, until=args.until, branch=args.branch)
+    print()
+    print_issues_report(issues, since=args.since, until=args.until)
+    if response_cache is not None:
+        response_cache.close()
@@ -0,0 +1,238 @@
+import argparse
+import datetime
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import requests
+
+from rest_backend import get_commits_payload, get_repository_name, iter_pages, to_iso_date
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    repository TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    login TEXT,
+    date TEXT NOT NULL,
+    PRIMARY KEY (repository, branch, sha)
+);
+CREATE INDEX IF NOT EXISTS commits_date ON commits(repository, branch, date);
+CREATE TABLE IF NOT EXISTS issues (
+    repository TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    base TEXT,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    closed_at TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (repository, kind, number)
+);
+CREATE INDEX IF NOT EXISTS issues_updated_at ON issues(repository, kind, updated_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    repository TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    synced_until TEXT,
+    PRIMARY KEY (repository, kind, branch)
+);
+"""
+
+
+class RepositoryStore:
+    """
+    Local sqlite mirror of commit authors and dates, and of state, creation and closing dates of pull requests
+    and issues. Statistic for any time period, branch or number of top contributors is computed by queries
+    to the mirror without requests to github.api. Can be shared by threads.
+    """
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.executescript(STORE_SCHEMA)
+
+    def add_commits(self, repository: str, branch: str, commits: List[dict]) -> None:
+        rows = [(repository, branch, commit["sha"], None if commit["author"] is None else commit["author"]["login"],
+                 commit["commit"]["committer"]["date"]) for commit in commits]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?)", rows)
+
+    def add_issues(self, repository: str, kind: str, issues: List[dict]) -> None:
+        rows = [(repository, kind, issue["number"], issue["base"]["ref"] if "base" in issue else None,
+                 issue["state"], issue["created_at"], issue["closed_at"], issue["updated_at"]) for issue in issues]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def get_synced_until(self, repository: str, kind: str, branch: str = "") -> Union[str, None]:
+        """
+        Gives the watermark of the last complete sync of commits of the branch or of pull requests or issues,
+        records newer than it are requested by the next sync
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT synced_until FROM sync_state "
+                                          "WHERE repository = ? AND kind = ? AND branch = ?",
+                                          (repository, kind, branch)).fetchone()
+        return None if row is None else row[0]
+
+    def mark_synced(self, repository: str, kind: str, branch: str = "") -> None:
+        """
+        Moves the watermark to the newest stored commit date or update, called after a complete sync only, so
+        pages stored by an interrupted sync are requested again instead of leaving holes before the watermark
+        """
+        if kind == "commit":
+            newest = "SELECT max(date) FROM commits WHERE repository = ? AND branch = ?"
+            parameters = (repository, branch)
+        else:
+            newest = "SELECT max(updated_at) FROM issues WHERE repository = ? AND kind = ?"
+            parameters = (repository, kind)
+        with self.lock, self.connection:
+            self.connection.execute(f"INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ({newest}))",
+                                    (repository, kind, branch) + parameters)
+
+    def get_top_active(self, repository: str, since: Union[str, None] = None, until: Union[str, None] = None,
+                       branch: str = "master", top: int = 30) -> List[Tuple[str, int]]:
+        """
+        Gives (login, contributions) of the top contributors ordered by contributions, the same time period
+        borders as github.api List commits uses: since and until are the beginnings of the days
+        """
+        since, until = to_iso_date(since), to_iso_date(until)
+        sql = "SELECT login, count(*) FROM commits WHERE repository = ? AND branch = ? AND login IS NOT NULL"
+        parameters = [repository, branch]
+        if since is not None:
+            sql += " AND date >= ?"
+            parameters.append(f"{since}T00:00:00Z")
+        if until is not None:
+            sql += " AND date <= ?"
+            parameters.append(f"{until}T00:00:00Z")
+        sql += " GROUP BY login ORDER BY count(*) DESC, max(date) DESC LIMIT ?"
+        with self.lock:
+            return self.connection.execute(sql, parameters + [top]).fetchall()
+
+    def get_issues_dict(self, repository: str, kind: str, since: Union[str, None] = None,
+                        until: Union[str, None] = None, days_to_old: int = 30, branch: Union[str, None] = None,
+                        today: Union[datetime.date, None] = None) -> Dict[str, int]:
+        """
+        Counts opened, closed and old pull requests or issues of the given time period the same way
+        as get_issues_dict does
+        """
+        if today is None:
+            today = datetime.date.today()
+        since, until = to_iso_date(since), to_iso_date(until)
+        in_period = "substr({0}, 1, 10) BETWEEN coalesce(?, '0000-00-00') AND coalesce(?, '9999-99-99')"
+        sql = f"SELECT " \
+              f"coalesce(sum({in_period.format('created_at')}), 0), " \
+              f"coalesce(sum(closed_at IS NOT NULL AND {in_period.format('closed_at')}), 0), " \
+              f"coalesce(sum({in_period.format('created_at')} AND state = 'open' " \
+              f"AND julianday(?) - julianday(substr(created_at, 1, 10)) >= ?), 0) " \
+              f"FROM issues WHERE repository = ? AND kind = ?"
+        parameters = [since, until, since, until, since, until, today.isoformat(), days_to_old, repository, kind]
+        if branch is not None:
+            sql += " AND base = ?"
+            parameters.append(branch)
+        with self.lock:
+            opened, closed, old = self.connection.execute(sql, parameters).fetchone()
+        return {"opened": opened, "closed": closed, "old": old}
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def sync_commits(store: RepositoryStore, repo_url: str, branch: str = "master", vp: bool = True,
+                 timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                 session: requests.Session = None) -> None:
+    """
+    Adds commits of the branch to the store. Only commits since the newest commit date of the last complete sync
+    are requested, commits pushed later with older dates are not seen by such sync.
+    Arguments are the same as of print_top_active
+    """
+    repository = get_repository_name(repo_url)
+    newest = store.get_synced_until(repository, "commit", branch)
+    payload = get_commits_payload(newest, None, branch)
+    get_url = f"https://api.github.com/repos/{repository}/commits"
+    not_found_message = f"Error 404. Can't find repository: https://github.com/{repository} with branch: {branch}"
+    for response in iter_pages(get_url, payload, not_found_message, workers, vp, timeout, auth, session):
+        store.add_commits(repository, branch, response.json())
+    store.mark_synced(repository, "commit", branch)
+
+
+def sync_issues(store: RepositoryStore, repo_url: str, pr_issue: bool = False, vp: bool = True,
+                timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                session: requests.Session = None) -> None:
+    """
+    Adds pull requests or issues updated since the newest update of the last complete sync to the store. Issues are
+    requested with since parameter, pull requests have no such parameter and are requested from the most recently
+    updated ones until an already synced update. Arguments are the same as of get_issues_dict
+    """
+    repository = get_repository_name(repo_url)
+    kind = "pull" if pr_issue else "issue"
+    newest = store.get_synced_until(repository, kind)
+    payload = {"per_page": 100, "page": 1, "state": "all"}
+    if pr_issue:
+        payload.update({"sort": "updated", "direction": "desc"})
+        if newest is not None:
+            workers = 1  # usually only the first page is needed
+    elif newest is not None:
+        payload["since"] = newest
+    get_url = f"https://api.github.com/repos/{repository}/{kind}s"
+    not_found_message = f"Error 404. Can't find repository: https://github.com/{repository}"
+    for response in iter_pages(get_url, payload, not_found_message, workers, vp, timeout, auth, session):
+        issues = response.json()
+        store.add_issues(repository, kind, issues)
+        if pr_issue and newest is not None and issues and issues[-1]["updated_at"] < newest:
+            break
+    store.mark_synced(repository, kind)
+
+
+def sync_store(store: RepositoryStore, script_args: argparse.Namespace, auth: requests.auth.HTTPBasicAuth = None,
+               session: requests.Session = None) -> None:
+    """
+    Brings commits of the branch, pull requests and issues in the store up to date, the three are synced
+    concurrently like in collect_statistic
+        Args:
+            store (RepositoryStore): local mirror of the repository
+            script_args (argparse.Namespace): Namespace of the script arguments.
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            None
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> sync_store(RepositoryStore(Path("repositories.sqlite")), args)
+    """
+    request_args = {"vp": script_args.visual_progress, "timeout": script_args.request_timeout, "auth": auth,
+                    "workers": script_args.workers, "session": session}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(sync_commits, store, script_args.url, script_args.branch, **request_args),
+                   executor.submit(sync_issues, store, script_args.url, True, **request_args),
+                   executor.submit(sync_issues, store, script_args.url, False, **request_args)]
+        for future in futures:
+            future.result()
+
+
+def query_statistic(store: RepositoryStore,
+                    script_args: argparse.Namespace) -> Tuple[List[Tuple[str, int]], Dict[str, int], Dict[str, int]]:
+    """
+    Computes the same statistic as collect_statistic from the local mirror, without requests to github.api
+        Args:
+            store (RepositoryStore): local mirror of the repository
+            script_args (argparse.Namespace): Namespace of the script arguments.
+        Returns:
+            statistic (Tuple[List[Tuple[str, int]], Dict[str, int], Dict[str, int]]): top contributors,
+            pull requests and issues data
+        Examples:
+            >>> query_statistic(store, args)
+            ([("login1", 155), ...], {"opened": 83, "closed": 50, "old": 4}, {"opened": 101, "closed": 38, "old": 7})
+    """
+    repository = get_repository_name(script_args.url)
+    top_contributors = store.get_top_active(repository, script_args.since, script_args.until, script_args.branch,
+                                            script_args.top_contributors)
+    pull_request_dict = store.get_issues_dict(repository, "pull", script_args.since, script_args.until,
+                                              script_args.pr_days_to_old, script_args.branch)
+    issues_dict = store.get_issues_dict(repository, "issue", script_args.since, script_args.until,
+                                        script_args.issue_days_to_old)
+    return top_contributors, pull_request_dict, issues_dict
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import requests
+
+from rate_limit import RateLimitAdapter, RateLimitScheduler
+
+CACHE_PATH = Path.home() / ".cache" / "repo_statistic" / "responses.sqlite"
+CACHE_SIZE_MB = 256
+LIVE_HEADERS = ("Date", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "X-RateLimit-Used",
+                "X-RateLimit-Resource")
+DECODED_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding")
+
+
+class ResponseCache:
+    """
+    Persistent cache of github.api responses in an sqlite file. Keeps body, headers and validators
+    (ETag and Last-Modified) of every response by its key. When total size of the bodies grows over max_size bytes,
+    least recently used responses are evicted. Can be shared by threads.
+    """
+    def __init__(self, path: Path = CACHE_PATH, max_size: int = CACHE_SIZE_MB * 1024 * 1024):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, etag TEXT, "
+                                "last_modified TEXT, headers TEXT NOT NULL, body BLOB NOT NULL, "
+                                "size INTEGER NOT NULL, used REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses(used)")
+        self.size = self.connection.execute("SELECT coalesce(sum(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Union[Tuple[str, str, Dict[str, str], bytes], None]:
+        """
+        Gives cached (etag, last_modified, headers, body) for the key or None if the key is not cached
+        """
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT etag, last_modified, headers, body FROM responses WHERE key = ?",
+                                          (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE responses SET used = ? WHERE key = ?", (time.time(), key))
+        etag, last_modified, headers, body = row
+        return etag, last_modified, json.loads(headers), body
+
+    def put(self, key: str, etag: Union[str, None], last_modified: Union[str, None], headers: Dict[str, str],
+            body: bytes) -> None:
+        with self.lock, self.connection:
+            old_size = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old_size is not None:
+                self.size -= old_size[0]
+            self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    (key, etag, last_modified, json.dumps(headers), body, len(body), time.time()))
+            self.size += len(body)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.size > self.max_size:
+            rows = self.connection.execute("SELECT key, size FROM responses ORDER BY used LIMIT 100").fetchall()
+            if not rows:
+                self.size = 0
+                return
+            for key, size in rows:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                if self.size <= self.max_size:
+                    return
+
+    def clear(self) -> None:
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+            self.size = 0
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class CachingAdapter(RateLimitAdapter):
+    """
+    Transport adapter that revalidates cached GET responses with If-None-Match and If-Modified-Since headers.
+    A 304 Not Modified response, that github doesn't count against the rate limit, is replaced by the cached
+    response with fresh date and rate limit headers. Requests are cached by the authorization they are sent
+    with, after the scheduler picked it.
+    """
+    def __init__(self, cache: ResponseCache, scheduler: RateLimitScheduler = None, **kwargs):
+        super().__init__(scheduler, **kwargs)
+        self.cache = cache
+
+    @staticmethod
+    def get_key(request: requests.PreparedRequest) -> str:
+        """
+        Cache key of a request: its URL with parameters and a hash of its authorization,
+        different users may get different responses
+        """
+        authorization = request.headers.get("Authorization", "")
+        return f"{request.url} {hashlib.sha256(authorization.encode()).hexdigest()[:16]}"
+
+    def send_authorized(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if request.method != "GET":
+            return super().send_authorized(request, **kwargs)
+        request.headers.pop("If-None-Match", None)  # left by a try with another authorization
+        request.headers.pop("If-Modified-Since", None)
+        key = self.get_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            etag, last_modified, _, _ = cached
+            if etag is not None:
+                request.headers["If-None-Match"] = etag
+            if last_modified is not None:
+                request.headers["If-Modified-Since"] = last_modified
+
+        response = super().send_authorized(request, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            response.content  # reads the empty body, so the connection goes back to the pool
+            _, _, headers, body = cached
+            live_headers = {name: response.headers[name] for name in LIVE_HEADERS if name in response.headers}
+            response.headers.clear()
+            response.headers.update(headers)
+            response.headers.update(live_headers)
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = body
+            return response
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag is not None or last_modified is not None):
+            headers = {name: value for name, value in response.headers.items() if name not in DECODED_HEADERS}
+            self.cache.put(key, etag, last_modified, headers, response.content)
+        return response
@@ -0,0 +1,569 @@
+import argparse
+import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from urllib3.util.retry import Retry
+
+from rate_limit import RATE_LIMIT_STATUSES, RateLimitAdapter, RateLimitScheduler
+from response_cache import CachingAdapter, ResponseCache
+
+PAGES_PER_WORKER = 2
+POOL_SIZE = 10
+RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (500, 502, 503, 504)
+GITHUB_API_HEADERS = {"Accept": "application/vnd.github.v3+json",
+                      "User-Agent": "repo-statistic"}
+
+
+def in_time_period(date_to_check: datetime.datetime,
+                   since_date: Union[datetime.datetime, None],
+                   until_date: Union[datetime.datetime, None]) -> bool:
+    """
+    Checks if the date_to_check is in between since_date and until_date
+        Args:
+            date_to_check (datetime.datetime): date which should be checked
+            since_date (datetime.datetime): minimal allowed value for date_to_check. If None - no minimal border
+            until_date (datetime.datetime): maximal allowed value for date_to_check. If None - no maximal border
+        Returns:
+            (bool) : True if date_to_check is in between since_date and until_date, False otherwise
+        Examples:
+            >>> date_to_check = datetime.datetime.strptime("2020-12-27", "%Y-%m-%d")
+            >>> in_time_period(date_to_check,  None, None)
+            True
+            >>> since_date = datetime.datetime.strptime("1994-12-27", "%Y-%m-%d")
+            >>> in_time_period(date_to_check,  since_date, None)
+            True
+            >>> until_date = datetime.datetime.strptime("2000-12-27", "%Y-%m-%d")
+            >>> in_time_period(date_to_check,  since_date, until_date)
+            False
+    """
+    if (since_date is not None) and (until_date is not None):
+        return since_date <= date_to_check <= until_date
+    elif since_date is not None:
+        return since_date <= date_to_check
+    elif until_date is not None:
+        return date_to_check <= until_date
+    else:  # No time borders - date_to_check is always in a period
+        return True
+
+
+class OutOfLimitError(Exception):
+    pass
+
+
+def raise_for_limit(response: requests.request) -> None:
+    """
+    Checks if the request was refused because the script ran out of requests. Github api gives 60 requests/hour
+    for no authorized and 5000/hour for authorized requests. A successful response that used the last request
+    is fine, a session with a RateLimitScheduler never gives refused responses.
+        Args:
+            response(requests.request): response for a get request to github.api
+        Returns:
+            None
+        Raises:
+            OutOfLimitError: raises when no requests to github.api remaining
+        Examples:
+            >>> raise_for_limit(response)
+            OutOfLimitError: You're out of requests, wait for an hour to get another 60 requests.
+
+    """
+    if response.status_code in RATE_LIMIT_STATUSES and response.headers.get("X-RateLimit-Remaining") == "0":
+        raise OutOfLimitError(f"You're out of requests, wait for an hour"
+                              f" to get another {response.headers.get('X-RateLimit-Limit')} requests.")
+
+
+def get_commits_payload(since: Union[str, None], until: Union[str, None], branch: str) -> Dict[str, Union[str, int]]:
+    """
+    Creates payload for get commits request from github.api: List commits.
+    Parameter per_page is set to 100 (max value). Parameter page is set to 1
+        Args:
+            since (str): a string date in form "YYYY-MM-DD" or None
+            until (str): a string date in form "YYYY-MM-DD" or None
+            branch (str): name of a branch in repository
+        Returns:
+            payload (Dict[str, Union[str, int]]) dictionary with parameters for List commits in github.api
+        Examples:
+            >>> get_commits_payload("2020-12-27", None, "master")
+            {"sha": "master", "since": "2020-12-27", "per_page": 100, "page": 1}
+    """
+    payload = {"sha": branch, "per_page": 100, "page": 1}
+    if since is not None:
+        payload["since"] = since
+    if until is not None:
+        payload["until"] = until
+    return payload
+
+
+def get_server_date(words_date_str: str) -> datetime.datetime:
+    """
+    Tries to get a server date from response header. Standard github date is YYYY-MM-DD,
+    but the server one is "Sun, 17 Jan 2021 20:18:17 GMT". Didn't find any docs so uses try - except for the
+    entire algorithm. This should not be bad because this function runs only 2 times per sript run.
+        Args:
+            words_date_str (str): response header date
+        Returns:
+            server_date (datetime.datetime): server date if possible, else - local machine date
+        Examples:
+            >>> get_server_date("Sun, 17 Jan 2021 20:18:17 GMT")
+            datetime.datetime(2021, 1, 17)
+    """
+    try:
+        week_day, date = words_date_str.split(', ')  # 'Sun, 17 Jan 2021 20:18:17 GMT'
+        day, month, year, time, timezone = date.split(' ')
+        month_dict = {"Jan": "01", "Feb": "02", "March": "03",
+                      "April": "04", "May": "05", "June": "06",
+                      "July": "07", "Aug": "08", "Sept": "09",
+                      "Oct": "10", "Nov": "11", "Dec": "12"}
+        if month in month_dict:
+            month = month_dict[month]
+        else:  # Can't find github's month names, may be they are different
+            month = str(datetime.datetime.now().month)
+        server_date = datetime.datetime.strptime(f"{year}-{month}-{day}", "%Y-%m-%d")
+        return server_date
+    except ValueError:
+        return datetime.datetime.now()
+
+
+def get_session(pool_size: int = POOL_SIZE, retries: int = RETRIES, compression: bool = True,
+                auth: requests.auth.HTTPBasicAuth = None, cache: ResponseCache = None,
+                scheduler: RateLimitScheduler = None) -> requests.Session:
+    """
+    Creates a client for github.api: a session that keeps up to pool_size connections alive and reuses them
+    for all requests, so only the first request to the host pays for TCP and TLS handshakes.
+    The session can be shared by threads.
+        Args:
+            pool_size (int): maximal number of connections kept open, should be not less than number
+            of threads using the session
+            retries (int): how many times to retry a request after a connection error or a 5XX status code
+            compression (bool): ask for gzip compressed responses, github.api json is compressed several times
+            auth (requests.auth.HTTPBasicAuth): authorization used for every request of the session
+            cache (ResponseCache): cache of responses that are revalidated with github instead of downloaded again,
+            if None - responses are not cached
+            scheduler (RateLimitScheduler): scheduler that picks authorization for every request and waits for
+            rate limit resets, if None - requests are sent with their own authorization as soon as possible
+        Returns:
+            session (requests.Session): session with a mounted connection pool
+        Examples:
+            >>> get_session(24)
+            <requests.sessions.Session object>
+    """
+    session = requests.Session()
+    session.headers.update(GITHUB_API_HEADERS)
+    session.headers["Accept-Encoding"] = "gzip, deflate" if compression else "identity"
+    session.auth = auth
+    retry = Retry(total=retries, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES,
+                  raise_on_status=False)
+    if cache is None:
+        adapter = RateLimitAdapter(scheduler, pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    else:
+        adapter = CachingAdapter(cache, scheduler, pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+@lru_cache(maxsize=None)
+def get_default_session() -> requests.Session:
+    """
+    Gives a session shared by all requests that were not given a session
+        Returns:
+            session (requests.Session): session created with default get_session arguments
+        Examples:
+            >>> get_default_session() is get_default_session()
+            True
+    """
+    return get_session()
+
+
+def get_last_page(response: requests.Response) -> Union[int, None]:
+    """
+    Gets number of the last page from the Link header of a github.api response
+        Args:
+            response (requests.Response): response for a get request of a list to github.api
+        Returns:
+            last_page (Union[int, None]): number of the last page or None if the response has no link to it,
+            github gives no link for a list that fits in one page
+        Examples:
+            >>> response.headers["Link"]
+            '<https://api.github.com/repositories/1/commits?per_page=100&page=2>; rel="next", <https://api.github.com/repositories/1/commits?per_page=100&page=515>; rel="last"'
+            >>> get_last_page(response)
+            515
+    """
+    last_url = response.links.get("last", {}).get("url")
+    if last_url is None:
+        return None
+    pages = parse_qs(urlparse(last_url).query).get("page")
+    if not pages or not pages[0].isdigit():
+        return None
+    return int(pages[0])
+
+
+def get_page(get_url: str, payload: Dict[str, Union[str, int]], not_found_message: str, vp: bool = True,
+             timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None,
+             session: requests.Session = None) -> requests.Response:
+    """
+    Gets one page of a list from github.api and checks the response
+        Args:
+            get_url (str): github.api URL of a list
+            payload (Dict[str, Union[str, int]]): dictionary with the list parameters including page
+            not_found_message (str): message of the HTTPError raised for 404 status code
+            vp (bool): visual progress. If True - print's a dot with each get request
+            timeout (int): request timeout in seconds
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            response (requests.Response): checked response
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> get_page("https...", {"per_page": 100, "page": 3, "state": "all"}, "Error 404")
+            <Response [200]>
+    """
+    if vp:
+        print('.', end='', flush=True)  # Just a visualisation that the script is working
+    if session is None:
+        session = get_default_session()
+    response = session.get(get_url, params=payload, timeout=timeout, auth=auth)
+    if response.status_code == 404:
+        raise requests.HTTPError(not_found_message)
+    raise_for_limit(response)
+    response.raise_for_status()
+    return response
+
+
+def iter_pages(get_url: str, payload: Dict[str, Union[str, int]], not_found_message: str, workers: int = 8,
+               vp: bool = True, timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None,
+               session: requests.Session = None) -> Iterator[requests.Response]:
+    """
+    Gives responses for all pages of a list from github.api in page order. The first page is fetched alone,
+    if its Link header points to the last page the rest of the pages are fetched concurrently by at most workers
+    threads with at most PAGES_PER_WORKER pages per worker in flight. Without the link pages are fetched one by one
+    until a page shorter than per_page.
+        Args:
+            get_url (str): github.api URL of a list
+            payload (Dict[str, Union[str, int]]): dictionary with the list parameters, page is the first page
+            not_found_message (str): message of the HTTPError raised for 404 status code
+            workers (int): maximal number of concurrent requests
+            vp (bool): visual progress. If True - print's a dot with each get request
+            timeout (int): request timeout in seconds
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            responses (Iterator[requests.Response]): checked responses in page order
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> [len(response.json()) for response in iter_pages("https...", {"per_page": 100, "page": 1}, "")]
+            [100, 100, 37]
+    """
+    first_page = payload["page"]
+    response = get_page(get_url, payload, not_found_message, vp, timeout, auth, session)
+    yield response
+    last_page = get_last_page(response)
+    if last_page is None:
+        page = first_page
+        while len(response.json()) >= payload["per_page"]:  # a short page is the last one
+            page += 1
+            response = get_page(get_url, dict(payload, page=page), not_found_message, vp, timeout, auth, session)
+            yield response
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for page in range(first_page + 1, last_page + 1):
+            pending.append(executor.submit(get_page, get_url, dict(payload, page=page), not_found_message,
+                                           vp, timeout, auth, session))
+            if len(pending) >= workers * PAGES_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def get_contributors_dict(get_url: str, payload: Dict[str, Union[str, int]], top: int = 30, vp: bool = True,
+                          timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None,
+                          workers: int = 8, session: requests.Session = None) -> List[Tuple[str, int]]:
+    """
+    Counts all commits and returns a list of the (top) most active contributors within given time period for
+    the given branch. If number of contributors is less than top, returns data for all contributors.
+    Uses List commits from github.api.
+        Args:
+            get_url (str): "https://api.github.com/repos/{owner}/{repository}/commits" format string
+            payload (Dict[str, Union[str, int]]): dictionary with github.api: List commits parameters
+            top (int): number of top required contributors
+            vp (bool): visual progress. If True - print's a dot with each get request
+            timeout (int): request timeout in seconds
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            workers (int): maximal number of concurrent page requests
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            top_contributors_sorted (List[Tuple[str, int]]): List of tuples (login, contributions),
+            ordered by contributions
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> get_contributors_dict("https...", {"sha": "master", "since": "2015-12-27", "per_page": 100, "page": 1})
+            [("login1", 155), ("login2", 143) ...]
+    """
+    repo = get_url.replace("https://api.github.com/repos", "https://github.com")[:-len(get_url.split('/')[-1])]
+    not_found_message = f"Error 404. Can't find repository: {repo} with branch: {payload['sha']}"
+    top_contributors = {}
+    for response in iter_pages(get_url, payload, not_found_message, workers, vp, timeout, auth, session):
+        for commit in response.json():
+            if commit["author"] is None:
+                continue
+            login = commit["author"]["login"]
+            if login in top_contributors:
+                top_contributors[login] += 1
+            else:
+                top_contributors[login] = 1
+    if vp:
+        print()
+    top_contributors_sorted = sorted(top_contributors.items(), key=lambda item: item[1], reverse=True)
+    return top_contributors_sorted[:top]
+
+
+def get_top_active(repo_url: str, since: Union[str, None] = None, until: Union[str, None] = None,
+                   branch: str = "master", top: int = 30, vp: bool = True, timeout: int = 10,
+                   auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                   session: requests.Session = None) -> List[Tuple[str, int]]:
+    """
+    Collects the top contributors for the given branch and time period. Arguments are the same as of
+    print_top_active
+        Returns:
+            top_contributors (List[Tuple[str, int]]): List of tuples (login, contributions),
+            ordered by contributions
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> get_top_active("https...")
+            [("login1", 155), ("login2", 143) ...]
+    """
+    owner = repo_url.split('/')[-2]
+    repository = repo_url.split('/')[-1]
+    payload = get_commits_payload(since, until, branch)
+    get_url = f"https://api.github.com/repos/{owner}/{repository}/commits"
+    return get_contributors_dict(get_url, payload, top, vp, timeout, auth, workers, session)
+
+
+def get_pr_payload(branch: str) -> Dict[str, Union[str, int]]:
+    """
+    Creates payload for github.api: List pull requests for the given branch.
+    Parameter per_page is set to 100 (max value). Parameter page is set to 1.
+    Parameter state is set to all - opened and closed PR.
+        Args:
+            branch (str): a name of the repository branch
+        Returns:
+            payload (Dict[str, str]) dictionary with parameter name as keys and parameter values as values
+        Examples:
+            >>> get_pr_payload("master")
+            {"base": "master", "per_page": 100, "page": 1, "state": "all"}
+    """
+    return {"base": branch, "per_page": 100, "page": 1, "state": "all"}
+
+
+def get_issues_payload() -> Dict[str, Union[str, int]]:
+    """
+    Creates payload for github.api: List issues.
+    Parameter per_page is set to 100 (max value). Parameter page is set to 1.
+    Parameter state is set to all - opend and closed issues.
+        Args:
+            (None)
+        Returns:
+            payload (Dict[str, str]) dictionary with parameter name as keys and parameter values as values
+        Examples:
+            >>> get_issues_payload()
+            {"per_page": 100, "page": 1, "state": "all"}
+    """
+    return {"per_page": 100, "page": 1, "state": "all"}
+
+
+def reduce_date(long_str_date: str) -> str:
+    """
+    Reduce '2021-01-14T09:02:42Z' to '2021-01-14'
+        Args:
+            long_str_date (str): issue 'created_at' field value
+        Returns:
+            github_date (str): issue 'created_at' field value reduced to 'YYYY-MM-DD' form
+        Examples:
+            >>> reduce_date('2021-01-14T09:02:42Z')
+            '2021-01-14'
+    """
+    return long_str_date.split('T')[0]
+
+
+def get_issues_dict(repo_url: str, payload: Dict[str, Union[str, int]], since: Union[str, None] = None,
+                    until: Union[str, None] = None, pr_issue: bool = False, days_to_old: int = 30, vp: bool = True,
+                    timeout: int = 10, auth: requests.auth.HTTPBasicAuth = None, workers: int = 8,
+                    session: requests.Session = None) -> Dict[str, int]:
+    """
+    Counts all issues of the given time period.
+    Returns a dictionary with number of opened, closed and old issues.
+        Args:
+            repo_url (str): URL to a github repository
+            payload (Dict[str, Union[str, int]]): dictionary with github.api: List pull requests or List issues
+            since (str): a string date in form "YYYY-MM-DD" or None, default is None
+            until (str): a string date in form "YYYY-MM-DD" or None, default is None
+            pr_issue (bool): interested only in pull requests, default False.
+            If true github.api List pull requests payload is expected
+            days_to_old (int): if an issue is created in the given time period and still
+            be opened for days_to_old or more it's consider to be an old one. The default value is 30
+            vp (bool): visual progress. If True - print's a dot with each get request, default is True
+            timeout (int): request timeout in seconds
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            workers (int): maximal number of concurrent page requests
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            pull_request_dict (Dict[str, int]): Dictionary with keys: opened, closed, old
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> get_issues_dict("https...", {"base": "master", "per_page": 100, "page": 1})
+            {"opened": 83, "closed": 50, "old": 4}
+    """
+    owner = repo_url.split('/')[-2]
+    repository = repo_url.split('/')[-1]
+    if pr_issue:
+        get_url = f"https://api.github.com/repos/{owner}/{repository}/pulls"
+    else:
+        get_url = f"https://api.github.com/repos/{owner}/{repository}/issues"
+
+    since_date, until_date = get_period_dates(since, until)
+
+    repo = get_url.replace("https://api.github.com/repos", "https://github.com")[:-len(get_url.split('/')[-1])]
+    not_found_message = f"Error 404. Can't find repository: {repo}"
+    today_date = None
+    issue_dict = {"opened": 0, "closed": 0, "old": 0}
+    for response in iter_pages(get_url, payload, not_found_message, workers, vp, timeout, auth, session):
+        if today_date is None:
+            today_date = get_server_date(response.headers.get("date"))  # Current server date
+        count_issues(issue_dict, response.json(), since_date, until_date, today_date, days_to_old)
+    if vp:
+        print()
+    return issue_dict
+
+
+def get_period_dates(since: Union[str, None],
+                     until: Union[str, None]) -> Tuple[Union[datetime.datetime, None], Union[datetime.datetime, None]]:
+    """
+    Turns borders of a time period into dates
+        Args:
+            since (str): a string date in form "YYYY-MM-DD" or None
+            until (str): a string date in form "YYYY-MM-DD" or None
+        Returns:
+            since_date, until_date (Tuple[Union[datetime.datetime, None], Union[datetime.datetime, None]]): dates
+            of the borders, None for no border
+        Examples:
+            >>> get_period_dates("2020-12-27", None)
+            (datetime.datetime(2020, 12, 27, 0, 0), None)
+    """
+    since_date = None if since is None else datetime.datetime.strptime(since, "%Y-%m-%d")
+    until_date = None if until is None else datetime.datetime.strptime(until, "%Y-%m-%d")
+    return since_date, until_date
+
+
+def count_issues(issue_dict: Dict[str, int], issues: List[dict], since_date: Union[datetime.datetime, None],
+                 until_date: Union[datetime.datetime, None], today_date: datetime.datetime, days_to_old: int) -> None:
+    """
+    Adds opened, closed and old issues of the given time period to the issue_dict
+        Args:
+            issue_dict (Dict[str, int]): Dictionary with keys: opened, closed, old
+            issues (List[dict]): issues or pull requests with state, created_at and closed_at fields
+            since_date (datetime.datetime): minimal date of the time period. If None - no minimal border
+            until_date (datetime.datetime): maximal date of the time period. If None - no maximal border
+            today_date (datetime.datetime): current server date
+            days_to_old (int): if an issue is created in the given time period and still
+            be opened for days_to_old or more it's consider to be an old one
+        Returns:
+            None
+        Examples:
+            >>> count_issues(issue_dict, [{"state": "open", "created_at": "2021-01-14T09:02:42Z", "closed_at": None}],
+            ...              None, None, datetime.datetime(2021, 3, 1), 30)
+            >>> issue_dict
+            {"opened": 1, "closed": 0, "old": 1}
+    """
+    for issue in issues:
+        created_date = datetime.datetime.strptime(reduce_date(issue["created_at"]), "%Y-%m-%d")
+        if in_time_period(created_date, since_date, until_date):
+            issue_dict["opened"] += 1
+            if issue["state"] == "open":
+                delta = today_date - created_date
+                if delta.days >= days_to_old:
+                    issue_dict["old"] += 1
+
+        if issue["closed_at"] is not None:
+            closed_date = datetime.datetime.strptime(reduce_date(issue["closed_at"]), "%Y-%m-%d")
+            if in_time_period(closed_date, since_date, until_date):
+                issue_dict["closed"] += 1
+
+
+def collect_statistic(script_args: argparse.Namespace, auth: requests.auth.HTTPBasicAuth = None,
+                      session: requests.Session = None) -> Tuple[List[Tuple[str, int]], Dict[str, int],
+                                                                 Dict[str, int]]:
+    """
+    Collects contributors, pull requests and issues data concurrently, each collector runs in its own thread
+    and all of them share the session connection pool. Takes as long as the slowest collector.
+        Args:
+            script_args (argparse.Namespace): Namespace of the script arguments.
+            auth (requests.auth.HTTPBasicAuth): authorization from HTTPBasicAuth for GET requests
+            session (requests.Session): client from get_session, if None - the default session is used
+        Returns:
+            statistic (Tuple[List[Tuple[str, int]], Dict[str, int], Dict[str, int]]): top contributors,
+            pull requests and issues data
+        Raises:
+            HTTPError: any http errors from response.raise_for_status() - not a 2XX status code
+            OutOfLimitError: raises when no requests to github.api remained
+        Examples:
+            >>> collect_statistic(args)
+            ([("login1", 155), ...], {"opened": 83, "closed": 50, "old": 4}, {"opened": 101, "closed": 38, "old": 7})
+    """
+    request_args = {"vp": script_args.visual_progress, "timeout": script_args.request_timeout, "auth": auth,
+                    "workers": script_args.workers, "session": session}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        top_contributors = executor.submit(get_top_active, script_args.url, script_args.since, script_args.until,
+                                           script_args.branch, script_args.top_contributors, **request_args)
+        pull_request_dict = executor.submit(get_issues_dict, script_args.url, get_pr_payload(script_args.branch),
+                                            script_args.since, script_args.until, pr_issue=True,
+                                            days_to_old=script_args.pr_days_to_old, **request_args)
+        issues_dict = executor.submit(get_issues_dict, script_args.url, get_issues_payload(), script_args.since,
+                                      script_args.until, days_to_old=script_args.issue_days_to_old, **request_args)
+        return top_contributors.result(), pull_request_dict.result(), issues_dict.result()
+
+
+def to_iso_date(github_date: Union[str, None]) -> Union[str, None]:
+    """
+    Turns a github date like 2020-5-7 into YYYY-MM-DD form that sqlite compares as a date
+        Args:
+            github_date (Union[str, None]): a string date in form "YYYY-MM-DD" or None
+        Returns:
+            iso_date (Union[str, None]): the date with two digit month and day or None
+        Examples:
+            >>> to_iso_date("2020-5-7")
+            '2020-05-07'
+    """
+    if github_date is None:
+        return None
+    return datetime.datetime.strptime(github_date, "%Y-%m-%d").date().isoformat()
+
+
+def get_repository_name(repo_url: str) -> str:
+    """
+    Gives OWNER/REPOSITORY of a github repository URL
+        Args:
+            repo_url (str): URL to a github repository
+        Returns:
+            repository (str): owner and repository names
+        Examples:
+            >>> get_repository_name("https://github.com/octocat/hello-world/")
+            'octocat/hello-world'
+    """
+    return '/'.join(repo_url.rstrip('/').split('/')[-2:])
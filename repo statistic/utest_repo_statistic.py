@@ -1,8 +1,79 @@
 #!/usr/bin/python
 
 import unittest
+import graphql_backend
+import rate_limit
 import repo_statistic
+import repository_store
+import response_cache
+import rest_backend
 import datetime
+import argparse
+import json
+import math
+import requests
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from unittest import mock
+
+LIST_URL = "https://api.github.com/repos/OWNER/REPOSITORY/commits"
+
+
+def get_fake_response(items: list, page: int = 1, last_page: int = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(items).encode()
+    response.headers["X-RateLimit-Remaining"] = "100"
+    response.headers["Date"] = "Sun, 17 Jan 2021 20:18:17 GMT"
+    if last_page is not None and page < last_page:
+        response.headers["Link"] = f'<{LIST_URL}?per_page=2&page={page + 1}>; rel="next", ' \
+                                   f'<{LIST_URL}?per_page=2&page={last_page}>; rel="last"'
+    return response
+
+
+def get_fake_pages(pages: list, with_links: bool):
+    def fake_get(url, params, **kwargs):
+        page = params["page"]
+        return get_fake_response(pages[page - 1], page, len(pages) if with_links else None)
+    return fake_get
+
+
+def get_commit(login: str) -> dict:
+    return {"author": {"login": login}}
+
+
+def get_graphql_node(created_at: str, state: str, closed_at: str = None, base: str = None) -> dict:
+    node = {"createdAt": created_at, "state": state, "closedAt": closed_at}
+    if base is not None:
+        node["baseRefName"] = base
+    return node
+
+
+def get_graphql_connection(nodes: list, cursor: str = None) -> dict:
+    return {"pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor}, "nodes": nodes}
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    downloads = 0
+
+    def do_GET(self):
+        self.send_response(304 if self.headers.get("If-None-Match") == '"v1"' else 200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("X-RateLimit-Remaining", "50")
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.end_headers()
+            return
+        ETagHandler.downloads += 1
+        body = json.dumps([get_commit(self.path)]).encode()
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
 
 
 class RepoStatisticTest(unittest.TestCase):
@@ -34,29 +105,29 @@ class RepoStatisticTest(unittest.TestCase):
 
     def test_get_commits_payload(self):
         test_dict = {"sha": "master", "per_page": 100, "page": 1}
-        self.assertDictEqual(test_dict, repo_statistic.get_commits_payload(None, None, "master"))
+        self.assertDictEqual(test_dict, rest_backend.get_commits_payload(None, None, "master"))
 
         test_dict = {"sha": "BRANCH_NAME", "per_page": 100, "page": 1}
-        self.assertDictEqual(test_dict, repo_statistic.get_commits_payload(None, None, "BRANCH_NAME"))
+        self.assertDictEqual(test_dict, rest_backend.get_commits_payload(None, None, "BRANCH_NAME"))
 
         test_dict = {"sha": "master", "since": "2020-12-27", "per_page": 100, "page": 1}
-        self.assertDictEqual(test_dict, repo_statistic.get_commits_payload("2020-12-27", None, "master"))
+        self.assertDictEqual(test_dict, rest_backend.get_commits_payload("2020-12-27", None, "master"))
 
         test_dict = {"sha": "master", "since": "2020-12-27", "until": "2021-05-01", "per_page": 100, "page": 1}
-        self.assertDictEqual(test_dict, repo_statistic.get_commits_payload("2020-12-27", "2021-05-01", "master"))
+        self.assertDictEqual(test_dict, rest_backend.get_commits_payload("2020-12-27", "2021-05-01", "master"))
 
         test_dict = {"sha": "BRANCH_NAME", "since": "2020-12-27", "per_page": 100, "page": 1}
-        self.assertDictEqual(test_dict, repo_statistic.get_commits_payload("2020-12-27", None, "BRANCH_NAME"))
+        self.assertDictEqual(test_dict, rest_backend.get_commits_payload("2020-12-27", None, "BRANCH_NAME"))
 
         test_dict = {"sha": "BRANCH_NAME", "since": "2020-12-27", "until": "2021-05-01", "per_page": 100, "page": 1}
-        self.assertDictEqual(test_dict, repo_statistic.get_commits_payload("2020-12-27", "2021-05-01", "BRANCH_NAME"))
+        self.assertDictEqual(test_dict, rest_backend.get_commits_payload("2020-12-27", "2021-05-01", "BRANCH_NAME"))
 
     def test_get_pr_payload(self):
         test_dict = {"base": "master", "per_page": 100, "page": 1, "state": "all"}
-        self.assertDictEqual(test_dict, repo_statistic.get_pr_payload("master"))
+        self.assertDictEqual(test_dict, rest_backend.get_pr_payload("master"))
 
         test_dict = {"base": "BRANCH_NAME", "per_page": 100, "page": 1, "state": "all"}
-        self.assertDictEqual(test_dict, repo_statistic.get_pr_payload("BRANCH_NAME"))
+        self.assertDictEqual(test_dict, rest_backend.get_pr_payload("BRANCH_NAME"))
 
     def test_get_time_period_string(self):
         test_time_period = "of all time"
@@ -75,12 +146,278 @@ class RepoStatisticTest(unittest.TestCase):
         date_to_check = datetime.datetime.strptime("2020-12-27", "%Y-%m-%d")
         since_date = datetime.datetime.strptime("1994-12-27", "%Y-%m-%d")
         until_date = datetime.datetime.strptime("2000-12-27", "%Y-%m-%d")
-        self.assertTrue(repo_statistic.in_time_period(date_to_check, None, None))
-        self.assertTrue(repo_statistic.in_time_period(date_to_check, since_date, None))
-        self.assertFalse(repo_statistic.in_time_period(date_to_check, None, until_date))
-        self.assertFalse(repo_statistic.in_time_period(date_to_check, since_date, until_date))
+        self.assertTrue(rest_backend.in_time_period(date_to_check, None, None))
+        self.assertTrue(rest_backend.in_time_period(date_to_check, since_date, None))
+        self.assertFalse(rest_backend.in_time_period(date_to_check, None, until_date))
+        self.assertFalse(rest_backend.in_time_period(date_to_check, since_date, until_date))
         date_to_check = datetime.datetime.strptime("1998-12-27", "%Y-%m-%d")
-        self.assertTrue(repo_statistic.in_time_period(date_to_check, None, until_date))
+        self.assertTrue(rest_backend.in_time_period(date_to_check, None, until_date))
+
+    def test_get_last_page(self):
+        self.assertEqual(7, rest_backend.get_last_page(get_fake_response([], 1, 7)))
+        self.assertIsNone(rest_backend.get_last_page(get_fake_response([])))
+
+    def test_parallel_pages_give_serial_result(self):
+        pages = [[get_commit("a"), get_commit("b")], [get_commit("b"), {"author": None}],
+                 [get_commit("c"), get_commit("b")], [get_commit("c")]]
+        results = []
+        for with_links in (False, True):
+            with mock.patch("requests.Session.get", side_effect=get_fake_pages(pages, with_links)) as fake_get:
+                results.append(rest_backend.get_contributors_dict(LIST_URL, {"sha": "master", "per_page": 2,
+                                                                               "page": 1}, vp=False, workers=3))
+                self.assertEqual(4, fake_get.call_count)
+        self.assertEqual([("b", 3), ("c", 2), ("a", 1)], results[0])
+        self.assertEqual(results[0], results[1])
+
+    def test_issues_pages(self):
+        issue = {"created_at": "2021-01-01T09:02:42Z", "state": "open", "closed_at": None}
+        closed_issue = {"created_at": "2020-01-01T09:02:42Z", "state": "closed", "closed_at": "2021-01-02T00:00:00Z"}
+        pages = [[issue, closed_issue], [issue, issue], []]
+        with mock.patch("requests.Session.get", side_effect=get_fake_pages(pages, True)):
+            issues_dict = rest_backend.get_issues_dict("https://github.com/OWNER/REPOSITORY",
+                                                         {"per_page": 2, "page": 1, "state": "all"},
+                                                         since="2021-01-01", days_to_old=10, vp=False)
+        self.assertDictEqual({"opened": 3, "closed": 1, "old": 3}, issues_dict)
+
+    def test_collect_statistic(self):
+        issue = {"created_at": "2021-01-01T09:02:42Z", "state": "closed", "closed_at": "2021-01-02T00:00:00Z"}
+
+        def fake_get(url, params, **kwargs):
+            if url.endswith("/commits"):
+                return get_fake_response([get_commit("a"), get_commit("b"), get_commit("a")])
+            if url.endswith("/pulls"):
+                return get_fake_response([issue])
+            return get_fake_response([issue, issue])
+
+        args = argparse.Namespace(url="https://github.com/OWNER/REPOSITORY", since=None, until=None, branch="master",
+                                  top_contributors=1, pr_days_to_old=30, issue_days_to_old=14,
+                                  visual_progress=False, request_timeout=10, workers=2)
+        with rest_backend.get_session(6) as session, mock.patch.object(session, "get", side_effect=fake_get):
+            statistic = rest_backend.collect_statistic(args, session=session)
+        self.assertEqual(([("a", 2)], {"opened": 1, "closed": 1, "old": 0}, {"opened": 2, "closed": 2, "old": 0}),
+                         statistic)
+
+    def test_get_session(self):
+        with rest_backend.get_session(pool_size=4, retries=2) as session:
+            self.assertEqual("gzip, deflate", session.headers["Accept-Encoding"])
+            adapter = session.get_adapter("https://api.github.com")
+            self.assertEqual(4, adapter._pool_maxsize)
+            self.assertEqual(2, adapter.max_retries.total)
+        with rest_backend.get_session(compression=False) as session:
+            self.assertEqual("identity", session.headers["Accept-Encoding"])
+
+    def test_get_authentication_uses_session(self):
+        args = argparse.Namespace(username="user", token="token", request_timeout=10)
+        response = get_fake_response({"login": "user"})
+        with rest_backend.get_session() as session, \
+                mock.patch.object(session, "get", return_value=response) as fake_get:
+            auth = repo_statistic.get_authentication(args, session)
+        self.assertEqual("user", auth.username)
+        fake_get.assert_called_once()
+
+    def test_response_cache_revalidates_pages(self):
+        server = HTTPServer(("127.0.0.1", 0), ETagHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+        with tempfile.TemporaryDirectory() as folder:
+            cache = response_cache.ResponseCache(Path(folder) / "cache", max_size=10 ** 6)
+            with requests.Session() as session:
+                session.mount("http://", response_cache.CachingAdapter(cache))
+                first = session.get(url + "/a")
+                second = session.get(url + "/a")
+                session.get(url + "/b")
+            cache.close()
+        server.shutdown()
+        server.server_close()
+        self.assertEqual(2, ETagHandler.downloads)
+        self.assertEqual(200, second.status_code)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual("50", second.headers["X-RateLimit-Remaining"])
+
+    def test_response_cache_key_uses_scheduled_token(self):
+        response = get_fake_response([get_commit("a")])
+        response.headers["ETag"] = '"a"'
+        scheduler = rate_limit.RateLimitScheduler([rate_limit.TokenAuth("a")], vp=False)
+        with tempfile.TemporaryDirectory() as folder, \
+                mock.patch.object(requests.adapters.HTTPAdapter, "send", return_value=response) as send:
+            cache = response_cache.ResponseCache(Path(folder) / "cache", max_size=10 ** 6)
+            adapter = response_cache.CachingAdapter(cache, scheduler)
+            adapter.send(requests.Request("GET", LIST_URL).prepare())
+            sent = send.call_args[0][0]
+            self.assertEqual("token a", sent.headers["Authorization"])
+            self.assertIsNotNone(cache.get(response_cache.CachingAdapter.get_key(sent)))
+            cache.close()
+
+    def test_response_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as folder:
+            cache = response_cache.ResponseCache(Path(folder) / "cache", max_size=10)
+            cache.put("a", '"a"', None, {}, b"12345")
+            cache.put("b", '"b"', None, {}, b"12345")
+            self.assertIsNotNone(cache.get("a"))
+            cache.put("c", '"c"', None, {}, b"12345")
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(('"a"', None, {}, b"12345"), cache.get("a"))
+            cache.clear()
+            self.assertIsNone(cache.get("a"))
+            cache.close()
+
+    def test_store_gives_collected_statistic(self):
+        commits = [{"sha": str(number), "author": None if login is None else {"login": login},
+                    "commit": {"committer": {"date": f"2021-01-{day:02d}T10:00:00Z"}}}
+                   for number, (login, day) in enumerate([("a", 5), ("b", 4), (None, 3), ("a", 2), ("c", 1)])]
+        pulls = [{"number": 1, "base": {"ref": "master"}, "state": "open", "created_at": "2020-01-01T09:02:42Z",
+                  "closed_at": None, "updated_at": "2020-01-01T09:02:42Z"},
+                 {"number": 2, "base": {"ref": "dev"}, "state": "closed", "created_at": "2021-01-03T09:02:42Z",
+                  "closed_at": "2021-01-04T09:02:42Z", "updated_at": "2021-01-04T09:02:42Z"}]
+        issues = [{"number": 3, "state": "closed", "created_at": "2021-01-02T09:02:42Z",
+                   "closed_at": "2021-01-03T09:02:42Z", "updated_at": "2021-01-03T09:02:42Z"}]
+
+        def fake_get(url, params, **kwargs):
+            if url.endswith("/commits"):
+                return get_fake_response([commit for commit in commits
+                                          if "since" not in params or commit["commit"]["committer"]["date"]
+                                          >= params["since"]])
+            if url.endswith("/pulls"):
+                return get_fake_response([pull for pull in pulls
+                                          if params.get("base") in (None, pull["base"]["ref"])])
+            return get_fake_response(issues)
+
+        args = argparse.Namespace(url="https://github.com/OWNER/REPOSITORY", since="2020-1-1", until=None,
+                                  branch="master", top_contributors=2, pr_days_to_old=30, issue_days_to_old=14,
+                                  visual_progress=False, request_timeout=10, workers=2)
+        with tempfile.TemporaryDirectory() as folder, \
+                mock.patch("requests.Session.get", side_effect=fake_get) as fake:
+            store = repository_store.RepositoryStore(Path(folder) / "store")
+            repository_store.sync_store(store, args)
+            commits.insert(0, {"sha": "new", "author": {"login": "c"},
+                               "commit": {"committer": {"date": "2021-01-06T10:00:00Z"}}})
+            repository_store.sync_store(store, args)
+            self.assertEqual("2021-01-05T10:00:00Z", fake.call_args_list[3][1]["params"]["since"])
+            stored_statistic = repository_store.query_statistic(store, args)
+            store.close()
+            collected_statistic = rest_backend.collect_statistic(args)
+        self.assertEqual(collected_statistic, stored_statistic)
+        self.assertEqual([("c", 2), ("a", 2)], stored_statistic[0])
+
+    def test_interrupted_sync_keeps_watermark(self):
+        pages = [[{"sha": str(day), "author": {"login": login}, "commit": {"committer": {"date": f"2021-01-0{day}"}}}
+                  for login, day in page] for page in [[("a", 4), ("b", 3)], [("a", 2), ("c", 1)]]]
+        failures = [requests.HTTPError("Error 502")]
+
+        def fake_get(url, params, **kwargs):
+            if params["page"] == 2 and failures:
+                raise failures.pop()
+            return get_fake_response(pages[params["page"] - 1], params["page"], len(pages))
+
+        with tempfile.TemporaryDirectory() as folder, \
+                mock.patch("requests.Session.get", side_effect=fake_get) as fake:
+            store = repository_store.RepositoryStore(Path(folder) / "store")
+            with self.assertRaises(requests.HTTPError):
+                repository_store.sync_commits(store, "https://github.com/OWNER/REPOSITORY", vp=False, workers=1)
+            self.assertIsNone(store.get_synced_until("OWNER/REPOSITORY", "commit", "master"))
+            repository_store.sync_commits(store, "https://github.com/OWNER/REPOSITORY", vp=False, workers=1)
+            self.assertNotIn("since", fake.call_args_list[2][1]["params"])
+            self.assertEqual("2021-01-04", store.get_synced_until("OWNER/REPOSITORY", "commit", "master"))
+            self.assertEqual([("a", 2), ("b", 1), ("c", 1)], store.get_top_active("OWNER/REPOSITORY"))
+            store.close()
+
+    def test_to_iso_date(self):
+        self.assertEqual("2020-05-07", rest_backend.to_iso_date("2020-5-7"))
+        self.assertIsNone(rest_backend.to_iso_date(None))
+
+    def test_scheduler_rotates_tokens(self):
+        scheduler = rate_limit.RateLimitScheduler([rate_limit.TokenAuth("a"), rate_limit.TokenAuth("b")])
+        first, second = scheduler.acquire(), scheduler.acquire()
+        self.assertEqual(["a", "b"], [first.auth.token, second.auth.token])
+        spent = get_fake_response([])
+        spent.headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 3600)})
+        self.assertFalse(scheduler.release(first, spent))
+        self.assertFalse(scheduler.release(second, get_fake_response([])))
+        self.assertEqual(["b", "b"], [scheduler.acquire().auth.token, scheduler.acquire().auth.token])
+
+    def test_scheduler_skips_over_committed_token(self):
+        scheduler = rate_limit.RateLimitScheduler([rate_limit.TokenAuth("a"), rate_limit.TokenAuth("b")])
+        spent, free = scheduler.get_budgets("core")
+        spent.probed, spent.remaining, spent.in_flight = True, 2, 4
+        free.probed, free.remaining = True, 1
+        self.assertEqual(-2, spent.get_available(time.time()))
+        self.assertIs(free, scheduler.acquire())
+        unlimited = rate_limit.TokenBudget(None)
+        unlimited.probed = True
+        self.assertEqual(math.inf, unlimited.get_available(time.time()))
+
+    def test_scheduler_keeps_budget_per_resource(self):
+        scheduler = rate_limit.RateLimitScheduler([rate_limit.TokenAuth("a"), rate_limit.TokenAuth("b")])
+        spent = get_fake_response([])
+        spent.headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 3600),
+                              "X-RateLimit-Resource": "graphql"})
+        self.assertFalse(scheduler.release(scheduler.acquire("graphql"), spent))
+        self.assertEqual(["a", "b"], [scheduler.acquire().auth.token, scheduler.acquire().auth.token])
+        self.assertEqual("b", scheduler.acquire("graphql").auth.token)
+        refused = get_fake_response([])
+        refused.headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 3600),
+                                "X-RateLimit-Resource": "search"})
+        core = scheduler.get_budget(scheduler.auths[0], "core")
+        self.assertFalse(scheduler.release(core, refused))
+        self.assertEqual(0, scheduler.get_budget(scheduler.auths[0], "search").remaining)
+        self.assertIsNone(core.remaining)
+        self.assertEqual("graphql", rate_limit.get_rate_limit_resource(
+            requests.Request("POST", graphql_backend.GRAPHQL_URL).prepare()))
+        self.assertEqual("core", rate_limit.get_rate_limit_resource(requests.Request("GET", LIST_URL).prepare()))
+
+    def test_scheduler_waits_for_reset(self):
+        scheduler = rate_limit.RateLimitScheduler([None], vp=False)
+        refused = get_fake_response([])
+        refused.status_code = 403
+        refused.headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 0.2)})
+        with mock.patch.object(rate_limit, "RESET_MARGIN", 0.0), \
+                mock.patch.object(requests.adapters.HTTPAdapter, "send",
+                                  side_effect=[refused, get_fake_response([get_commit("a")])]) as send:
+            adapter = rate_limit.RateLimitAdapter(scheduler)
+            start = time.time()
+            response = adapter.send(requests.Request("GET", LIST_URL).prepare())
+        self.assertGreaterEqual(time.time() - start, 0.15)
+        self.assertEqual(2, send.call_count)
+        self.assertEqual([get_commit("a")], response.json())
+
+    def test_graphql_commits_follow_cursor(self):
+        pages = [get_graphql_connection([{"author": {"user": {"login": "a"}}}, {"author": {"user": None}}], "c1"),
+                 get_graphql_connection([{"author": {"user": {"login": "b"}}}, {"author": {"user": {"login": "a"}}}])]
+        responses = [get_fake_response({"data": {"repository": {"ref": {"target": {"history": page}}}}})
+                     for page in pages]
+        with mock.patch("requests.Session.post", side_effect=responses) as fake_post:
+            top = graphql_backend.get_contributors_dict_graphql("https://github.com/OWNER/REPOSITORY",
+                                                               since="2021-01-01", vp=False)
+        self.assertEqual([("a", 2), ("b", 1)], top)
+        variables = [call[1]["json"]["variables"] for call in fake_post.call_args_list]
+        self.assertEqual([None, "c1"], [variable["cursor"] for variable in variables])
+        self.assertEqual("2021-01-01T00:00:00Z", variables[0]["since"])
+
+    def test_graphql_issues_share_queries(self):
+        pulls = [get_graphql_connection([get_graphql_node("2021-01-01T09:02:42Z", "OPEN", base="master"),
+                                         get_graphql_node("2021-01-01T09:02:42Z", "MERGED",
+                                                          "2021-01-02T00:00:00Z", "dev")], "p1"),
+                 get_graphql_connection([get_graphql_node("2021-01-01T09:02:42Z", "CLOSED",
+                                                          "2021-01-02T00:00:00Z", "master")])]
+        issues = [get_graphql_connection([get_graphql_node("2020-01-01T09:02:42Z", "CLOSED",
+                                                           "2021-01-02T00:00:00Z")])]
+        responses = [get_fake_response({"data": {"repository": {"pullRequests": pulls[0], "issues": issues[0]}}}),
+                     get_fake_response({"data": {"repository": {"pullRequests": pulls[1]}}})]
+        with mock.patch("requests.Session.post", side_effect=responses) as fake_post:
+            pr_dict, issues_dict = graphql_backend.get_issues_dicts_graphql("https://github.com/OWNER/REPOSITORY",
+                                                                           since="2021-01-01", pr_days_to_old=10,
+                                                                           vp=False)
+        self.assertDictEqual({"opened": 2, "closed": 1, "old": 1}, pr_dict)
+        self.assertDictEqual({"opened": 3, "closed": 3, "old": 1}, issues_dict)
+        second = fake_post.call_args_list[1][1]["json"]["variables"]
+        self.assertEqual(("p1", True, False), (second["pullsCursor"], second["withPulls"], second["withIssues"]))
+
+    def test_graphql_not_found(self):
+        response = get_fake_response({"data": {"repository": None},
+                                      "errors": [{"type": "NOT_FOUND", "message": "Could not resolve"}]})
+        with mock.patch("requests.Session.post", return_value=response), \
+                self.assertRaisesRegex(requests.HTTPError, "Error 404"):
+            graphql_backend.get_issues_dicts_graphql("https://github.com/OWNER/REPOSITORY", vp=False)
 
 
 if __name__ == "__main__":